@@ -1,4 +1,6 @@
 import pool from "../config/db.js";
+import { notifyCommandsChanged } from "../services/commandEvents.js";
+import { issueActuatorCommand } from "../services/deviceCommands.js";
 
 // ================================
 // GET /actuators?greenhouse_id=...
@@ -83,7 +85,7 @@ export async function createActuatorCommand(req, res) {
 
     // Verificăm că actuatorul aparține userului și, opțional, serei selectate
     let sql = `
-      SELECT a.id
+      SELECT a.id, a.controller_id
       FROM actuators a
       JOIN controllers c ON c.id = a.controller_id
       JOIN greenhouses g ON g.id = c.greenhouse_id
@@ -114,22 +116,21 @@ export async function createActuatorCommand(req, res) {
       expires_at = exp[0].exp;
     }
 
-    // Inserăm în actuator_commands
-    const [result] = await pool.query(
-      `INSERT INTO actuator_commands 
-       (actuator_id, command, level, issued_by_user_id, issued_at, expires_at)
-       VALUES (?, ?, ?, ?, NOW(), ?)`,
-      [actuator_id, command, level || null, userUid, expires_at]
-    );
-
-    // Actualizăm status-ul actuatorului
-    await pool.query("UPDATE actuators SET status = ? WHERE id = ?", [
-      command === "on" ? "on" : "off",
-      actuator_id,
-    ]);
+    // Actualizăm status-ul actuatorului, apoi inserăm în actuator_commands
+    // (în ordinea asta, ca device-ul să nu vadă versiunea nouă cu starea veche)
+    const commandId = await issueActuatorCommand({
+      actuatorId: actuator_id,
+      command,
+      level: level || null,
+      issuedBy: userUid,
+      expiresAt: expires_at,
+    });
+
+    // Trezim long-poll-ul device-ului (dacă e conectat)
+    notifyCommandsChanged(check[0].controller_id);
 
     res.status(201).json({
-      id: result.insertId,
+      id: commandId,
       actuator_id,
       command,
       level: level || null,
@@ -1,4 +1,6 @@
 import db from "../config/db.js";
+import { decodeReadings, decodeSummaries, isWireBody } from "../services/deviceWireFormat.js";
+import { pendingCommands, takeCommandAck } from "../services/deviceCommands.js";
 // endpoint pentru comenzi venite de la hardware (Raspberry Pico, etc.)
 const fieldToSensorType = {
   temp: "temperature",
@@ -21,6 +23,42 @@ function parseIncomingTimestamp(ts) {
   return null;
 }
 
+// Comenzile atașate răspunsului unui upload deja salvat. O eroare aici nu
+// trebuie să dea 500: device-ul ar păstra citirile offline și le-ar retrimite
+// (duplicate). Fără `commands`, device-ul le ia la următorul poll.
+async function commandsAfterUpload(controller, ackedVersion) {
+  try {
+    return await pendingCommands(controller, ackedVersion);
+  } catch (err) {
+    console.error("pendingCommands error:", err);
+    return undefined;
+  }
+}
+
+// Extrage citirile valide dintr-un payload { temp, humidity, soil_moisture }
+// → [{ sensorId, val }], doar pentru senzorii funcționali ai controller-ului
+function extractReadings(payload, sensorIdByType) {
+  const allowedFields = ["temp", "humidity", "soil_moisture"];
+  const readings = [];
+
+  for (const key of allowedFields) {
+    if (!(key in payload)) continue;
+
+    const val = Number(payload[key]);
+    if (!Number.isFinite(val)) continue;
+
+    const sensorType = fieldToSensorType[key];   // ex: 'temperature'
+    const sensorId = sensorIdByType[sensorType];
+    if (!sensorId) continue;
+
+    // validare simplă pentru humidity
+    if (sensorType === "humidity" && (val < 0 || val > 100)) continue;
+
+    readings.push({ sensorId, val });
+  }
+  return readings;
+}
+
 /**
  * Endpoint pentru recepția datelor de la device-uri (Raspberry Pico, etc.)
  * Protejat cu API Key (x-api-key în header).
@@ -29,7 +67,17 @@ function parseIncomingTimestamp(ts) {
  */
 export const receiveSensorData = async (req, res) => {
   const { device_uid } = req.params;
-  const payload = (req.body && typeof req.body === "object") ? req.body : {};
+  let payload = (req.body && typeof req.body === "object") ? req.body : {};
+  if (isWireBody(req.body)) {
+    // format binar: exact o înregistrare
+    try {
+      const readings = decodeReadings(req.body);
+      if (readings.length !== 1) throw new Error("Expected exactly one reading");
+      payload = readings[0];
+    } catch (err) {
+      return res.status(400).json({ message: String(err.message) });
+    }
+  }
   const ts = parseIncomingTimestamp(payload.timestamp); // opțional global
 
   let conn;
@@ -39,7 +87,7 @@ export const receiveSensorData = async (req, res) => {
 
     // 1) Verificăm controller-ul după device_uid
     const [ctrl] = await conn.query(
-      "SELECT id FROM controllers WHERE device_uid = ? LIMIT 1",
+      "SELECT id, report_policy, acked_version FROM controllers WHERE device_uid = ? LIMIT 1",
       [device_uid]
     );
     if (ctrl.length === 0) {
@@ -47,6 +95,8 @@ export const receiveSensorData = async (req, res) => {
       return res.status(404).json({ message: "Controller not found" });
     }
     const controllerId = ctrl[0].id;
+    // confirmarea comenzilor aplicate, venită pe acest upload (X-Command-Ack)
+    const ackedVersion = await takeCommandAck(req, ctrl[0]);
 
     // 2) Selectăm senzorii funcționali pentru acest controller
     const [sensors] = await conn.query(
@@ -59,22 +109,9 @@ export const receiveSensorData = async (req, res) => {
     );
 
     // 3) Inserăm citirile disponibile
-    const allowedFields = ["temp", "humidity", "soil_moisture"];
     const insertedIds = [];
 
-    for (const key of allowedFields) {
-      if (!(key in payload)) continue;
-
-      const val = Number(payload[key]);
-      if (!Number.isFinite(val)) continue;
-
-      const sensorType = fieldToSensorType[key];   // ex: 'temperature'
-      const sensorId = sensorIdByType[sensorType];
-      if (!sensorId) continue;
-
-      // validare simplă pentru humidity
-      if (sensorType === "humidity" && (val < 0 || val > 100)) continue;
-
+    for (const { sensorId, val } of extractReadings(payload, sensorIdByType)) {
       if (ts) {
         const [r] = await conn.query(
           "INSERT INTO sensor_readings (sensor_id, value, timestamp) VALUES (?, ?, ?)",
@@ -100,6 +137,9 @@ export const receiveSensorData = async (req, res) => {
       message: "Readings stored",
       stored: insertedIds.length,
       ids: insertedIds,
+      // comenzile curente (doar versiunea, dacă sunt deja confirmate), ca
+      // device-ul să nu mai facă un GET separat
+      commands: await commandsAfterUpload(ctrl[0], ackedVersion),
     });
   } catch (err) {
     console.error("receiveSensorData error:", err);
@@ -109,3 +149,216 @@ export const receiveSensorData = async (req, res) => {
     if (conn) conn.release();
   }
 };
+
+// număr maxim de citiri acceptate într-un singur batch
+const MAX_BATCH_READINGS = 500;
+
+/**
+ * Endpoint pentru citiri trimise în lot de device (timestamp pus pe device).
+ * Toate rândurile sunt inserate cu un singur INSERT multi-row.
+ *
+ * POST /data/:device_uid/batch
+ * Body JSON: { "readings": [ { "timestamp": 1726130000, "temp": 23.5, "humidity": 60, "soil_moisture": 41 }, ... ] }
+ * sau binar (services/deviceWireFormat.js), decodat în aceeași listă
+ */
+export const receiveSensorBatch = async (req, res) => {
+  const { device_uid } = req.params;
+  let readings = Array.isArray(req.body?.readings) ? req.body.readings : null;
+  if (isWireBody(req.body)) {
+    try {
+      readings = decodeReadings(req.body);
+    } catch (err) {
+      return res.status(400).json({ message: String(err.message) });
+    }
+  }
+
+  if (!readings || readings.length === 0) {
+    return res.status(400).json({ message: "Body must contain a non-empty readings array." });
+  }
+  if (readings.length > MAX_BATCH_READINGS) {
+    return res.status(413).json({ message: `At most ${MAX_BATCH_READINGS} readings per batch.` });
+  }
+
+  let conn;
+  try {
+    conn = await db.getConnection();
+
+    // 1) Verificăm controller-ul după device_uid
+    const [ctrl] = await conn.query(
+      "SELECT id, report_policy, acked_version FROM controllers WHERE device_uid = ? LIMIT 1",
+      [device_uid]
+    );
+    if (ctrl.length === 0) {
+      return res.status(404).json({ message: "Controller not found" });
+    }
+    const controllerId = ctrl[0].id;
+    const ackedVersion = await takeCommandAck(req, ctrl[0]);
+
+    // 2) Senzorii funcționali ai controller-ului
+    const [sensors] = await conn.query(
+      "SELECT id, `type` FROM sensors WHERE controller_id = ? AND technical_status = 'functional'",
+      [controllerId]
+    );
+    const sensorIdByType = Object.fromEntries(
+      sensors.map(s => [String(s.type).toLowerCase(), s.id])
+    );
+
+    // 3) Construim toate rândurile; citirile fără timestamp primesc ora serverului
+    const now = new Date();
+    const rows = [];
+    for (const item of readings) {
+      if (!item || typeof item !== "object") continue;
+      const ts = parseIncomingTimestamp(item.timestamp) || now;
+      for (const { sensorId, val } of extractReadings(item, sensorIdByType)) {
+        rows.push([sensorId, val, ts]);
+      }
+    }
+
+    if (rows.length === 0) {
+      return res.status(400).json({ message: "No valid readings inserted." });
+    }
+
+    // 4) Un singur INSERT multi-row (atomic)
+    const [r] = await conn.query(
+      "INSERT INTO sensor_readings (sensor_id, value, timestamp) VALUES ?",
+      [rows]
+    );
+
+    return res.status(200).json({
+      message: "Readings stored",
+      stored: r.affectedRows,
+      commands: await commandsAfterUpload(ctrl[0], ackedVersion),
+    });
+  } catch (err) {
+    console.error("receiveSensorBatch error:", err);
+    return res.status(500).json({ message: "Server error", error: String(err?.message || err) });
+  } finally {
+    if (conn) conn.release();
+  }
+};
+
+// număr maxim de sumare acceptate într-un singur request
+const MAX_SUMMARIES = 100;
+
+// Extrage statisticile valide dintr-un sumar { temp: { min, max, mean, count }, ... }
+// → [{ sensorId, min, max, mean, count }], doar pentru senzorii funcționali
+function extractSummaries(summary, sensorIdByType) {
+  const rows = [];
+  for (const [key, sensorType] of Object.entries(fieldToSensorType)) {
+    const stats = summary[key];
+    if (!stats || typeof stats !== "object") continue;
+
+    const sensorId = sensorIdByType[sensorType];
+    if (!sensorId) continue;
+
+    const min = Number(stats.min), max = Number(stats.max), mean = Number(stats.mean);
+    const count = Number(stats.count);
+    if (![min, max, mean].every(Number.isFinite) || !Number.isInteger(count) || count < 1) continue;
+    if (min > mean || mean > max) continue;
+
+    rows.push({ sensorId, min, max, mean, count });
+  }
+  return rows;
+}
+
+/**
+ * Sumare pe ferestre fixe calculate pe device (min/max/mean/count pe canal),
+ * trimise în locul citirilor brute. Se salvează în sensor_summaries; media
+ * ferestrei intră și în sensor_readings, ca graficele existente să aibă
+ * în continuare un punct pe fereastră.
+ *
+ * POST /data/:device_uid/summary
+ * Body JSON: { "timestamp": 1726130000, "window": 60, "temp": { "min": 22.9, "max": 23.6, "mean": 23.2, "count": 240 }, ... }
+ * sau { "summaries": [ ... ] }, sau binar (services/deviceWireFormat.js)
+ */
+export const receiveSensorSummary = async (req, res) => {
+  const { device_uid } = req.params;
+  let summaries = null;
+  if (isWireBody(req.body)) {
+    try {
+      summaries = decodeSummaries(req.body);
+    } catch (err) {
+      return res.status(400).json({ message: String(err.message) });
+    }
+  } else if (req.body && typeof req.body === "object") {
+    summaries = Array.isArray(req.body.summaries) ? req.body.summaries : [req.body];
+  }
+
+  if (!summaries || summaries.length === 0) {
+    return res.status(400).json({ message: "Body must contain at least one summary." });
+  }
+  if (summaries.length > MAX_SUMMARIES) {
+    return res.status(413).json({ message: `At most ${MAX_SUMMARIES} summaries per request.` });
+  }
+
+  let conn;
+  try {
+    conn = await db.getConnection();
+
+    // 1) Verificăm controller-ul după device_uid
+    const [ctrl] = await conn.query(
+      "SELECT id, report_policy, acked_version FROM controllers WHERE device_uid = ? LIMIT 1",
+      [device_uid]
+    );
+    if (ctrl.length === 0) {
+      return res.status(404).json({ message: "Controller not found" });
+    }
+    const controllerId = ctrl[0].id;
+    const ackedVersion = await takeCommandAck(req, ctrl[0]);
+
+    // 2) Senzorii funcționali ai controller-ului
+    const [sensors] = await conn.query(
+      "SELECT id, `type` FROM sensors WHERE controller_id = ? AND technical_status = 'functional'",
+      [controllerId]
+    );
+    const sensorIdByType = Object.fromEntries(
+      sensors.map(s => [String(s.type).toLowerCase(), s.id])
+    );
+
+    // 3) Rândurile de sumar + media fiecărei ferestre ca citire;
+    //    fără timestamp, fereastra se consideră încheiată acum
+    const now = Date.now();
+    const summaryRows = [];
+    const readingRows = [];
+    for (const item of summaries) {
+      if (!item || typeof item !== "object") continue;
+      const window = Number(item.window);
+      if (!Number.isInteger(window) || window < 1) continue;
+      const start = parseIncomingTimestamp(item.timestamp) || new Date(now - window * 1000);
+      for (const { sensorId, min, max, mean, count } of extractSummaries(item, sensorIdByType)) {
+        summaryRows.push([sensorId, start, window, min, max, mean, count]);
+        readingRows.push([sensorId, mean, start]);
+      }
+    }
+
+    if (summaryRows.length === 0) {
+      return res.status(400).json({ message: "No valid summaries inserted." });
+    }
+
+    // 4) Două INSERT-uri multi-row, în aceeași tranzacție
+    await conn.beginTransaction();
+    await conn.query(
+      `INSERT INTO sensor_summaries
+         (sensor_id, window_start, window_seconds, min_value, max_value, avg_value, sample_count)
+       VALUES ?`,
+      [summaryRows]
+    );
+    await conn.query(
+      "INSERT INTO sensor_readings (sensor_id, value, timestamp) VALUES ?",
+      [readingRows]
+    );
+    await conn.commit();
+
+    return res.status(200).json({
+      message: "Summaries stored",
+      stored: summaryRows.length,
+      commands: await commandsAfterUpload(ctrl[0], ackedVersion),
+    });
+  } catch (err) {
+    console.error("receiveSensorSummary error:", err);
+    if (conn) { try { await conn.rollback(); } catch {} }
+    return res.status(500).json({ message: "Server error", error: String(err?.message || err) });
+  } finally {
+    if (conn) conn.release();
+  }
+};
@@ -1,36 +1,60 @@
 import pool from "../config/db.js";
+import { waitForCommandsChange } from "../services/commandEvents.js";
+import { commandsBody, readCommandsVersion, takeCommandAck } from "../services/deviceCommands.js";
 
-// returnează ultimele comenzi pentru actuatoare sub forma { pump: bool, fan: bool }
+// durata maximă (secunde) pentru care un long-poll e ținut deschis
+const MAX_WAIT_SECONDS = 30;
+
+// versiunea cunoscută de device: din If-None-Match ("v42") sau ?since=42
+function clientVersion(req) {
+  const match = /^(?:W\/)?"v(\d+)"$/.exec(req.get("if-none-match") || "");
+  if (match) return Number(match[1]);
+  const since = Number(req.query.since);
+  return Number.isInteger(since) ? since : null;
+}
+
+// returnează ultimele comenzi pentru actuatoare sub forma { pump: bool, fan: bool, version }
+// (+ `report` cu politica de raportare, dacă e setată pentru controller)
+// GET /api/data/:device_uid/commands?wait=25 → long-poll: răspunde la prima
+// schimbare de stare sau după `wait` secunde
+// Cu If-None-Match: "v<version>" (sau ?since=<version>) → 304 fără body dacă nu s-a schimbat nimic
 export async function getDeviceCommands(req, res) {
   try {
     const { device_uid } = req.params;
+    const wait = Math.min(Number(req.query.wait) || 0, MAX_WAIT_SECONDS);
+    const known = clientVersion(req);
 
     // Verificăm controller-ul după device_uid
     const [ctrl] = await pool.query(
-      "SELECT id FROM controllers WHERE device_uid = ? LIMIT 1",
+      "SELECT id, report_policy, acked_version FROM controllers WHERE device_uid = ? LIMIT 1",
       [device_uid]
     );
     if (ctrl.length === 0) {
       return res.status(404).json({ error: "Controller not found" });
     }
     const controllerId = ctrl[0].id;
+    // confirmarea comenzilor aplicate (X-Command-Ack), dacă a venit pe acest request
+    await takeCommandAck(req, ctrl[0]);
 
-    // Luăm actuatoarele asociate controllerului
-    const [rows] = await pool.query(
-      `SELECT a.type, a.status 
-       FROM actuators a
-       WHERE a.controller_id = ?`,
-      [controllerId]
-    );
+    let version = await readCommandsVersion(controllerId);
+
+    // Long-poll: dacă device-ul are deja ultima versiune, așteptăm o schimbare
+    // (sau timeout); renunțăm dacă device-ul închide conexiunea
+    if (wait > 0 && version === known) {
+      const abort = new AbortController();
+      res.on("close", () => abort.abort());
+      await waitForCommandsChange(controllerId, wait * 1000, abort.signal);
+      if (abort.signal.aborted) return;
+      version = await readCommandsVersion(controllerId);
+    }
 
-    // Transformăm în răspuns { pump: bool, fan: bool }
-    const response = {};
-    for (const r of rows) {
-      if (r.type === "pump") response.pump = r.status === "on";
-      if (r.type === "fan") response.fan = r.status === "on";
+    res.set("ETag", `"v${version}"`);
+    if (version === known) {
+      return res.status(304).end();
     }
 
-    res.json(response);
+    // Transformăm în răspuns { pump: bool, fan: bool, version }
+    res.json(await commandsBody(controllerId, ctrl[0].report_policy, version));
   } catch (err) {
     console.error("getDeviceCommands error:", err);
     res.status(500).json({ error: "Server error" });
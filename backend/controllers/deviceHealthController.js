@@ -0,0 +1,134 @@
+import pool from "../config/db.js";
+import { takeCommandAck } from "../services/deviceCommands.js";
+
+const toIso = (v) => (v instanceof Date ? v.toISOString() : v);
+const toInt = (v) => (Number.isFinite(Number(v)) && v !== null ? Math.round(Number(v)) : null);
+
+/**
+ * Limita superioară (ms) a bucket-ului în care cade cuantila q
+ * (bucket-uri cumulate peste `bounds`; ultimul bucket = peste ultima limită → null).
+ */
+function histogramQuantile(bounds, hist, q) {
+  if (!Array.isArray(hist) || !Array.isArray(hist[3]) || !hist[0]) return null;
+  const target = hist[0] * q;
+  let seen = 0;
+  for (let i = 0; i < hist[3].length; i++) {
+    seen += Number(hist[3][i]) || 0;
+    if (seen >= target) return i < bounds.length ? bounds[i] : null;
+  }
+  return null;
+}
+
+function parseJson(text) {
+  try {
+    return typeof text === "string" ? JSON.parse(text) : text || {};
+  } catch {
+    return {};
+  }
+}
+
+/**
+ * Snapshot de telemetrie trimis periodic de device (metrics.snapshot() din firmware):
+ * contoare de la pornire și histograme de latență (DNS, handshake, request,
+ * citire senzori, pauze GC, lag în bucla async).
+ * Protejat cu API Key (x-api-key în header). Confirmarea de comandă
+ * (X-Command-Ack) venită pe acest request e salvată ca pe celelalte rute.
+ *
+ * POST /api/data/:device_uid/health
+ * Body JSON: { "uptime": 3600, "heap_free": 121344, "heap_min": 98304, "rssi": -61,
+ *              "bounds": [1, 2, 5, ...], "counters": { "uploads": 60 },
+ *              "histograms": { "request": [count, total_ms, max_ms, [buckets...]] } }
+ */
+export async function receiveDeviceHealth(req, res) {
+  const { device_uid } = req.params;
+  const body = req.body || {};
+  if (typeof body !== "object" || Array.isArray(body) || body.uptime === undefined) {
+    return res.status(400).json({ message: "Body must be a JSON health snapshot with uptime." });
+  }
+
+  try {
+    const [ctrl] = await pool.query(
+      "SELECT id, acked_version FROM controllers WHERE device_uid = ? LIMIT 1",
+      [device_uid]
+    );
+    if (ctrl.length === 0) {
+      return res.status(404).json({ message: "Controller not found" });
+    }
+    await takeCommandAck(req, ctrl[0]);
+
+    const [r] = await pool.query(
+      `INSERT INTO device_health
+         (controller_id, uptime_s, heap_free, heap_min, rssi, bounds, counters, histograms, received_at)
+       VALUES (?, ?, ?, ?, ?, ?, ?, ?, NOW())`,
+      [
+        ctrl[0].id,
+        toInt(body.uptime),
+        toInt(body.heap_free),
+        toInt(body.heap_min),
+        toInt(body.rssi),
+        JSON.stringify(Array.isArray(body.bounds) ? body.bounds : []),
+        JSON.stringify(body.counters || {}),
+        JSON.stringify(body.histograms || {}),
+      ]
+    );
+    return res.status(200).json({ message: "Health stored", id: r.insertId });
+  } catch (err) {
+    console.error("receiveDeviceHealth error:", err);
+    return res.status(500).json({ message: "Server error", error: String(err?.message || err) });
+  }
+}
+
+// GET /device_health                  → ultimul snapshot al fiecărui controller (vedere pe toată flota)
+// GET /device_health?controller_id=3  → istoricul unui controller, cele mai noi primele
+// doar controller-ele din serele utilizatorului
+export async function listDeviceHealth(req, res) {
+  const controllerId = req.query.controller_id ? Number(req.query.controller_id) : null;
+
+  try {
+    const userUid = req.user.uid;
+
+    const baseSelect = `
+      SELECT h.id, h.controller_id, c.device_uid, h.uptime_s, h.heap_free, h.heap_min, h.rssi,
+             h.bounds, h.counters, h.histograms, h.received_at
+      FROM device_health h
+      JOIN controllers c ON c.id = h.controller_id
+      JOIN greenhouses g ON g.id = c.greenhouse_id
+      WHERE g.owner_user_id = ?
+    `;
+
+    const sql = controllerId
+      ? `${baseSelect} AND h.controller_id = ? ORDER BY h.received_at DESC LIMIT 100`
+      : `${baseSelect} AND h.id = (SELECT MAX(id) FROM device_health WHERE controller_id = h.controller_id)
+         ORDER BY c.device_uid`;
+
+    const params = controllerId ? [userUid, controllerId] : [userUid];
+    const [rows] = await pool.query(sql, params);
+
+    res.json(rows.map((h) => {
+      const bounds = parseJson(h.bounds);
+      const histograms = parseJson(h.histograms);
+      // p95 per histogramă, ca să se vadă dintr-o privire device-urile lente
+      const p95_ms = {};
+      for (const [name, hist] of Object.entries(histograms)) {
+        p95_ms[name] = histogramQuantile(Array.isArray(bounds) ? bounds : [], hist, 0.95);
+      }
+      return {
+        id: String(h.id),
+        controller_id: String(h.controller_id),
+        device_uid: h.device_uid,
+        uptime_s: h.uptime_s,
+        heap_free: h.heap_free,
+        heap_min: h.heap_min,
+        rssi: h.rssi,
+        counters: parseJson(h.counters),
+        histograms,
+        bounds,
+        p95_ms,
+        received_at: toIso(h.received_at),
+      };
+    }));
+  } catch (err) {
+    console.error("listDeviceHealth error:", err);
+    res.status(500).json({ error: "Server error" });
+  }
+}
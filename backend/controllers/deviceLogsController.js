@@ -0,0 +1,81 @@
+import pool from "../config/db.js";
+import { takeCommandAck } from "../services/deviceCommands.js";
+
+// dimensiunea maximă păstrată dintr-un log trimis de device
+const MAX_LOG_BYTES = 16 * 1024;
+
+/**
+ * Log trimis de device (text, o linie "ticks NIVEL mesaj" per înregistrare),
+ * de ex. ring buffer-ul salvat la o eroare fatală și urcat la pornirea următoare.
+ * Protejat cu API Key (x-api-key în header). Confirmarea de comandă
+ * (X-Command-Ack) venită pe acest request e salvată ca pe celelalte rute:
+ * la pornire după un crash, ack-ul din initial_sync() pleacă pe upload-ul logului.
+ *
+ * POST /api/data/:device_uid/logs?reason=crash
+ * Content-Type: text/plain
+ */
+export async function receiveDeviceLog(req, res) {
+  const { device_uid } = req.params;
+  const content = typeof req.body === "string" ? req.body : "";
+  if (!content) {
+    return res.status(400).json({ message: "Body must be a non-empty text/plain log." });
+  }
+  const reason = String(req.query.reason || "manual").slice(0, 32);
+
+  try {
+    const [ctrl] = await pool.query(
+      "SELECT id, acked_version FROM controllers WHERE device_uid = ? LIMIT 1",
+      [device_uid]
+    );
+    if (ctrl.length === 0) {
+      return res.status(404).json({ message: "Controller not found" });
+    }
+    await takeCommandAck(req, ctrl[0]);
+
+    const [r] = await pool.query(
+      "INSERT INTO device_logs (controller_id, reason, content, received_at) VALUES (?, ?, ?, NOW())",
+      [ctrl[0].id, reason, content.slice(0, MAX_LOG_BYTES)]
+    );
+    return res.status(200).json({ message: "Log stored", id: r.insertId });
+  } catch (err) {
+    console.error("receiveDeviceLog error:", err);
+    return res.status(500).json({ message: "Server error", error: String(err?.message || err) });
+  }
+}
+
+// GET /device_logs
+// GET /device_logs?controller_id=3
+// logurile primite de la controller-ele din serele utilizatorului, cele mai noi primele
+export async function listDeviceLogs(req, res) {
+  const controllerId = req.query.controller_id ? Number(req.query.controller_id) : null;
+
+  try {
+    const userUid = req.user.uid;
+
+    const baseSelect = `
+      SELECT l.id, l.controller_id, l.reason, l.content, l.received_at
+      FROM device_logs l
+      JOIN controllers c ON c.id = l.controller_id
+      JOIN greenhouses g ON g.id = c.greenhouse_id
+      WHERE g.owner_user_id = ?
+    `;
+
+    const sql = controllerId
+      ? `${baseSelect} AND l.controller_id = ? ORDER BY l.received_at DESC LIMIT 50`
+      : `${baseSelect} ORDER BY l.received_at DESC LIMIT 50`;
+
+    const params = controllerId ? [userUid, controllerId] : [userUid];
+    const [rows] = await pool.query(sql, params);
+
+    res.json(rows.map((l) => ({
+      id: String(l.id),
+      controller_id: String(l.controller_id),
+      reason: l.reason,
+      content: l.content,
+      received_at: l.received_at instanceof Date ? l.received_at.toISOString() : l.received_at,
+    })));
+  } catch (err) {
+    console.error("listDeviceLogs error:", err);
+    res.status(500).json({ error: "Server error" });
+  }
+}
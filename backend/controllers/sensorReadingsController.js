@@ -42,3 +42,54 @@ export async function listSensorReadings(req, res) {
     res.status(500).json({ error: "Server error" });
   }
 }
+
+// GET /sensors_readings/summaries
+// GET /sensors_readings/summaries?sensor_id=1
+// sumarele pe ferestre trimise de device (min/max/mean/count)
+export async function listSensorSummaries(req, res) {
+  const sensorId = req.query.sensor_id ? Number(req.query.sensor_id) : null;
+
+  try {
+    const userUid = req.user.uid;
+
+    const baseSelect = `
+      SELECT
+        m.id,
+        m.sensor_id,
+        m.window_start,
+        m.window_seconds,
+        m.min_value,
+        m.max_value,
+        m.avg_value,
+        m.sample_count
+      FROM sensor_summaries m
+      JOIN sensors s ON m.sensor_id = s.id
+      JOIN controllers c ON c.id = s.controller_id
+      JOIN greenhouses g ON g.id = c.greenhouse_id
+      WHERE g.owner_user_id = ?
+    `;
+
+    const sql = sensorId
+      ? `${baseSelect} AND m.sensor_id = ? ORDER BY m.window_start ASC`
+      : `${baseSelect} ORDER BY m.window_start ASC`;
+
+    const params = sensorId ? [userUid, sensorId] : [userUid];
+    const [rows] = await pool.query(sql, params);
+
+    const summaries = rows.map((m) => ({
+      id: String(m.id),
+      sensor_id: String(m.sensor_id),
+      window_start: m.window_start instanceof Date ? m.window_start.toISOString() : m.window_start,
+      window_seconds: Number(m.window_seconds),
+      min: Number(m.min_value),
+      max: Number(m.max_value),
+      mean: Number(m.avg_value),
+      count: Number(m.sample_count),
+    }));
+
+    res.json(summaries);
+  } catch (err) {
+    console.error("listSensorSummaries error:", err);
+    res.status(500).json({ error: "Server error" });
+  }
+}
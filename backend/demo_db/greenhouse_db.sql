@@ -36,7 +36,8 @@ CREATE TABLE `actuators` (
   `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
   `serial_number` varchar(100) DEFAULT 'nespecificat',
   `technical_status` enum('functional','unfunctional') NOT NULL DEFAULT 'functional',
-  `status` enum('on','off') DEFAULT 'off'
+  `status` enum('on','off') DEFAULT 'off',
+  `reported_status` enum('on','off') DEFAULT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 --
@@ -196,7 +197,10 @@ CREATE TABLE `controllers` (
   `label` varchar(128) DEFAULT NULL,
   `location` varchar(128) DEFAULT NULL,
   `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
-  `greenhouse_id` bigint(20) UNSIGNED DEFAULT NULL
+  `greenhouse_id` bigint(20) UNSIGNED DEFAULT NULL,
+  `report_policy` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL CHECK (json_valid(`report_policy`)),
+  `acked_version` bigint(20) UNSIGNED DEFAULT NULL,
+  `acked_at` datetime DEFAULT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 --
@@ -220,6 +224,39 @@ CREATE TABLE `controller_greenhouse` (
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `device_logs`
+--
+
+CREATE TABLE `device_logs` (
+  `id` bigint(20) UNSIGNED NOT NULL,
+  `controller_id` bigint(20) UNSIGNED NOT NULL,
+  `reason` varchar(32) NOT NULL DEFAULT 'manual',
+  `content` mediumtext NOT NULL,
+  `received_at` datetime NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `device_health`
+--
+
+CREATE TABLE `device_health` (
+  `id` bigint(20) UNSIGNED NOT NULL,
+  `controller_id` bigint(20) UNSIGNED NOT NULL,
+  `uptime_s` int(10) UNSIGNED DEFAULT NULL,
+  `heap_free` int(10) UNSIGNED DEFAULT NULL,
+  `heap_min` int(10) UNSIGNED DEFAULT NULL,
+  `rssi` smallint(6) DEFAULT NULL,
+  `bounds` text NOT NULL,
+  `counters` text NOT NULL,
+  `histograms` mediumtext NOT NULL,
+  `received_at` datetime NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `greenhouses`
 --
@@ -1747,6 +1784,23 @@ INSERT INTO `sensor_readings` (`id`, `sensor_id`, `value`, `timestamp`) VALUES
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `sensor_summaries`
+--
+
+CREATE TABLE `sensor_summaries` (
+  `id` bigint(20) UNSIGNED NOT NULL,
+  `sensor_id` bigint(20) UNSIGNED NOT NULL,
+  `window_start` datetime NOT NULL,
+  `window_seconds` int(10) UNSIGNED NOT NULL,
+  `min_value` decimal(10,4) NOT NULL,
+  `max_value` decimal(10,4) NOT NULL,
+  `avg_value` decimal(10,4) NOT NULL,
+  `sample_count` int(10) UNSIGNED NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `users`
 --
@@ -1834,6 +1888,20 @@ ALTER TABLE `controller_greenhouse`
   ADD PRIMARY KEY (`controller_id`,`greenhouse_id`),
   ADD KEY `idx_cg_greenhouse` (`greenhouse_id`);
 
+--
+-- Indexes for table `device_logs`
+--
+ALTER TABLE `device_logs`
+  ADD PRIMARY KEY (`id`),
+  ADD KEY `idx_device_logs_controller_time` (`controller_id`,`received_at`);
+
+--
+-- Indexes for table `device_health`
+--
+ALTER TABLE `device_health`
+  ADD PRIMARY KEY (`id`),
+  ADD KEY `idx_device_health_controller_time` (`controller_id`,`received_at`);
+
 --
 -- Indexes for table `greenhouses`
 --
@@ -1862,6 +1930,13 @@ ALTER TABLE `sensor_readings`
   ADD PRIMARY KEY (`id`),
   ADD KEY `idx_readings_sensor_time` (`sensor_id`,`timestamp`);
 
+--
+-- Indexes for table `sensor_summaries`
+--
+ALTER TABLE `sensor_summaries`
+  ADD PRIMARY KEY (`id`),
+  ADD KEY `idx_summaries_sensor_time` (`sensor_id`,`window_start`);
+
 --
 -- Indexes for table `users`
 --
@@ -1910,6 +1985,18 @@ ALTER TABLE `contacts`
 ALTER TABLE `controllers`
   MODIFY `id` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=4;
 
+--
+-- AUTO_INCREMENT for table `device_logs`
+--
+ALTER TABLE `device_logs`
+  MODIFY `id` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT;
+
+--
+-- AUTO_INCREMENT for table `device_health`
+--
+ALTER TABLE `device_health`
+  MODIFY `id` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT for table `greenhouses`
 --
@@ -1934,6 +2021,12 @@ ALTER TABLE `sensors`
 ALTER TABLE `sensor_readings`
   MODIFY `id` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=4245;
 
+--
+-- AUTO_INCREMENT for table `sensor_summaries`
+--
+ALTER TABLE `sensor_summaries`
+  MODIFY `id` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT for table `users`
 --
@@ -1982,6 +2075,18 @@ ALTER TABLE `controller_greenhouse`
   ADD CONSTRAINT `fk_cg_controller` FOREIGN KEY (`controller_id`) REFERENCES `controllers` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
   ADD CONSTRAINT `fk_cg_greenhouse` FOREIGN KEY (`greenhouse_id`) REFERENCES `greenhouses` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
 
+--
+-- Constraints for table `device_logs`
+--
+ALTER TABLE `device_logs`
+  ADD CONSTRAINT `fk_device_logs_controller` FOREIGN KEY (`controller_id`) REFERENCES `controllers` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+--
+-- Constraints for table `device_health`
+--
+ALTER TABLE `device_health`
+  ADD CONSTRAINT `fk_device_health_controller` FOREIGN KEY (`controller_id`) REFERENCES `controllers` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
 --
 -- Constraints for table `outside_weather`
 --
@@ -1999,6 +2104,12 @@ ALTER TABLE `sensors`
 --
 ALTER TABLE `sensor_readings`
   ADD CONSTRAINT `fk_readings_sensor` FOREIGN KEY (`sensor_id`) REFERENCES `sensors` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+--
+-- Constraints for table `sensor_summaries`
+--
+ALTER TABLE `sensor_summaries`
+  ADD CONSTRAINT `fk_summaries_sensor` FOREIGN KEY (`sensor_id`) REFERENCES `sensors` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
 COMMIT;
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
@@ -1,6 +1,9 @@
-import { Router } from "express";
-import { receiveSensorData } from "../controllers/dataController.js";
+import express, { Router } from "express";
+import { receiveSensorData, receiveSensorBatch, receiveSensorSummary } from "../controllers/dataController.js";
+import { receiveDeviceLog } from "../controllers/deviceLogsController.js";
+import { receiveDeviceHealth } from "../controllers/deviceHealthController.js";
 import { verifyDeviceKey } from "../middleware/deviceAuth.js";
+import { rawReadings } from "../services/deviceWireFormat.js";
 
 const router = Router();
 
@@ -9,7 +12,38 @@ const router = Router();
  * Exemplu apel: POST /data/RPI_PICO_001
  * Header: x-api-key: <cheia din .env>
  * Body JSON: { "temp": 23.5, "humidity": 60, "soil_moisture": 250 }
+ * sau binar (Content-Type: application/x-greenhouse-readings, o înregistrare) – vezi services/deviceWireFormat.js
  */
-router.post("/:device_uid", verifyDeviceKey, receiveSensorData);
+router.post("/:device_uid", verifyDeviceKey, rawReadings, receiveSensorData);
+
+/**
+ * Citiri în lot, cu timestamp pus pe device
+ * Exemplu apel: POST /data/RPI_PICO_001/batch
+ * Body JSON: { "readings": [ { "timestamp": 1726130000, "temp": 23.5, "humidity": 60, "soil_moisture": 41 } ] }
+ * sau binar (Content-Type: application/x-greenhouse-readings)
+ */
+router.post("/:device_uid/batch", verifyDeviceKey, rawReadings, receiveSensorBatch);
+
+/**
+ * Sumare pe ferestre (min/max/mean/count pe canal) calculate pe device
+ * Exemplu apel: POST /data/RPI_PICO_001/summary
+ * Body JSON: { "timestamp": 1726130000, "window": 60, "temp": { "min": 22.9, "max": 23.6, "mean": 23.2, "count": 240 } }
+ * sau binar (Content-Type: application/x-greenhouse-readings, flags = 1)
+ */
+router.post("/:device_uid/summary", verifyDeviceKey, rawReadings, receiveSensorSummary);
+
+/**
+ * Log text trimis de device (ring buffer-ul din helpers/logger.py), de ex. după o eroare fatală
+ * Exemplu apel: POST /data/RPI_PICO_001/logs?reason=crash
+ * Content-Type: text/plain
+ */
+router.post("/:device_uid/logs", verifyDeviceKey, express.text({ limit: "16kb" }), receiveDeviceLog);
+
+/**
+ * Snapshot de telemetrie (contoare + histograme de latență, metrics.py din firmware)
+ * Exemplu apel: POST /data/RPI_PICO_001/health
+ * Body JSON: { "uptime": 3600, "heap_free": 121344, "rssi": -61, "counters": {...}, "histograms": {...} }
+ */
+router.post("/:device_uid/health", verifyDeviceKey, receiveDeviceHealth);
 
 export default router;
@@ -0,0 +1,9 @@
+import { Router } from "express";
+import { listDeviceHealth } from "../controllers/deviceHealthController.js";
+import { verifyFirebaseToken } from "../middleware/authMiddleware.js";
+
+const router = Router();
+
+router.get("/", verifyFirebaseToken, listDeviceHealth);
+
+export default router;
@@ -0,0 +1,9 @@
+import { Router } from "express";
+import { listDeviceLogs } from "../controllers/deviceLogsController.js";
+import { verifyFirebaseToken } from "../middleware/authMiddleware.js";
+
+const router = Router();
+
+router.get("/", verifyFirebaseToken, listDeviceLogs);
+
+export default router;
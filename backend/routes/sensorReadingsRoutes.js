@@ -1,9 +1,10 @@
 import { Router } from "express";
-import { listSensorReadings } from "../controllers/sensorReadingsController.js";
+import { listSensorReadings, listSensorSummaries } from "../controllers/sensorReadingsController.js";
 import { verifyFirebaseToken } from "../middleware/authMiddleware.js";
 
 const router = Router();
 
 router.get("/", verifyFirebaseToken, listSensorReadings);
+router.get("/summaries", verifyFirebaseToken, listSensorSummaries);
 
 export default router;
@@ -16,6 +16,8 @@ import usersDataRoutes from "./routes/usersDataRoutes.js";
 import contactsRoutes from "./routes/contactsRoutes.js";
 import deviceRoutes from "./routes/deviceRoutes.js";
 import actuatorSchedulesRoutes from "./routes/actuatorSchedulesRoutes.js";
+import deviceLogsRoutes from "./routes/deviceLogsRoutes.js";
+import deviceHealthRoutes from "./routes/deviceHealthRoutes.js";
 
 dotenv.config();
 
@@ -39,6 +41,8 @@ app.use("/users_data", usersDataRoutes);
 app.use("/contacts", contactsRoutes);
 app.use("/", deviceRoutes);
 app.use("/actuator_schedules", actuatorSchedulesRoutes);
+app.use("/device_logs", deviceLogsRoutes);
+app.use("/device_health", deviceHealthRoutes);
 
 
 // Server start
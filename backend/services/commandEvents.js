@@ -0,0 +1,33 @@
+// services/commandEvents.js
+import { EventEmitter } from "events";
+
+/**
+ * Canal intern pentru schimbări de stare a actuatoarelor.
+ * - notifyCommandsChanged(controllerId) e apelat după orice UPDATE pe actuators.status
+ * - waitForCommandsChange(controllerId, ms) ține un long-poll până la schimbare sau timeout
+ */
+const bus = new EventEmitter();
+bus.setMaxListeners(0); // câte un listener per device conectat în long-poll
+
+export function notifyCommandsChanged(controllerId) {
+  bus.emit(`controller:${controllerId}`);
+}
+
+// Rezolvă true la prima schimbare, false la timeout sau dacă `signal` e anulat
+export function waitForCommandsChange(controllerId, ms, signal) {
+  return new Promise((resolve) => {
+    const event = `controller:${controllerId}`;
+    const done = (changed) => {
+      clearTimeout(timer);
+      bus.off(event, onChange);
+      signal?.removeEventListener("abort", onAbort);
+      resolve(changed);
+    };
+    const onChange = () => done(true);
+    const onAbort = () => done(false);
+    const timer = setTimeout(() => done(false), ms);
+
+    bus.on(event, onChange);
+    signal?.addEventListener("abort", onAbort);
+  });
+}
@@ -0,0 +1,137 @@
+// services/deviceCommands.js
+import pool from "../config/db.js";
+
+/**
+ * Starea comenzilor pentru un controller, așa cum o primește device-ul:
+ * { pump: bool, fan: bool, version, report? }
+ * - folosită de GET /api/data/:device_uid/commands (long-poll / ETag)
+ * - și atașată la răspunsul upload-urilor de citiri (piggyback), ca device-ul
+ *   să nu mai facă un GET separat
+ * `version` e și numărul de secvență al comenzii: device-ul o aplică o singură
+ * dată și o confirmă (header X-Command-Ack) pe următorul request trimis.
+ */
+
+// emite o comandă pentru un actuator: întâi actuators.status, apoi rândul din
+// actuator_commands (care crește versiunea). Cititorii iau versiunea ÎNAINTE de
+// status (readCommandsVersion, apoi readCommands), deci cine vede versiunea nouă
+// vede și status-ul nou; invers, device-ul ar primi versiunea nouă cu starea
+// veche și, având-o deja, n-ar mai cere starea până la următoarea comandă.
+// → id-ul comenzii (noua versiune)
+export async function issueActuatorCommand({ actuatorId, command, level = null, issuedBy, expiresAt = null }) {
+  await pool.query("UPDATE actuators SET status = ? WHERE id = ?", [
+    command === "on" ? "on" : "off",
+    actuatorId,
+  ]);
+  const [r] = await pool.query(
+    `INSERT INTO actuator_commands
+     (actuator_id, command, level, issued_by_user_id, issued_at, expires_at)
+     VALUES (?, ?, ?, ?, NOW(), ?)`,
+    [actuatorId, command, level, issuedBy, expiresAt]
+  );
+  return r.insertId;
+}
+
+// citește starea curentă a actuatoarelor unui controller → { pump: bool, fan: bool }
+// (după readCommandsVersion, vezi issueActuatorCommand)
+export async function readCommands(controllerId) {
+  const [rows] = await pool.query(
+    `SELECT a.type, a.status 
+     FROM actuators a
+     WHERE a.controller_id = ?`,
+    [controllerId]
+  );
+
+  const response = {};
+  for (const r of rows) {
+    if (r.type === "pump") response.pump = r.status === "on";
+    if (r.type === "fan") response.fan = r.status === "on";
+  }
+  return response;
+}
+
+// versiunea stării comenzilor = id-ul ultimei comenzi emise pentru actuatoarele
+// controller-ului; crește monoton la fiecare schimbare de status (user sau cron)
+export async function readCommandsVersion(controllerId) {
+  const [rows] = await pool.query(
+    `SELECT COALESCE(MAX(ac.id), 0) AS version
+     FROM actuator_commands ac
+     JOIN actuators a ON a.id = ac.actuator_id
+     WHERE a.controller_id = ?`,
+    [controllerId]
+  );
+  return Number(rows[0].version);
+}
+
+// politica de raportare setată pentru controller (coloana report_policy, JSON)
+// → { temp: [abs, rel], humidity: [...], soil_moisture: [...], heartbeat, max_per_min, burst } sau null
+export function reportPolicy(raw) {
+  if (raw == null) return null;
+  if (typeof raw === "object") return raw;
+  try {
+    return JSON.parse(raw);
+  } catch {
+    return null;
+  }
+}
+
+// confirmarea din header-ul X-Command-Ack: "42;pump=1;fan=0"
+// → { version: 42, pump: true, fan: false } sau null dacă lipsește / e invalidă
+export function parseCommandAck(header) {
+  const match = /^\s*(\d+)((?:\s*;\s*\w+=[01])*)\s*$/.exec(header || "");
+  if (!match) return null;
+  const ack = { version: Number(match[1]) };
+  for (const [, name, value] of match[2].matchAll(/(\w+)=([01])/g)) {
+    if (name === "pump" || name === "fan") ack[name] = value === "1";
+  }
+  return ack;
+}
+
+// salvează confirmarea: versiunea aplicată (controllers.acked_version) și
+// starea reală a ieșirilor (actuators.reported_status); o confirmare mai veche
+// decât cea salvată e ignorată
+export async function recordCommandAck(controllerId, ack) {
+  const [r] = await pool.query(
+    `UPDATE controllers SET acked_version = ?, acked_at = NOW()
+     WHERE id = ? AND (acked_version IS NULL OR acked_version <= ?)`,
+    [ack.version, controllerId, ack.version]
+  );
+  if (r.affectedRows === 0) return;
+  for (const type of ["pump", "fan"]) {
+    if (!(type in ack)) continue;
+    await pool.query(
+      "UPDATE actuators SET reported_status = ? WHERE controller_id = ? AND type = ?",
+      [ack[type] ? "on" : "off", controllerId, type]
+    );
+  }
+}
+
+// confirmarea venită pe request (dacă există) e salvată; device-ul o trimite pe
+// ORICE request și o uită după orice răspuns 2xx, deci fiecare rută a device-ului
+// (upload, comenzi, logs, health) trebuie să apeleze funcția asta
+// → versiunea confirmată de device (null dacă nu a confirmat niciodată)
+export async function takeCommandAck(req, controller) {
+  const ack = parseCommandAck(req.get("x-command-ack"));
+  const saved = controller.acked_version == null ? null : Number(controller.acked_version);
+  if (!ack) return saved;
+  await recordCommandAck(controller.id, ack);
+  return saved == null ? ack.version : Math.max(saved, ack.version);
+}
+
+// corpul trimis device-ului: { pump, fan, version, report? }
+// `version` trebuie citită înaintea stării (vezi issueActuatorCommand)
+export async function commandsBody(controllerId, reportPolicyRaw, version) {
+  if (version == null) version = await readCommandsVersion(controllerId);
+  const body = { ...(await readCommands(controllerId)), version };
+  const report = reportPolicy(reportPolicyRaw);
+  if (report) body.report = report;
+  return body;
+}
+
+// comenzile atașate la răspunsul unui upload: complete doar cât timp device-ul
+// nu a confirmat versiunea curentă; după confirmare doar { version }, ca să nu
+// retrimitem comenzi deja aplicate
+export async function pendingCommands(controller, ackedVersion) {
+  const version = await readCommandsVersion(controller.id);
+  if (ackedVersion != null && ackedVersion >= version) return { version };
+  return commandsBody(controller.id, controller.report_policy, version);
+}
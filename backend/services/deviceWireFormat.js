@@ -0,0 +1,88 @@
+// services/deviceWireFormat.js
+import express from "express";
+
+/**
+ * Format binar compact pentru citirile trimise de device (WIRE_FORMAT = "binary" pe Pico).
+ * - header  <BBH   versiune, flags (0, sau FLAG_SUMMARY), număr de înregistrări
+ * - record  <Ifff  epoch secunde (0 = ora serverului), temp, humidity, soil (NaN = lipsă)
+ * - sumar   <IH + <Hfff pe canal (flags = FLAG_SUMMARY): începutul ferestrei
+ *           (0 = ora serverului), durata în secunde, apoi count, min, max, mean
+ *           pentru temp, humidity, soil
+ * Aceeași structură ca hardware/_pico/data_transfer/wire_format.py.
+ */
+export const WIRE_CONTENT_TYPE = "application/x-greenhouse-readings";
+
+const VERSION = 1;
+const HEADER_SIZE = 4;
+const RECORD_SIZE = 16;
+const FLAG_SUMMARY = 1;
+const SUMMARY_SIZE = 48;
+const FIELDS = ["temp", "humidity", "soil_moisture"];
+
+// parser pentru rutele de date: body-ul binar ajunge ca Buffer în req.body
+export const rawReadings = express.raw({ type: WIRE_CONTENT_TYPE, limit: "16kb" });
+
+export function isWireBody(body) {
+  return Buffer.isBuffer(body);
+}
+
+// verifică header-ul (versiune, flags, lungime) → numărul de înregistrări
+function readHeader(buf, flags, recordSize) {
+  if (buf.length < HEADER_SIZE) throw new Error("Wire body too short");
+  const version = buf.readUInt8(0);
+  const count = buf.readUInt16LE(2);
+  if (version !== VERSION) throw new Error(`Unsupported wire format version ${version}`);
+  if (buf.readUInt8(1) !== flags) throw new Error("Unexpected wire record type");
+  if (buf.length !== HEADER_SIZE + count * recordSize) throw new Error("Wire body length mismatch");
+  return count;
+}
+
+// float32 → 2 zecimale, ca valorile trimise în JSON
+function round2(val) {
+  return Math.round(val * 100) / 100;
+}
+
+// Buffer → [{ timestamp?, temp?, humidity?, soil_moisture? }], aceeași formă ca JSON-ul
+// Aruncă eroare dacă versiunea sau lungimea nu se potrivesc
+export function decodeReadings(buf) {
+  const count = readHeader(buf, 0, RECORD_SIZE);
+
+  const readings = [];
+  for (let i = 0, off = HEADER_SIZE; i < count; i++, off += RECORD_SIZE) {
+    const reading = {};
+    const ts = buf.readUInt32LE(off);
+    if (ts) reading.timestamp = ts;
+    FIELDS.forEach((name, k) => {
+      const val = buf.readFloatLE(off + 4 + k * 4);
+      if (!Number.isNaN(val)) reading[name] = round2(val);
+    });
+    readings.push(reading);
+  }
+  return readings;
+}
+
+// Buffer cu sumare de fereastră → [{ timestamp?, window, temp?: { min, max, mean, count }, ... }],
+// aceeași formă ca JSON-ul trimis la POST /data/:device_uid/summary
+export function decodeSummaries(buf) {
+  const count = readHeader(buf, FLAG_SUMMARY, SUMMARY_SIZE);
+
+  const summaries = [];
+  for (let i = 0, off = HEADER_SIZE; i < count; i++, off += SUMMARY_SIZE) {
+    const summary = { window: buf.readUInt16LE(off + 4) };
+    const ts = buf.readUInt32LE(off);
+    if (ts) summary.timestamp = ts;
+    FIELDS.forEach((name, k) => {
+      const at = off + 6 + k * 14;
+      const n = buf.readUInt16LE(at);
+      if (!n) return;
+      summary[name] = {
+        min: round2(buf.readFloatLE(at + 2)),
+        max: round2(buf.readFloatLE(at + 6)),
+        mean: round2(buf.readFloatLE(at + 10)),
+        count: n,
+      };
+    });
+    summaries.push(summary);
+  }
+  return summaries;
+}
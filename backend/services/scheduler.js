@@ -1,5 +1,7 @@
 // services/scheduler.js
 import pool from "../config/db.js";
+import { notifyCommandsChanged } from "./commandEvents.js";
+import { issueActuatorCommand } from "./deviceCommands.js";
 
 /**
  * Scheduler per actuator:
@@ -14,10 +16,11 @@ export async function runScheduler() {
 
   try {
     // 1️⃣ Preia toți actuatorii
-    const [actuators] = await pool.query(`SELECT id FROM actuators`);
+    const [actuators] = await pool.query(`SELECT id, controller_id FROM actuators`);
 
     for (const actuator of actuators) {
       const actuatorId = actuator.id;
+      const controllerId = actuator.controller_id;
 
       // 2️⃣ Verifică dacă are programări active acum (cu marjă 1 minut)
       const [activeSchedules] = await pool.query(
@@ -107,17 +110,14 @@ export async function runScheduler() {
         }
 
         if (shouldTurnOn) {
-          await pool.query(
-            `
-            INSERT INTO actuator_commands (actuator_id, command, issued_by_user_id, issued_at, expires_at)
-            VALUES (?, 'on', 'system_cron', NOW(), ?)
-            `,
-            [actuatorId, expiresAtStr]
-          );
-
-          await pool.query(`UPDATE actuators SET status = 'on' WHERE id = ?`, [
+          // status, apoi comanda (vezi issueActuatorCommand)
+          await issueActuatorCommand({
             actuatorId,
-          ]);
+            command: "on",
+            issuedBy: "system_cron",
+            expiresAt: expiresAtStr,
+          });
+          notifyCommandsChanged(controllerId);
 
           console.log(`✅ Actuator ${actuatorId} pornit (până la ${expiresAtStr})`);
         }
@@ -131,14 +131,8 @@ export async function runScheduler() {
       if (lastCmd && lastCmd.command === "on") {
         if (lastCmd.issued_by_user_id === "system_cron") {
           // OFF doar dacă ultima a fost de la cron
-          await pool.query(
-            `INSERT INTO actuator_commands (actuator_id, command, issued_by_user_id, issued_at)
-             VALUES (?, 'off', 'system_cron', NOW())`,
-            [actuatorId]
-          );
-          await pool.query(`UPDATE actuators SET status = 'off' WHERE id = ?`, [
-            actuatorId,
-          ]);
+          await issueActuatorCommand({ actuatorId, command: "off", issuedBy: "system_cron" });
+          notifyCommandsChanged(controllerId);
           console.log(
             `🛑 Actuator ${actuatorId} oprit (nu mai are programare activă)`
           );
@@ -146,14 +140,8 @@ export async function runScheduler() {
           // ultima comandă a fost de la user
           if (lastCmd.expires_at && new Date(lastCmd.expires_at) <= now) {
             // expirată → cron face OFF
-            await pool.query(
-              `INSERT INTO actuator_commands (actuator_id, command, issued_by_user_id, issued_at)
-               VALUES (?, 'off', 'system_cron', NOW())`,
-              [actuatorId]
-            );
-            await pool.query(`UPDATE actuators SET status = 'off' WHERE id = ?`, [
-              actuatorId,
-            ]);
+            await issueActuatorCommand({ actuatorId, command: "off", issuedBy: "system_cron" });
+            notifyCommandsChanged(controllerId);
             console.log(
               `🛑 Actuator ${actuatorId} oprit (comandă manuală expirat la ${lastCmd.expires_at})`
             );
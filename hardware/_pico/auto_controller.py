@@ -0,0 +1,85 @@
+# auto_controller.py
+# On/off switching logic for one actuator, used by auto_control() in main.py.
+import time
+
+
+class OnOffController:
+    """
+    Decides whether one actuator should be on.
+
+    Switches on when the value crosses `on_at` and off only when it crosses
+    back past `off_at`; the gap between them is the hysteresis band. If
+    on_at > off_at the actuator runs on high values (fan), otherwise on low
+    values (pump). A change is held back until the current state has lasted
+    `min_on` / `min_off` seconds, and the actuator is kept off once it has
+    been on for `max_duty` of the current `window` seconds.
+    """
+
+    def __init__(self, on_at, off_at, min_on=0, min_off=0, max_duty=1.0, window=3600):
+        self.on_at = on_at
+        self.off_at = off_at
+        self._high = on_at > off_at
+        self._min_on_ms = int(min_on * 1000)
+        self._min_off_ms = int(min_off * 1000)
+        self._window_ms = int(window * 1000)
+        self._max_on_ms = int(max_duty * window * 1000) if max_duty < 1 else None
+
+        self.state = False
+        self._since = None          # ticks_ms of the last switch (None: no dwell yet)
+        self._window_start = None
+        self._mark = None           # ticks_ms up to which on-time is counted
+        self._on_ms = 0             # on-time in the current window
+
+        self.switches = 0           # state changes made
+        self.held = 0               # changes held back by dwell time or duty cap
+
+    def sync(self, state, now=None):
+        """Adopts a state set elsewhere (manual command, boot sync)."""
+        if state is None or bool(state) == self.state:
+            return
+        now = time.ticks_ms() if now is None else now
+        self._account(now)
+        self.state = bool(state)
+        self._since = now
+
+    def update(self, value, now=None):
+        """Feeds one reading; returns the state the actuator should be in."""
+        now = time.ticks_ms() if now is None else now
+        self._account(now)
+
+        want = self.state
+        if self.state:
+            if (value < self.off_at) if self._high else (value > self.off_at):
+                want = False
+        elif (value > self.on_at) if self._high else (value < self.on_at):
+            want = True
+
+        capped = self._max_on_ms is not None and self._on_ms >= self._max_on_ms
+        if want and capped:
+            if not self.state:
+                self.held += 1
+            want = False
+
+        if want != self.state:
+            dwell = self._min_on_ms if self.state else self._min_off_ms
+            if not capped and self._since is not None and time.ticks_diff(now, self._since) < dwell:
+                self.held += 1
+                return self.state
+            self.state = want
+            self._since = now
+            self.switches += 1
+        return self.state
+
+    def duty(self):
+        """Fraction of the current window the actuator has been on."""
+        return self._on_ms / self._window_ms
+
+    def _account(self, now):
+        if self._window_start is None:
+            self._window_start = self._mark = now
+        if self.state:
+            self._on_ms += time.ticks_diff(now, self._mark)
+        self._mark = now
+        if time.ticks_diff(now, self._window_start) >= self._window_ms:
+            self._window_start = now
+            self._on_ms = 0
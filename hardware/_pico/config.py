@@ -1,14 +1,80 @@
 # ===== CONFIG =====
 # Sensor intervals
-SEND_INTERVAL = 1.0             # Seconds between sensor uploads
-CHANGE_THRESHOLD = 0.5          # Change detection threshold
-COMMAND_POLL_INTERVAL = 1.0     # Seconds between command checks
+SAMPLE_INTERVAL = 0.25          # Seconds between samples fed to auto control
+SEND_INTERVAL = 1.0             # Seconds between sensor uploads (newest sample, if changed)
+COMMAND_POLL_INTERVAL = 1.0     # Seconds between command checks (fallback polling, fastest)
+COMMAND_POLL_MAX = 30           # Seconds - slowest fallback polling while idle
+COMMAND_WAIT = 25               # Seconds the backend may hold a command long-poll
+COMMAND_LONG_POLL = True        # Keep a command long-poll open: a command lands within ~RTT (idle: ~1 request per COMMAND_WAIT)
+COMMAND_PIGGYBACK = True        # Also apply commands attached to upload responses (no extra request)
+COMMAND_FALLBACK_INTERVAL = 30  # Without the long-poll: seconds without commands (no upload) before a fallback poll
 GC_INTERVAL = 60                # Seconds between forced garbage collections
 WIFI_CHECK_INTERVAL = 10        # Seconds between WiFi checks
 
+# Reporting policy (which samples are uploaded; the backend may push overrides)
+REPORT_DEADBANDS = {            # Channel: (absolute, relative) change that triggers an upload
+    "temp": (0.5, 0.0),         #   °C
+    "humidity": (1.0, 0.02),    #   % RH, or 2 % of the last value if larger
+    "soil_moisture": (1.0, 0.02),
+}
+REPORT_HEARTBEAT = 300          # Seconds - upload at least this often, even with no change
+REPORT_MAX_PER_MIN = 12         # Change-driven uploads per minute, sustained
+REPORT_BURST = 3                # Change-driven uploads allowed back to back
+
+# Windowed aggregation (one min/max/mean/count summary per window instead of raw readings)
+AGGREGATE_WINDOW = 60           # Seconds per summary window (0 = off → raw readings via the reporting policy)
+ALERT_LIMITS = {                # Channel: (low, high); a sample outside is uploaded raw at once (None = no bound)
+    "temp": (5.0, 40.0),        #   °C
+    "humidity": (None, 95.0),   #   % RH
+    "soil_moisture": (15.0, None),
+}
+
+# Analog acquisition (read_sensors.py)
+ADC_SAMPLE_HZ = 160             # Timer-driven samples per second, per channel
+ADC_WINDOW = 16                 # Samples per channel filtered into one reading
+
+# Batched uploads (readings stamped on device, sent together)
+BATCH_MODE = False              # True → POST /api/data/{id}/batch instead of one POST per change
+BATCH_SIZE = 10                 # Flush when this many readings are buffered
+BATCH_INTERVAL = 30             # Seconds - flush a partial batch after this long
+
+# Offline store-and-forward (readings kept on flash during outages)
+OFFLINE_DIR = "/offline"        # Folder holding the ring log segments
+OFFLINE_SEGMENTS = 4            # Segment files in the ring
+OFFLINE_SEGMENT_RECORDS = 512   # Records per segment (16 bytes each → 8 KB)
+OFFLINE_DRAIN_BATCH = 20        # Stored readings uploaded per request after reconnect
+OFFLINE_DRAIN_INTERVAL = 2      # Seconds between drain uploads
+
+# Networking
+WIRE_FORMAT = "json"            # "json", or "binary" → compact struct records (data_transfer/wire_format.py)
+REQUEST_TIMEOUT = 10            # Seconds allowed for one HTTPS request/response
+DNS_TTL = 600                   # Seconds a resolved server address is reused
+RESPONSE_BUFFER_SIZE = 2048     # Bytes preallocated for one response (headers + body cap)
+
 # Auto control thresholds
 TEMP_THRESHOLD = 36.0           # °C - turn fan ON above this
 SOIL_MOISTURE_THRESHOLD = 30.0  # % - turn pump ON below this
 
+# Actuator switching (auto control)
+TEMP_HYSTERESIS = 1.0           # °C - fan turns OFF again below TEMP_THRESHOLD - this
+SOIL_HYSTERESIS = 5.0           # % - pump turns OFF again above SOIL_MOISTURE_THRESHOLD + this
+PUMP_MIN_ON = 10                # Seconds the pump stays ON before it may switch OFF
+PUMP_MIN_OFF = 60               # Seconds the pump stays OFF before it may switch ON
+FAN_MIN_ON = 30                 # Seconds the fan stays ON before it may switch OFF
+FAN_MIN_OFF = 30                # Seconds the fan stays OFF before it may switch ON
+PUMP_MAX_DUTY = 0.5             # Max fraction of DUTY_WINDOW the pump may run (1.0 = no cap)
+FAN_MAX_DUTY = 1.0              # Max fraction of DUTY_WINDOW the fan may run (1.0 = no cap)
+DUTY_WINDOW = 3600              # Seconds - window the duty caps apply to
+
+# Logging (helpers/logger.py)
+LOG_LEVEL = "INFO"              # Lowest level recorded: "DEBUG", "INFO", "WARN", "ERROR"
+LOG_ECHO = "WARN"               # Lowest level also printed to the serial console (prints block on USB CDC)
+LOG_BUFFER = 2048               # Bytes of RAM ring buffer holding the newest records
+LOG_CRASH_FILE = "/crash.log"   # Ring dumped here on a fatal error, uploaded at the next boot
+
+# Telemetry (metrics.py)
+HEALTH_INTERVAL = 300           # Seconds between health snapshots (counters, latency histograms) sent to the backend
+LAG_PROBE_MS = 100              # Milliseconds - sleep used to measure event-loop lag
+
 # Override behavior
 OVERRIDE_TIMEOUT = 300          # Seconds before auto-control resumes (5 min)
\ No newline at end of file
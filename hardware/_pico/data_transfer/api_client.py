@@ -1,13 +1,89 @@
+import time
 import uasyncio as asyncio
-import urequests
-import usocket as socket, ssl
-from data_transfer import secrets
+import metrics
+import ujson
+from data_transfer import secrets, dns_cache, wire_format
+from data_transfer.http_response import ResponseParser, HTTPError
+from config import REQUEST_TIMEOUT, RESPONSE_BUFFER_SIZE, COMMAND_WAIT
 
 BASE_URL = secrets.SERVER_URL
 DEVICE_ID = secrets.DEVICE_ID
 # header-ul de securitate (aceeași valoare ca în .env → DEVICE_API_KEY)
 HEADERS = secrets.HEADERS
 
+
+def _parse_url(url):
+    """(tls, host, port) from a base URL such as https://smartgreenhouse.online"""
+    scheme, _, rest = url.partition("://")
+    host, _, port = rest.partition("/")[0].partition(":")
+    tls = scheme == "https"
+    return tls, host, int(port) if port else (443 if tls else 80)
+
+
+TLS, HOST, PORT = _parse_url(BASE_URL)
+
+# network timings (ms) for the device-health snapshot
+dns_time = metrics.Histogram("dns")
+handshake_time = metrics.Histogram("handshake")     # TCP connect + TLS handshake
+request_time = metrics.Histogram("request")         # one request, send to last body byte
+
+
+# ===== REQUEST TEMPLATES =====
+# every header that never changes, encoded once; a request only splices in
+# its request line, Content-Length and body
+def request_line(method, path):
+    return f"{method} {path} HTTP/1.1\r\n".encode()
+
+
+_COMMON_HEADERS = (
+    f"Host: {HOST}\r\n"
+    f"X-Api-Key: {HEADERS.get('x-api-key')}\r\n"
+    f"User-Agent: PicoClient/1.0\r\n"
+    f"Accept: application/json\r\n"
+    f"Connection: keep-alive\r\n"
+).encode()
+_IF_NONE_MATCH = b"If-None-Match: "
+_COMMAND_ACK = b"X-Command-Ack: "
+_CRLF = b"\r\n"
+_HEAD_SPARE = 256       # request line + If-None-Match + X-Command-Ack + Content-* headers
+
+JSON = b"Content-Type: application/json\r\nContent-Length: "
+BINARY = b"Content-Type: " + wire_format.CONTENT_TYPE.encode() + b"\r\nContent-Length: "
+TEXT = b"Content-Type: text/plain; charset=utf-8\r\nContent-Length: "
+
+_DATA_PATH = f"/api/data/{DEVICE_ID}"
+POST_DATA = request_line("POST", _DATA_PATH)
+POST_BATCH = request_line("POST", _DATA_PATH + "/batch")
+POST_SUMMARY = request_line("POST", _DATA_PATH + "/summary")
+POST_HEALTH = request_line("POST", _DATA_PATH + "/health")
+GET_COMMANDS = request_line("GET", _DATA_PATH + "/commands")
+WAIT_COMMANDS = request_line("GET", f"{_DATA_PATH}/commands?wait={COMMAND_WAIT}")
+
+
+def _put(mv, n, data):
+    end = n + len(data)
+    mv[n:end] = data
+    return end
+
+
+def _put_int(mv, n, value):
+    """Writes `value` as ASCII digits at `n` without building a string."""
+    start = n
+    while True:
+        mv[n] = 48 + value % 10
+        value //= 10
+        n += 1
+        if not value:
+            break
+    # digits went in least significant first
+    i, j = start, n - 1
+    while i < j:
+        mv[i], mv[j] = mv[j], mv[i]
+        i += 1
+        j -= 1
+    return n
+
+
 # async def api_post(payload):    # <--- real
 #     """
 #     Async POST wrapper. Uses urequests internally (blocking),
@@ -24,102 +100,317 @@ HEADERS = secrets.HEADERS
 #         return None
 
 
-async def api_post_manual(payload):
-    import ujson
-
-    host = "smartgreenhouse.online"
-    port = 443
-    path = f"/api/data/{DEVICE_ID}"
-
-    addr_info = socket.getaddrinfo(host, port)
-    addr = addr_info[0][-1]
-    s = socket.socket()
-    s.connect(addr)
-    s = ssl.wrap_socket(s)
-
-    api_key = HEADERS.get("x-api-key")
-    body = ujson.dumps(payload)
-    content_length = len(body)
-
-    req = (
-        f"POST {path} HTTP/1.1\r\n"
-        f"Host: {host}\r\n"
-        f"X-Api-Key: {api_key}\r\n"
-        f"User-Agent: PicoClient/1.0\r\n"
-        f"Accept: application/json\r\n"
-        f"Content-Type: application/json\r\n"
-        f"Content-Length: {content_length}\r\n"
-        f"Connection: close\r\n"
-        f"\r\n"
-        f"{body}"
-    )
-
-#     print("=== REQUEST SENT ===")
-#     print(req)
-
-    s.write(req.encode())
-
-    resp = b""
-    while True:
-        data = s.read(512)
-        if not data:
-            break
-        resp += data
-    s.close()
+# ===== PERSISTENT CONNECTION =====
+class Connection:
+    """
+    Keeps one TLS session open to the backend (HTTP/1.1 keep-alive).
+    The stream is opened on first use and reused for every request;
+    it is re-opened only when the server or the Wi-Fi drops it.
+    All I/O goes through uasyncio streams, so a slow backend only delays
+    the task awaiting the response, never the rest of the loop.
+    """
 
-#     print("=== RAW RESPONSE ===")
-#     print(resp.decode())
+    def __init__(self, host, port, timeout=REQUEST_TIMEOUT, tls=True):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.tls = tls
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()  # one request in flight per session
+        # every response is parsed inside this one buffer (hard size cap)
+        self._parser = ResponseParser(RESPONSE_BUFFER_SIZE)
+        # request headers are assembled in place here
+        self._head = bytearray(len(_COMMON_HEADERS) + _HEAD_SPARE)
+        self._head_mv = memoryview(self._head)
+        self.handshakes = 0     # TLS sessions opened so far
+        self.requests = 0       # requests sent so far
 
-    try:
-        body = resp.split(b"\r\n\r\n", 1)[1]
-        return ujson.loads(body)
-    except Exception:
-        return {"raw": resp}
-    
-    
-async def api_get_manual():
-    import ujson
+    async def _connect(self):
+        start = time.ticks_ms()
+        ip = dns_cache.resolve(self.host, self.port)
+        dns_time.since(start)
+        start = time.ticks_ms()
+        if self.tls:
+            self._reader, self._writer = await asyncio.open_connection(
+                ip, self.port, ssl=True, server_hostname=self.host
+            )
+        else:
+            self._reader, self._writer = await asyncio.open_connection(ip, self.port)
+        handshake_time.since(start)
+        self.handshakes += 1
+        metrics.count("handshakes")
 
-    host = "smartgreenhouse.online"
-    port = 443
-    path = f"/api/data/{DEVICE_ID}/commands"
+    def close(self):
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+        self._reader = None
+        self._writer = None
 
-    addr_info = socket.getaddrinfo(host, port)
-    addr = addr_info[0][-1]
-    s = socket.socket()
-    s.connect(addr)
-    s = ssl.wrap_socket(s)
+    async def request(self, line, body=None, etag=None, content_type=JSON):
+        """
+        Sends one request (`line`: a request_line(), e.g. POST_DATA) on the
+        open session and returns the response body as a memoryview into the
+        shared buffer; it stays valid only until the next request, so decode
+        it right away. The whole exchange must finish within `timeout`
+        seconds. A session that went stale while idle is re-opened once and
+        the request retried; a failure on a fresh session is raised. Non-2xx
+        responses raise HTTPError; the session stays open for the next request.
+        With `etag`, the request is conditional (If-None-Match) and an
+        unchanged resource returns None (304, no body). `body` is a str or a
+        bytes-like object sent as `content_type` (JSON or BINARY).
+        """
+        async with self._lock:
+            start = time.ticks_ms()
+            try:
+                resp = await asyncio.wait_for(
+                    self._request(line, body, etag, content_type), self.timeout
+                )
+            except HTTPError:
+                metrics.count("http_errors")
+                raise
+            except Exception:
+                # timeout or broken stream: the session state is unknown
+                self.close()
+                metrics.count("request_failures")
+                raise
+            request_time.since(start)
+            return resp
 
-    api_key = HEADERS.get("x-api-key")
+    async def _request(self, line, body, etag, content_type):
+        reused = self._writer is not None
+        try:
+            if not reused:
+                await self._connect()
+            return await self._exchange(line, body, etag, content_type)
+        except OSError:
+            self.close()
+            if not reused:
+                raise
+        metrics.count("stale_sessions")
+        await self._connect()
+        return await self._exchange(line, body, etag, content_type)
 
-    req = (
-        f"GET {path} HTTP/1.1\r\n"
-        f"Host: {host}\r\n"
-        f"X-Api-Key: {api_key}\r\n"
-        f"User-Agent: PicoClient/1.0\r\n"
-        f"Accept: application/json\r\n"
-        f"Connection: close\r\n"
-        f"\r\n"
-    )
+    def etag(self, known=None):
+        """ETag of the last response (see ResponseParser.etag)."""
+        return self._parser.etag(known)
 
-#     print("=== REQUEST SENT ===")
-#     print(req)
+    def build_head(self, line, body_len, etag, content_type, ack=None):
+        """Request line + headers in the session's head buffer; returns a view of them."""
+        mv = self._head_mv
+        need = len(line) + len(_COMMON_HEADERS) + 2
+        if etag is not None:
+            need += len(_IF_NONE_MATCH) + len(etag) + 2
+        if ack is not None:
+            need += len(_COMMAND_ACK) + len(ack) + 2
+        if body_len is not None:
+            need += len(content_type) + 12
+        if need > len(mv):
+            raise ValueError("request head too large")
+        n = _put(mv, 0, line)
+        n = _put(mv, n, _COMMON_HEADERS)
+        if etag is not None:
+            n = _put(mv, n, _IF_NONE_MATCH)
+            n = _put(mv, n, etag)
+            n = _put(mv, n, _CRLF)
+        if ack is not None:
+            n = _put(mv, n, _COMMAND_ACK)
+            n = _put(mv, n, ack)
+            n = _put(mv, n, _CRLF)
+        if body_len is not None:
+            n = _put(mv, n, content_type)
+            n = _put_int(mv, n, body_len)
+            n = _put(mv, n, _CRLF)
+        n = _put(mv, n, _CRLF)
+        return mv[:n]
 
-    s.write(req.encode())
+    async def _exchange(self, line, body, etag, content_type):
+        reader, writer = self._reader, self._writer
+
+        if isinstance(body, str):
+            body = body.encode()
+        ack = _ack      # rides on whichever request goes out next
+        # scatter write: prebuilt head, then the body as it is
+        body_len = None if body is None else len(body)
+        writer.write(self.build_head(line, body_len, etag, content_type, ack))
+        if body is not None:
+            writer.write(body)
+        await writer.drain()
+        self.requests += 1
+
+        p = self._parser
+        p.reset()
+        while not p.done:
+            k = await reader.readinto(p.space())
+            if not k:
+                p.eof()     # raises unless the body runs until close
+                break
+            p.feed(k)
+
+        if not p.keep_alive:
+            self.close()
+        if p.status == 304 and etag is not None:
+            _acked(ack)
+            return None
+        if not 200 <= p.status < 300:
+            raise HTTPError(p.status, bytes(p.body()[:128]))
+        _acked(ack)
+        return p.body()
+
+
+# shared by sensor_task, command_task and initial_sync
+client = Connection(HOST, PORT, tls=TLS)
+# dedicated session for the command long-poll, so a held request never
+# delays uploads on `client`
+commands_client = Connection(HOST, PORT, REQUEST_TIMEOUT + COMMAND_WAIT, TLS)
+
+
+def close_all():
+    client.close()
+    commands_client.close()
 
-    resp = b""
-    while True:
-        data = s.read(512)
-        if not data:
-            break
-        resp += data
-    s.close()
 
-#     print("=== RAW RESPONSE ===")
-#     print(resp.decode())
+# pending acknowledgement of the last applied command (X-Command-Ack value),
+# sent with the next request on either session until one gets an answer
+_ack = None
 
+
+def command_ack(seq, pump, fan):
+    """
+    Queues the acknowledgement of command `seq` with the actual relay
+    outputs; it travels as a header on the next request, so it costs no
+    extra round trip. A newer ack replaces one not yet sent.
+    """
+    global _ack
+    _ack = f"{seq};pump={int(pump)};fan={int(fan)}".encode()
+
+
+def _acked(ack):
+    global _ack
+    if ack is not None and _ack is ack:     # not replaced meanwhile
+        _ack = None
+
+
+# ETag of the last command state received (commands version), and when a
+# command state last arrived by any route (ticks_ms)
+_commands_etag = None
+_commands_seen = None
+
+
+def _seen():
+    global _commands_seen
+    _commands_seen = time.ticks_ms()
+
+
+def commands_age():
+    """Seconds since the backend last sent the command state (None: never)."""
+    if _commands_seen is None:
+        return None
+    return time.ticks_diff(time.ticks_ms(), _commands_seen) / 1000
+
+
+def piggybacked_commands(resp):
+    """
+    Commands the backend attached to an upload response ({"commands": {...}}),
+    or None if there are none or this version was already received.
+    """
+    global _commands_etag
+    commands = resp.get("commands") if isinstance(resp, dict) else None
+    if not commands:
+        return None
+    _seen()
+    version = commands.get("version")
+    if version is not None:
+        tag = f'"v{version}"'.encode()     # same form as the commands ETag
+        if tag == _commands_etag:
+            return None
+        _commands_etag = tag
+    return commands
+
+
+def _decode(resp):
     try:
-        body = resp.split(b"\r\n\r\n", 1)[1]
-        return ujson.loads(body)
+        return ujson.loads(resp)
     except Exception:
-        return {"raw": resp}
\ No newline at end of file
+        return {"raw": bytes(resp)}  # copy: the buffer is reused
+
+
+async def api_post_manual(payload):
+    resp = await client.request(POST_DATA, ujson.dumps(payload))
+    return _decode(resp)
+
+
+async def api_post_batch(payload):
+    resp = await client.request(POST_BATCH, ujson.dumps(payload))
+    return _decode(resp)
+
+
+async def api_post_readings(body, batch=False):
+    """Uploads a wire_format body: one reading, or several to /batch."""
+    resp = await client.request(POST_BATCH if batch else POST_DATA, body, content_type=BINARY)
+    return _decode(resp)
+
+
+async def api_post_summary(body):
+    """Uploads a window summary: a dict (JSON) or a wire_format summary body."""
+    if isinstance(body, dict):
+        resp = await client.request(POST_SUMMARY, ujson.dumps(body))
+    else:
+        resp = await client.request(POST_SUMMARY, body, content_type=BINARY)
+    return _decode(resp)
+
+
+async def api_post_logs(text, reason):
+    """Uploads log lines (helpers/logger.text()), e.g. the crash log at boot."""
+    line = request_line("POST", f"{_DATA_PATH}/logs?reason={reason}")
+    resp = await client.request(line, text, content_type=TEXT)
+    return _decode(resp)
+
+
+async def api_post_health(snapshot):
+    """Uploads a device-health snapshot (metrics.snapshot())."""
+    resp = await client.request(POST_HEALTH, ujson.dumps(snapshot))
+    return _decode(resp)
+
+
+async def api_get_manual():
+    global _commands_etag
+    resp = await client.request(GET_COMMANDS)
+    _seen()
+    _commands_etag = client.etag(_commands_etag)
+    return _decode(resp)
+
+
+async def api_poll_commands():
+    """
+    Conditional GET on the upload session (fallback when commands come
+    piggybacked on uploads): None if the state is unchanged (304).
+    """
+    global _commands_etag
+    resp = await client.request(GET_COMMANDS, etag=_commands_etag)
+    _seen()
+    if resp is None:
+        return None
+    _commands_etag = client.etag(_commands_etag)
+    return _decode(resp)
+
+
+async def api_wait_commands(wait):
+    """
+    Long-poll: the backend answers on the first command change or after
+    `wait` s. Sends the last known version, so an unchanged state comes back
+    as a bodyless 304 and None is returned without decoding anything.
+    """
+    global _commands_etag
+    line = WAIT_COMMANDS
+    if wait != COMMAND_WAIT:
+        line = request_line("GET", f"{_DATA_PATH}/commands?wait={wait}")
+    resp = await commands_client.request(line, etag=_commands_etag)
+    _seen()
+    if resp is None:
+        return None
+    _commands_etag = commands_client.etag(_commands_etag)
+    return _decode(resp)
@@ -0,0 +1,40 @@
+# dns_cache.py
+import time
+import usocket as socket
+from config import DNS_TTL
+from helpers import logger as log
+
+# host -> (ip, resolved_at_ms or None once expired); the entry outlives
+# its TTL as a fallback
+_cache = {}
+
+
+def resolve(host, port):
+    """
+    Returns the IP address for `host`, looking it up at most once per DNS_TTL.
+    If the lookup fails, the last known-good address is returned instead.
+    """
+    entry = _cache.get(host)
+    now = time.ticks_ms()
+    if entry and entry[1] is not None and time.ticks_diff(now, entry[1]) < DNS_TTL * 1000:
+        return entry[0]
+
+    try:
+        ip = socket.getaddrinfo(host, port)[0][-1][0]
+    except OSError as e:
+        if entry:
+            log.warn("[DNS] Lookup for %s failed (%s), using last known %s", host, e, entry[0])
+            return entry[0]
+        raise
+    _cache[host] = (ip, now)
+    return ip
+
+
+def invalidate():
+    """
+    Expires every cached address, so the next resolve() looks it up again
+    (call after a Wi-Fi reconnect). The addresses are kept as the fallback
+    for a lookup that fails, which is likeliest right after a reconnect.
+    """
+    for host in _cache:
+        _cache[host] = (_cache[host][0], None)
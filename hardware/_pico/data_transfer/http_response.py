@@ -0,0 +1,241 @@
+# http_response.py
+# Incremental HTTP/1.1 response parser working over one preallocated buffer.
+
+# parser states
+_HEAD = 0
+_BODY = 1           # Content-Length body
+_UNTIL_CLOSE = 2    # no framing: body ends when the server closes
+_CHUNK_SIZE = 3
+_CHUNK_DATA = 4
+_TRAILER = 5
+_DONE = 6
+
+
+class HTTPError(Exception):
+    """
+    Raised for a non-2xx response. `status` holds the code, `body` a copy of
+    the (possibly truncated) response body for logging.
+    """
+
+    def __init__(self, status, body=b""):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.body = body
+
+
+# ===== IN-PLACE PARSING HELPERS =====
+def _find_crlf(buf, start, end):
+    """Index of the next CRLF in buf[start:end], or -1."""
+    for i in range(start, end - 1):
+        if buf[i] == 13 and buf[i + 1] == 10:
+            return i
+    return -1
+
+
+def _match(buf, start, end, word):
+    """True if buf[start:end] begins with `word` (lowercase bytes), ignoring case."""
+    if end - start < len(word):
+        return False
+    for i in range(len(word)):
+        if buf[start + i] | 0x20 != word[i]:
+            return False
+    return True
+
+
+def _header_value(buf, start, end, name):
+    """Offset of the value if the line buf[start:end] is header `name`, else -1."""
+    k = len(name)
+    if end - start <= k or buf[start + k] != 58 or not _match(buf, start, end, name):  # ':'
+        return -1
+    i = start + k + 1
+    while i < end and buf[i] == 32:
+        i += 1
+    return i
+
+
+def _parse_int(buf, start, end, base=10):
+    """Parses a decimal/hex number in place, stopping at the first non-digit."""
+    value = 0
+    for i in range(start, end):
+        c = buf[i] | 0x20
+        if 48 <= c <= 57:
+            d = c - 48
+        elif base == 16 and 97 <= c <= 102:
+            d = c - 87
+        else:
+            break
+        value = value * base + d
+    return value
+
+
+# ===== PARSER =====
+class ResponseParser:
+    """
+    Parses one response at a time as its bytes arrive. The caller reads
+    straight into `space()` and reports the byte count with `feed()`; the
+    status code and selected headers are available as soon as the head is
+    complete, and the body is de-framed in place (chunks included).
+
+        p.reset()
+        while not p.done:
+            k = await reader.readinto(p.space())
+            if not k:
+                p.eof()
+                break
+            p.feed(k)
+        data = p.body()
+    """
+
+    def __init__(self, size):
+        self._buf = bytearray(size)
+        self._mv = memoryview(self._buf)
+        self.reset()
+
+    def reset(self):
+        self._state = _HEAD
+        self._n = 0             # bytes in the buffer
+        self._pos = 0           # parse position
+        self._start = 0         # decoded body is buf[_start:_end]
+        self._end = 0
+        self._chunk = 0         # size of the chunk being read
+        # status line + selected headers
+        self.status = 0
+        self.content_length = -1
+        self.chunked = False
+        self.keep_alive = True
+        self._etag = None       # (start, end) of the ETag value in the buffer
+
+    @property
+    def done(self):
+        return self._state == _DONE
+
+    @property
+    def head_done(self):
+        return self._state != _HEAD
+
+    def space(self):
+        """Free part of the buffer to read into; raises when the cap is hit."""
+        if self._n >= len(self._buf):
+            raise ValueError("response exceeds buffer size")
+        return self._mv[self._n:]
+
+    def feed(self, k):
+        """Accounts for `k` new bytes and parses as far as they allow."""
+        self._n += k
+        while self._step():
+            pass
+        return self._state == _DONE
+
+    def eof(self):
+        """The server closed the stream; only legal for unframed bodies."""
+        if self._state == _UNTIL_CLOSE:
+            self._end = self._n
+            self.keep_alive = False
+            self._state = _DONE
+        elif self._state != _DONE:
+            raise OSError("connection closed by server")
+
+    def body(self):
+        """Decoded body; valid until the next reset()."""
+        return self._mv[self._start:self._end]
+
+    def etag(self, known=None):
+        """
+        ETag of the response as bytes, or None. Returns `known` itself when
+        the value is unchanged, so repeated polls allocate nothing.
+        """
+        if self._etag is None:
+            return None
+        start, end = self._etag
+        if known is not None and len(known) == end - start:
+            buf = self._buf
+            for i in range(end - start):
+                if buf[start + i] != known[i]:
+                    break
+            else:
+                return known
+        return bytes(self._mv[start:end])
+
+    def _step(self):
+        """Advances one parse step; returns False when more bytes are needed."""
+        buf, state, pos, n = self._buf, self._state, self._pos, self._n
+
+        if state == _HEAD or state == _CHUNK_SIZE or state == _TRAILER:
+            eol = _find_crlf(buf, pos, n)
+            if eol < 0:
+                return False
+            self._pos = eol + 2
+            if state == _HEAD:
+                self._head_line(pos, eol)
+            elif state == _CHUNK_SIZE:
+                self._chunk = _parse_int(buf, pos, eol, 16)
+                self._state = _CHUNK_DATA if self._chunk else _TRAILER
+            elif eol == pos:
+                self._state = _DONE
+            return self._state != _DONE
+
+        if state == _BODY:
+            if n < self._end:
+                return False
+            self._state = _DONE
+            return False
+
+        if state == _CHUNK_DATA:
+            size = self._chunk
+            if n < pos + size + 2:
+                return False
+            # move the chunk down onto the decoded body, then the unread tail
+            end = self._end
+            buf[end:end + size] = self._mv[pos:pos + size]
+            end += size
+            pos += size + 2
+            buf[end:end + n - pos] = self._mv[pos:n]
+            self._n = end + n - pos
+            self._pos = self._end = end
+            self._state = _CHUNK_SIZE
+            return True
+
+        return False
+
+    def _head_line(self, pos, eol):
+        buf = self._buf
+        if self.status == 0:
+            if not _match(buf, pos, eol, b"http/") or eol - pos < 12:
+                raise ValueError("bad status line")
+            self.status = _parse_int(buf, pos + 9, pos + 12)
+            return
+        if eol > pos:
+            v = _header_value(buf, pos, eol, b"content-length")
+            if v >= 0:
+                self.content_length = _parse_int(buf, v, eol)
+            v = _header_value(buf, pos, eol, b"transfer-encoding")
+            if v >= 0 and _match(buf, v, eol, b"chunked"):
+                self.chunked = True
+            v = _header_value(buf, pos, eol, b"connection")
+            if v >= 0 and _match(buf, v, eol, b"close"):
+                self.keep_alive = False
+            v = _header_value(buf, pos, eol, b"etag")
+            if v >= 0:
+                self._etag = (v, eol)
+            return
+
+        # empty line: head complete, choose how the body is framed
+        start = self._start = self._end = eol + 2
+        if 100 <= self.status < 200 and self.status != 101:
+            # interim response (100 Continue, 103 ...): drop it and parse
+            # the final response that follows on the same stream
+            n = self._n - start
+            buf[:n] = self._mv[start:self._n]
+            self.reset()
+            self._n = n
+        elif self.status in (204, 304) or self.status == 101:
+            self._state = _DONE
+        elif self.chunked:
+            self._state = _CHUNK_SIZE
+        elif self.content_length >= 0:
+            self._end = start + self.content_length
+            if self._end > len(buf):
+                raise ValueError("response exceeds buffer size")
+            self._state = _BODY
+        else:
+            self._state = _UNTIL_CLOSE
@@ -0,0 +1,188 @@
+# offline_log.py
+import os
+import struct
+from data_transfer.upload_batch import reading_dict
+from data_transfer.wire_format import HEADER_SIZE, pack_header
+
+_HDR = "<I"         # segment header: generation number
+_HDR_SIZE = 4
+_REC = "<Ifff"      # record: epoch seconds (0 = unknown), temp, humidity, soil (= wire_format.RECORD)
+_REC_SIZE = 16
+_CUR = "<II"        # cursor file: head generation, records already uploaded
+
+
+class OfflineLog:
+    """
+    Append-only ring log of readings on flash, filled while the backend is
+    unreachable and drained oldest first once it is back.
+
+    The log is split into `segments` files of `per_segment` packed records.
+    Appends go to the newest segment; a full segment rotates to the next slot,
+    so writes cycle over every slot instead of rewriting one file, and when
+    all slots are in use the oldest segment is overwritten. Each segment
+    starts with a generation number, so order survives a reboot; the upload
+    cursor is saved in a small file after every drained batch.
+    """
+
+    def __init__(self, root, segments, per_segment, batch):
+        self.root = root
+        self.segments = segments
+        self.per_segment = per_segment
+        self.batch = batch                          # records per peek()
+        self.dropped = 0                            # records overwritten while full
+        self._gen = [0] * segments                  # 0 = slot unused
+        self._count = [0] * segments
+        self._head = 0                              # slot holding the oldest records
+        self._head_off = 0                          # records of head already uploaded
+        self._tail = 0                              # slot being appended to
+        self._next_gen = 1
+        self._peeked = 0
+        self._rec = bytearray(_REC_SIZE)
+        self._buf = bytearray(HEADER_SIZE + _REC_SIZE * batch)    # records after a wire header
+        try:
+            os.mkdir(root)
+        except OSError:
+            pass    # already exists
+        self._recover()
+
+    # ===== FILES =====
+    def _path(self, i):
+        return f"{self.root}/seg{i}.bin"
+
+    def _cursor_path(self):
+        return f"{self.root}/cursor.bin"
+
+    def _recover(self):
+        hdr = bytearray(_HDR_SIZE)
+        for i in range(self.segments):
+            try:
+                size = os.stat(self._path(i))[6]
+                with open(self._path(i), "rb") as f:
+                    f.readinto(hdr)
+            except OSError:
+                continue
+            self._gen[i] = struct.unpack(_HDR, hdr)[0]
+            self._count[i] = (size - _HDR_SIZE) // _REC_SIZE
+        live = [i for i in range(self.segments) if self._gen[i]]
+        if not live:
+            return
+        self._head = min(live, key=lambda i: self._gen[i])
+        self._tail = max(live, key=lambda i: self._gen[i])
+        self._next_gen = self._gen[self._tail] + 1
+        try:
+            with open(self._cursor_path(), "rb") as f:
+                gen, off = struct.unpack(_CUR, f.read(8))
+            if gen == self._gen[self._head]:
+                self._head_off = min(off, self._count[self._head])
+        except (OSError, ValueError):
+            pass
+
+    def _start_segment(self, i):
+        self._gen[i] = self._next_gen
+        self._next_gen += 1
+        self._count[i] = 0
+        with open(self._path(i), "wb") as f:
+            f.write(struct.pack(_HDR, self._gen[i]))
+
+    def _drop_segment(self, i):
+        self._gen[i] = 0
+        self._count[i] = 0
+        try:
+            os.remove(self._path(i))
+        except OSError:
+            pass
+
+    def _save_cursor(self):
+        try:
+            if self._head_off:
+                with open(self._cursor_path(), "wb") as f:
+                    f.write(struct.pack(_CUR, self._gen[self._head], self._head_off))
+            else:
+                os.remove(self._cursor_path())
+        except OSError:
+            pass
+
+    # ===== API =====
+    @property
+    def pending(self):
+        """Records stored and not yet uploaded."""
+        total = 0
+        for i in range(self.segments):
+            if self._gen[i]:
+                total += self._count[i]
+        return total - self._head_off
+
+    def append(self, ts, temp, humidity, soil):
+        """Stores one reading; None values are stored as NaN."""
+        t = self._tail
+        if not self._gen[t]:
+            self._start_segment(t)
+        elif self._count[t] >= self.per_segment:
+            t = (t + 1) % self.segments
+            if self._gen[t]:
+                # every slot in use: overwrite the oldest segment
+                self.dropped += self._count[t] - self._head_off
+                self._head = (t + 1) % self.segments if self.segments > 1 else t
+                self._head_off = 0
+                # a batch peek()ed from it (upload in flight) is gone too:
+                # its commit() must not advance the new head
+                self._peeked = 0
+                self._save_cursor()
+            self._tail = t
+            self._start_segment(t)
+
+        nan = float("nan")
+        struct.pack_into(_REC, self._rec, 0, ts or 0,
+                         nan if temp is None else temp,
+                         nan if humidity is None else humidity,
+                         nan if soil is None else soil)
+        with open(self._path(t), "ab") as f:
+            f.write(self._rec)
+        self._count[t] += 1
+
+    def peek(self, binary=False):
+        """
+        Reads up to `batch` of the oldest records and returns them as a
+        /batch payload (a wire_format body if `binary`), or None when the log
+        is empty. Call commit() once the upload succeeded; otherwise the same
+        records are returned again.
+        """
+        i = self._head
+        avail = self._count[i] - self._head_off if self._gen[i] else 0
+        if avail <= 0:
+            return None
+        k = min(avail, self.batch)
+        end = HEADER_SIZE + k * _REC_SIZE
+        mv = memoryview(self._buf)
+        with open(self._path(i), "rb") as f:
+            f.seek(_HDR_SIZE + self._head_off * _REC_SIZE)
+            f.readinto(mv[HEADER_SIZE:end])
+        self._peeked = k
+        if binary:
+            # records on flash are already in wire layout
+            pack_header(self._buf, k)
+            return mv[:end]
+        readings = []
+        for j in range(k):
+            readings.append(reading_dict(*struct.unpack_from(_REC, self._buf, HEADER_SIZE + j * _REC_SIZE)))
+        return {"readings": readings}
+
+    def commit(self):
+        """
+        Marks the records returned by the last peek() as uploaded; returns
+        how many (0 if their segment was overwritten meanwhile).
+        """
+        i = self._head
+        n = self._peeked
+        self._head_off += n
+        self._peeked = 0
+        if self._head_off >= self._count[i]:
+            if i == self._tail:
+                # fully drained: start the next outage in the next slot
+                self._head = self._tail = (i + 1) % self.segments
+            else:
+                self._head = (i + 1) % self.segments
+            self._drop_segment(i)
+            self._head_off = 0
+        self._save_cursor()
+        return n
@@ -0,0 +1,125 @@
+# report_policy.py
+import time
+
+# channel order of due() / sent() arguments and of the deadband keys
+CHANNELS = ("temp", "humidity", "soil_moisture")
+
+
+class ReportPolicy:
+    """
+    Decides which samples are worth uploading.
+
+    A channel has changed when it moved more than max(absolute, relative ×
+    last sent value) from what was last sent. Changes are rate limited by a
+    token bucket (`max_per_min` sustained, `burst` back to back); a change
+    held back stays pending and goes out when a token is free. Whatever
+    happens, a reading is sent at least every `heartbeat` seconds so a
+    stable greenhouse still shows as online.
+    """
+
+    def __init__(self, deadbands, heartbeat, max_per_min, burst):
+        self._abs = [0.0] * 3
+        self._rel = [0.0] * 3
+        self._sent = [None] * 3
+        self._last = None           # ticks_ms of the last upload
+        self._reason = 0            # what made the last due() True: 0 heartbeat, 1 change
+        self._tokens = 0.0
+        self._refilled = time.ticks_ms()
+        self.configure(deadbands)
+        self.configure({"heartbeat": heartbeat, "max_per_min": max_per_min, "burst": burst})
+        self._tokens = float(self.burst)
+
+        self.samples = 0            # samples offered to due()
+        self.changes = 0            # uploads caused by a change
+        self.heartbeats = 0         # uploads caused by the heartbeat
+        self.limited = 0            # changes held back by the rate limit
+
+    def configure(self, settings):
+        """
+        Applies settings given as {"temp": [abs, rel], ..., "heartbeat": s,
+        "max_per_min": n, "burst": n}; missing keys keep their value. Used
+        for config.py at boot and for a policy pushed by the backend. A
+        malformed policy raises ValueError and changes nothing.
+        """
+        if not isinstance(settings, dict):
+            raise ValueError("report policy must be an object")
+        bands = []
+        limits = {}
+        try:
+            for i, name in enumerate(CHANNELS):
+                if name in settings:
+                    absolute, relative = settings[name]
+                    bands.append((i, float(absolute), float(relative)))
+            for key in ("heartbeat", "max_per_min", "burst"):
+                if key in settings:
+                    limits[key] = float(settings[key])
+        except (TypeError, ValueError) as e:
+            raise ValueError("bad report policy: %s" % e)
+        if any(a < 0 or r < 0 for _, a, r in bands) or any(v < 0 for v in limits.values()) \
+                or limits.get("heartbeat", 1) <= 0:
+            raise ValueError("bad report policy: negative or zero value")
+
+        for i, absolute, relative in bands:
+            self._abs[i] = absolute
+            self._rel[i] = relative
+        if "heartbeat" in limits:
+            self.heartbeat = limits["heartbeat"]
+        if "max_per_min" in limits:
+            self.max_per_min = limits["max_per_min"]
+        if "burst" in limits:
+            self.burst = max(1, int(limits["burst"]))
+            self._tokens = min(self._tokens, self.burst)
+
+    def due(self, temp, humidity, soil, now=None):
+        """True if this sample should be uploaded now; call sent() once it was."""
+        now = time.ticks_ms() if now is None else now
+        self.samples += 1
+        self._refill(now)
+
+        if self._last is None or time.ticks_diff(now, self._last) >= self.heartbeat * 1000:
+            self._reason = 0
+            return True
+        if not self._changed(temp, humidity, soil):
+            return False
+        if self._tokens < 1:
+            self.limited += 1
+            return False
+        self._reason = 1
+        return True
+
+    def sent(self, temp, humidity, soil, now=None):
+        """Records an upload made after due() returned True."""
+        self._sent[0] = temp
+        self._sent[1] = humidity
+        self._sent[2] = soil
+        self._last = time.ticks_ms() if now is None else now
+        if self._reason:
+            self._tokens -= 1
+            self.changes += 1
+        else:
+            self.heartbeats += 1
+
+    def reduction(self):
+        """Fraction of samples not uploaded."""
+        if not self.samples:
+            return 0.0
+        return 1 - (self.changes + self.heartbeats) / self.samples
+
+    def stats(self):
+        return {"samples": self.samples, "changes": self.changes, "heartbeats": self.heartbeats,
+                "limited": self.limited, "reduction": round(self.reduction(), 3)}
+
+    def _changed(self, temp, humidity, soil):
+        sent = self._sent
+        for i, value in ((0, temp), (1, humidity), (2, soil)):
+            if value is None:
+                continue        # sensor error: nothing new to report
+            last = sent[i]
+            if last is None or abs(value - last) > max(self._abs[i], self._rel[i] * abs(last)):
+                return True
+        return False
+
+    def _refill(self, now):
+        elapsed = time.ticks_diff(now, self._refilled)
+        self._refilled = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.max_per_min / 60000)
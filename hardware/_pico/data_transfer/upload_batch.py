@@ -0,0 +1,102 @@
+# upload_batch.py
+import time
+from array import array
+from data_transfer.wire_format import HEADER_SIZE, RECORD_SIZE, pack_header, pack_record
+
+# epoch seconds before this mean the RTC was never set (no NTP yet)
+_CLOCK_SET_AFTER = 1_700_000_000
+
+
+def clock_synced():
+    return time.time() > _CLOCK_SET_AFTER
+
+
+def reading_dict(ts, temp, humidity, soil):
+    """One entry of a /batch payload; ts 0 and NaN values are left out."""
+    r = {}
+    if ts:
+        r["timestamp"] = ts
+    if temp == temp:
+        r["temp"] = round(temp, 2)
+    if humidity == humidity:
+        r["humidity"] = round(humidity, 2)
+    if soil == soil:
+        r["soil_moisture"] = round(soil, 2)
+    return r
+
+
+class ReadingBatch:
+    """
+    Fixed-capacity buffer of timestamped readings waiting for one batched
+    upload. Readings live in flat preallocated arrays (no per-reading
+    objects); when the buffer is full the oldest reading is overwritten.
+    A missing value (sensor error) is stored as NaN and left out on upload.
+    """
+
+    def __init__(self, size, interval):
+        self.size = size
+        self.interval = interval                # seconds before a partial batch is flushed
+        self._ts = array("I", [0] * size)       # epoch seconds, 0 = clock not set
+        self._vals = array("f", [0.0] * (3 * size))
+        self._head = 0                          # index of the oldest reading
+        self.count = 0
+        self.dropped = 0                        # readings overwritten while full
+        self._opened = 0                        # ticks_ms of the oldest reading
+        self._frame = None                      # wire_format body, allocated on first frame()
+
+    def add(self, temp, humidity, soil):
+        """Stamps and stores one reading."""
+        if self.count == 0:
+            self._opened = time.ticks_ms()
+        if self.count == self.size:
+            self._head = (self._head + 1) % self.size
+            self.count -= 1
+            self.dropped += 1
+        i = (self._head + self.count) % self.size
+        self._ts[i] = time.time() if clock_synced() else 0
+        nan = float("nan")
+        self._vals[3 * i] = nan if temp is None else temp
+        self._vals[3 * i + 1] = nan if humidity is None else humidity
+        self._vals[3 * i + 2] = nan if soil is None else soil
+        self.count += 1
+
+    def due(self):
+        """True when the batch is full or its oldest reading is `interval` old."""
+        if self.count == 0:
+            return False
+        if self.count >= self.size:
+            return True
+        return time.ticks_diff(time.ticks_ms(), self._opened) >= self.interval * 1000
+
+    def payload(self):
+        """Request body for POST /api/data/{id}/batch, oldest reading first."""
+        readings = []
+        vals = self._vals
+        for k in range(self.count):
+            i = (self._head + k) % self.size
+            readings.append(reading_dict(self._ts[i], vals[3 * i], vals[3 * i + 1], vals[3 * i + 2]))
+        return {"readings": readings}
+
+    def frame(self):
+        """Binary (wire_format) body for the /batch endpoint, oldest reading first."""
+        if self._frame is None:
+            self._frame = bytearray(HEADER_SIZE + RECORD_SIZE * self.size)
+        buf = self._frame
+        vals = self._vals
+        pack_header(buf, self.count)
+        for k in range(self.count):
+            i = (self._head + k) % self.size
+            pack_record(buf, k, self._ts[i], vals[3 * i], vals[3 * i + 1], vals[3 * i + 2])
+        return memoryview(buf)[:HEADER_SIZE + RECORD_SIZE * self.count]
+
+    def spill(self, log):
+        """Moves every buffered reading into the offline `log` and clears the batch."""
+        vals = self._vals
+        for k in range(self.count):
+            i = (self._head + k) % self.size
+            log.append(self._ts[i], vals[3 * i], vals[3 * i + 1], vals[3 * i + 2])
+        self.clear()
+
+    def clear(self):
+        self._head = 0
+        self.count = 0
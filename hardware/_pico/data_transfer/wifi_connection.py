@@ -2,7 +2,9 @@
 import network
 import uasyncio as asyncio
 import rp2
+import metrics
 from data_transfer import secrets
+from helpers import logger as log
 
 rp2.country("RO")
 
@@ -20,20 +22,43 @@ async def connect_wifi(timeout=15):
         # network status codes differ between builds; use isconnected() as primary check
         if wlan.isconnected():
             break
-        # optional: print progress
-        print("Connecting to Wi-Fi...")
+        log.info("Connecting to Wi-Fi...")
         await asyncio.sleep(1)
         max_wait -= 1
 
     if not wlan.isconnected():
         raise RuntimeError("Wi-Fi connection failed!")
-    print("Connected: ", wlan.ifconfig())
+    log.info("Connected: %s", wlan.ifconfig())
+    metrics.count("wifi_connects")
+    sync_clock()
     return wlan
 
 
+def sync_clock():
+    """
+    Sets the RTC from NTP so readings can be stamped on the device.
+    Failure is not fatal: unstamped readings get the server time.
+    """
+    try:
+        import ntptime
+        ntptime.settime()
+    except Exception as e:
+        log.warn("NTP sync failed: %s", e)
+
+
 def is_connected():
     """
     Returns True if Wi-Fi is currently connected, False otherwise.
     """
     wlan = network.WLAN(network.STA_IF)
-    return wlan.isconnected()
\ No newline at end of file
+    return wlan.isconnected()
+
+
+def rssi():
+    """
+    Signal strength of the current link in dBm, or None if unavailable.
+    """
+    try:
+        return network.WLAN(network.STA_IF).status("rssi")
+    except Exception:
+        return None
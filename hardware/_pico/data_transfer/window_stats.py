@@ -0,0 +1,131 @@
+# window_stats.py
+import time
+from array import array
+from data_transfer.upload_batch import clock_synced
+from data_transfer.wire_format import HEADER_SIZE, SUMMARY_SIZE, FLAG_SUMMARY, pack_header, pack_summary
+
+# channel order of add() / alert() arguments and of the ALERT_LIMITS keys
+CHANNELS = ("temp", "humidity", "soil_moisture")
+
+_NAN = float("nan")
+_INF = float("inf")
+
+
+class WindowStats:
+    """
+    Running min / max / mean / count per channel over fixed windows of
+    `window` seconds. Everything lives in preallocated arrays, so add()
+    builds nothing however many samples a window gets. Once a window is
+    due, the reporter takes it as one summary (payload() / frame(); a
+    frame stays valid until the next frame() call) and clear()s it before
+    the upload, so the next window fills while the request is in flight.
+    alert() tells whether a sample is outside the alert limits
+    ({"temp": (low, high), ...}, None = no bound) and must go out raw
+    right away.
+    """
+
+    def __init__(self, window, limits=None):
+        self.window = window
+        self._min = array("f", [0.0] * 3)
+        self._max = array("f", [0.0] * 3)
+        self._sum = array("f", [0.0] * 3)
+        self._count = array("H", [0] * 3)
+        self._low = array("f", [-_INF] * 3)
+        self._high = array("f", [_INF] * 3)
+        for i, name in enumerate(CHANNELS):
+            low, high = (limits or {}).get(name, (None, None))
+            if low is not None:
+                self._low[i] = low
+            if high is not None:
+                self._high[i] = high
+        self._opened = time.ticks_ms()
+        self._started = 0           # epoch seconds of the window start, 0 = clock not set
+        self._frame = None          # wire_format body, allocated on first frame()
+
+        self.windows = 0            # windows closed
+        self.samples = 0            # samples added
+        self.alerts = 0             # samples outside the alert limits
+        self.clear()
+
+    def add(self, temp, humidity, soil):
+        """Folds one sample into the open window; None (sensor error) is skipped."""
+        self._add(0, temp)
+        self._add(1, humidity)
+        self._add(2, soil)
+        self.samples += 1
+
+    def _add(self, i, value):
+        if value is None:
+            return
+        n = self._count[i]
+        if n == 0 or value < self._min[i]:
+            self._min[i] = value
+        if n == 0 or value > self._max[i]:
+            self._max[i] = value
+        self._sum[i] += value
+        if n < 65535:
+            self._count[i] = n + 1
+
+    def alert(self, temp, humidity, soil):
+        """True if any value is outside its alert limits."""
+        if self._outside(0, temp) or self._outside(1, humidity) or self._outside(2, soil):
+            self.alerts += 1
+            return True
+        return False
+
+    def _outside(self, i, value):
+        return value is not None and not self._low[i] <= value <= self._high[i]
+
+    def due(self):
+        """True once the open window is `window` seconds old."""
+        return time.ticks_diff(time.ticks_ms(), self._opened) >= self.window * 1000
+
+    @property
+    def count(self):
+        """Samples in the open window (most complete channel)."""
+        return max(self._count)
+
+    def mean(self, i):
+        n = self._count[i]
+        return self._sum[i] / n if n else None
+
+    def channel(self, i):
+        """(count, min, max, mean) of channel i; NaN where nothing was read."""
+        n = self._count[i]
+        if not n:
+            return (0, _NAN, _NAN, _NAN)
+        return (n, self._min[i], self._max[i], self._sum[i] / n)
+
+    def payload(self):
+        """Request body for POST /api/data/{id}/summary."""
+        body = {"window": self.window}
+        if self._started:
+            body["timestamp"] = self._started
+        for i, name in enumerate(CHANNELS):
+            n, low, high, mean = self.channel(i)
+            if n:
+                body[name] = {"min": round(low, 2), "max": round(high, 2),
+                              "mean": round(mean, 2), "count": n}
+        return body
+
+    def frame(self):
+        """The window as a wire_format summary body (reused buffer)."""
+        if self._frame is None:
+            self._frame = bytearray(HEADER_SIZE + SUMMARY_SIZE)
+        pack_header(self._frame, 1, FLAG_SUMMARY)
+        pack_summary(self._frame, 0, self._started, self.window,
+                     self.channel(0), self.channel(1), self.channel(2))
+        return self._frame
+
+    def clear(self):
+        """Closes the window and opens the next one."""
+        if self.count:
+            self.windows += 1
+        for i in range(3):
+            self._count[i] = 0
+            self._sum[i] = 0.0
+        self._opened = time.ticks_ms()
+        self._started = time.time() if clock_synced() else 0
+
+    def stats(self):
+        return {"windows": self.windows, "samples": self.samples, "alerts": self.alerts}
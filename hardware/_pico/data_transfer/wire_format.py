@@ -0,0 +1,53 @@
+# wire_format.py
+# Compact binary body for sensor uploads (WIRE_FORMAT = "binary"):
+#   header  <BBH   version, flags (0, or FLAG_SUMMARY), record count
+#   record  <Ifff  epoch seconds (0 = server time), temp, humidity, soil (NaN = missing)
+#   summary <IH + <Hfff per channel (FLAG_SUMMARY): window start (0 = server
+#           time), window seconds, then count, min, max, mean of temp,
+#           humidity, soil
+# POST /api/data/{id} takes one record, /batch up to 500, /summary window
+# summaries; all are sent with Content-Type CONTENT_TYPE. Decoded by
+# backend/services/deviceWireFormat.js.
+import struct
+
+VERSION = 1
+CONTENT_TYPE = "application/x-greenhouse-readings"
+
+HEADER = "<BBH"
+HEADER_SIZE = 4
+RECORD = "<Ifff"        # same layout as the offline log records
+RECORD_SIZE = 16
+FLAG_SUMMARY = 1
+SUMMARY = "<IHHfffHfffHfff"
+SUMMARY_SIZE = 48
+
+_NAN = float("nan")
+_single = bytearray(HEADER_SIZE + RECORD_SIZE)
+
+
+def _num(value):
+    return _NAN if value is None else value
+
+
+def pack_header(buf, count, flags=0):
+    struct.pack_into(HEADER, buf, 0, VERSION, flags, count)
+
+
+def pack_record(buf, i, ts, temp, humidity, soil):
+    struct.pack_into(RECORD, buf, HEADER_SIZE + i * RECORD_SIZE,
+                     ts or 0, _num(temp), _num(humidity), _num(soil))
+
+
+def reading(temp, humidity, soil, ts=0):
+    """One-record body in a reused buffer; valid until the next call."""
+    pack_header(_single, 1)
+    pack_record(_single, 0, ts, temp, humidity, soil)
+    return _single
+
+
+def pack_summary(buf, i, ts, window, temp, humidity, soil):
+    """Summary record `i`; each channel is (count, min, max, mean)."""
+    struct.pack_into(SUMMARY, buf, HEADER_SIZE + i * SUMMARY_SIZE, ts or 0, window,
+                     temp[0], temp[1], temp[2], temp[3],
+                     humidity[0], humidity[1], humidity[2], humidity[3],
+                     soil[0], soil[1], soil[2], soil[3])
@@ -0,0 +1,163 @@
+# device_state.py
+# Controller state of the greenhouse node, updated by one method per event.
+import struct
+import time
+
+# bits returned by the event methods: which relays must be written, and
+# whether a manual override changed
+PUMP = 1
+FAN = 2
+OVERRIDE = 4
+
+_NAN = float("nan")
+_FORMAT = "<BfffBBI"    # version, temp, humidity, soil, relays, overrides, command_time
+_VERSION = 1
+
+
+def _num(value):
+    return _NAN if value is None else value
+
+
+def _opt(value):
+    return None if value != value else value    # NaN → None
+
+
+def _relay(value):
+    return 2 if value is None else int(value)   # 2 = never set
+
+
+class DeviceState:
+    """
+    Everything main.py's tasks share. sample(), command() and timeout()
+    change the state and return a PUMP/FAN/OVERRIDE bit mask; the caller
+    writes the relays named in it (see main.actuate()).
+    """
+
+    __slots__ = (
+        "temp", "humidity", "soil",             # last sample
+        "pump", "fan",                          # relay states (None: not set yet)
+        "override_pump", "override_fan",        # manual command holds the relay
+        "command_time",                         # time.time() of the last backend command
+        "seq",                                  # sequence (version) of the last applied command
+        "override_timeout",
+        "pump_controller", "fan_controller",
+    )
+
+    def __init__(self, pump_controller, fan_controller, override_timeout):
+        self.temp = self.humidity = self.soil = None
+        self.pump = self.fan = None
+        self.override_pump = self.override_fan = False
+        self.command_time = 0
+        self.seq = 0
+        self.override_timeout = override_timeout
+        self.pump_controller = pump_controller
+        self.fan_controller = fan_controller
+
+    # ===== events =====
+    def timeout(self, now=None):
+        """Hands the relays back to auto control once a manual command is old."""
+        now = time.time() if now is None else now
+        if now - self.command_time > self.override_timeout:
+            if self.override_pump or self.override_fan:
+                self.override_pump = self.override_fan = False
+                return OVERRIDE
+        return 0
+
+    def sample(self, temp, humidity, soil, now=None):
+        """
+        New sensor sample: auto control for every relay not under manual
+        override. A relay whose input is None (sensor error) keeps its state.
+        """
+        self.temp = temp
+        self.humidity = humidity
+        self.soil = soil
+        changed = self.timeout(now)
+
+        # controllers follow the real relay state, manual switches included
+        self.pump_controller.sync(self.pump)
+        self.fan_controller.sync(self.fan)
+
+        # decide both relays before touching either, so a relay state is
+        # only changed together with the mask that makes the caller write it
+        pump, fan = self.pump, self.fan
+        if not self.override_pump and soil is not None:
+            pump = self.pump_controller.update(soil)
+        if not self.override_fan and temp is not None:
+            fan = self.fan_controller.update(temp)
+        if pump != self.pump:
+            self.pump = pump
+            changed |= PUMP
+        if fan != self.fan:
+            self.fan = fan
+            changed |= FAN
+        return changed
+
+    def command(self, commands, now=None, sync=False):
+        """
+        Backend command ({"pump": bool, "fan": bool, "version": seq}). A
+        command with a new sequence (or sync=True, at boot) sets every relay
+        it names and its override, whatever auto control did meanwhile, so
+        an acked version is always in effect; the mask names only what
+        actually changed. A command whose sequence was already applied is
+        ignored, so each one takes effect once however often it is delivered
+        (check `seq` to tell). Without a sequence, a relay is taken over only
+        when its override flag changes.
+        """
+        seq = commands.get("version")
+        if seq is not None:
+            if seq <= self.seq and not sync:
+                return 0
+            self.seq = seq
+        force = sync or seq is not None
+        self.command_time = time.time() if now is None else now
+        changed = 0
+        if "pump" in commands:
+            cmd = bool(commands["pump"])
+            if force or self.override_pump != cmd:
+                if sync or cmd != self.pump:
+                    self.pump = cmd
+                    changed |= PUMP
+                if sync or cmd != self.override_pump:
+                    changed |= OVERRIDE
+                self.override_pump = cmd
+        if "fan" in commands:
+            cmd = bool(commands["fan"])
+            if force or self.override_fan != cmd:
+                if sync or cmd != self.fan:
+                    self.fan = cmd
+                    changed |= FAN
+                if sync or cmd != self.override_fan:
+                    changed |= OVERRIDE
+                self.override_fan = cmd
+        return changed
+
+    # ===== snapshot / serialization =====
+    def snapshot(self):
+        """Plain dict of the state (JSON-ready), controllers excluded."""
+        return {
+            "temp": self.temp, "humidity": self.humidity, "soil": self.soil,
+            "pump": self.pump, "fan": self.fan,
+            "override_pump": self.override_pump, "override_fan": self.override_fan,
+            "command_time": self.command_time, "seq": self.seq,
+        }
+
+    def pack(self):
+        """Fixed 19-byte record of the state, for flash or the wire."""
+        return struct.pack(_FORMAT, _VERSION,
+                           _num(self.temp), _num(self.humidity), _num(self.soil),
+                           _relay(self.pump) | _relay(self.fan) << 2,
+                           self.override_pump | self.override_fan << 1,
+                           int(self.command_time))
+
+    def restore(self, record):
+        """Loads a pack()ed record; controllers re-sync on the next sample."""
+        version, temp, humidity, soil, relays, overrides, command_time = struct.unpack(_FORMAT, record)
+        if version != _VERSION:
+            raise ValueError("unknown state record version")
+        self.temp, self.humidity, self.soil = _opt(temp), _opt(humidity), _opt(soil)
+        pump, fan = relays & 3, relays >> 2
+        self.pump = None if pump == 2 else bool(pump)
+        self.fan = None if fan == 2 else bool(fan)
+        self.override_pump = bool(overrides & 1)
+        self.override_fan = bool(overrides & 2)
+        self.command_time = command_time
@@ -1,16 +1,215 @@
 # ===== LOGGER =====
-# Logger is not implemented in the MVP
+# Levelled logger that writes into a fixed binary ring buffer in RAM and
+# echoes to the serial console only from LOG_ECHO upwards.
+#
+#   from helpers import logger as log
+#   log.info("Pump %s (soil=%.1f%%)", state, soil)
+#
+# Up to three arguments are %-formatted only when the level is enabled; a
+# disabled level is bound to a no-op at import (set_level()), so the call
+# builds no string and no tuple. Records: <IBB ticks_ms, level, length,
+# then the UTF-8 text (max 255 bytes); the oldest are overwritten.
 import time
+import struct
+from config import LOG_LEVEL, LOG_ECHO, LOG_BUFFER
 
-def log(msg, level="INFO"):
-    ts = time.time()
-    print(f"[{level}] {ts}: {msg}")
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARN: "WARN", ERROR: "ERROR"}
+_BY_NAME = {"DEBUG": DEBUG, "INFO": INFO, "WARN": WARN, "ERROR": ERROR}
 
-def info(msg):
-    log(msg, "INFO")
+_HEADER = "<IBB"
+_HEADER_SIZE = 6
+_NO = object()      # "argument not given" (None is a valid argument)
 
-def warn(msg):
-    log(msg, "WARN")
 
-def error(msg):
-    log(msg, "ERROR")
\ No newline at end of file
+class RingBuffer:
+    """
+    Fixed-size byte ring of log records. write() drops whole records from
+    the oldest end until the new one fits; records() walks them oldest
+    first.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._buf = bytearray(size)
+        self._mv = memoryview(self._buf)
+        self._head = bytearray(_HEADER_SIZE)
+        self._start = 0         # offset of the oldest record
+        self._used = 0          # bytes held by records
+        self.written = 0        # records written
+        self.dropped = 0        # records overwritten
+
+    def write(self, level, text):
+        data = text.encode() if isinstance(text, str) else text
+        n = min(len(data), 255, self.size - _HEADER_SIZE)
+        while 0 < n < len(data) and data[n] & 0xC0 == 0x80:
+            n -= 1      # don't cut a UTF-8 character in half
+        need = _HEADER_SIZE + n
+        while self._used + need > self.size:
+            self._drop()
+        at = (self._start + self._used) % self.size
+        ticks = time.ticks_ms() & 0xFFFFFFFF
+        if at + need <= self.size:
+            # common case: the record fits before the end, write it in place
+            struct.pack_into(_HEADER, self._buf, at, ticks, level, n)
+            self._mv[at + _HEADER_SIZE:at + need] = data if n == len(data) else memoryview(data)[:n]
+        else:
+            struct.pack_into(_HEADER, self._head, 0, ticks, level, n)
+            at = self._copy(at, self._head, _HEADER_SIZE)
+            self._copy(at, data, n)
+        self._used += need
+        self.written += 1
+
+    def _copy(self, at, data, n):
+        """Copies n bytes of data into the ring at `at` (wrapping); returns the end offset."""
+        first = min(n, self.size - at)
+        self._mv[at:at + first] = memoryview(data)[:first]
+        if first < n:
+            self._mv[:n - first] = memoryview(data)[first:n]
+        return (at + n) % self.size
+
+    def _read(self, at, n):
+        first = min(n, self.size - at)
+        if first == n:
+            return bytes(self._mv[at:at + n])
+        return bytes(self._mv[at:]) + bytes(self._mv[:n - first])
+
+    def _drop(self):
+        n = self._buf[(self._start + 5) % self.size]
+        self._start = (self._start + _HEADER_SIZE + n) % self.size
+        self._used -= _HEADER_SIZE + n
+        self.dropped += 1
+
+    def records(self):
+        """Yields (ticks_ms, level, text bytes), oldest first."""
+        at, left = self._start, self._used
+        while left > 0:
+            ticks, level, n = struct.unpack(_HEADER, self._read(at, _HEADER_SIZE))
+            yield ticks, level, self._read((at + _HEADER_SIZE) % self.size, n)
+            at = (at + _HEADER_SIZE + n) % self.size
+            left -= _HEADER_SIZE + n
+
+    def clear(self):
+        self._start = self._used = 0
+
+
+ring = RingBuffer(LOG_BUFFER)
+_echo = _BY_NAME.get(LOG_ECHO, WARN)
+
+
+def _format(msg, a, b, c):
+    if a is _NO:
+        return msg
+    if b is _NO:
+        return msg % (a,)
+    if c is _NO:
+        return msg % (a, b)
+    return msg % (a, b, c)
+
+
+def log(level, msg, a=_NO, b=_NO, c=_NO):
+    """Records msg % args at `level` (no filtering; see debug() .. error())."""
+    try:
+        line = _format(msg, a, b, c)
+    except Exception:
+        line = msg      # bad format string: keep the message rather than fail the caller
+    ring.write(level, line)
+    if level >= _echo:
+        print(f"[{NAMES.get(level, level)}] {line}")
+
+
+def _off(msg, a=_NO, b=_NO, c=_NO):
+    pass
+
+
+def _debug(msg, a=_NO, b=_NO, c=_NO):
+    log(DEBUG, msg, a, b, c)
+
+
+def _info(msg, a=_NO, b=_NO, c=_NO):
+    log(INFO, msg, a, b, c)
+
+
+def _warn(msg, a=_NO, b=_NO, c=_NO):
+    log(WARN, msg, a, b, c)
+
+
+def _error(msg, a=_NO, b=_NO, c=_NO):
+    log(ERROR, msg, a, b, c)
+
+
+def set_level(level, echo=None):
+    """
+    Binds every level below `level` to a no-op, so filtered calls cost one
+    empty function call. `echo` sets the lowest level also printed.
+    Levels are the constants above or their names.
+    """
+    global debug, info, warn, error, _level, _echo
+    level = _BY_NAME.get(level, level)
+    _level = level
+    if echo is not None:
+        _echo = _BY_NAME.get(echo, echo)
+    debug = _debug if level <= DEBUG else _off
+    info = _info if level <= INFO else _off
+    warn = _warn if level <= WARN else _off
+    error = _error if level <= ERROR else _off
+
+
+debug = info = warn = error = _off
+_level = INFO
+set_level(LOG_LEVEL)
+
+
+def enabled(level):
+    """For callers that must prepare costly arguments: is `level` recorded?"""
+    return level >= _level
+
+
+# ===== retrieval =====
+def text():
+    """The ring as text, one "ticks LEVEL message" line per record, oldest first."""
+    lines = []
+    for ticks, level, msg in ring.records():
+        lines.append(f"{ticks} {NAMES.get(level, level)} {msg.decode()}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def dump(stream=None):
+    """Prints the ring (or writes it to `stream`)."""
+    if stream is None:
+        print(text(), end="")
+    else:
+        stream.write(text())
+
+
+def save(path):
+    """Writes the ring to flash, e.g. from the crash handler; never raises."""
+    try:
+        with open(path, "w") as f:
+            dump(f)
+    except Exception as e:
+        print("Log save failed:", e)
+
+
+def saved(path):
+    """Contents of a log written by save(), or None if there is none."""
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def discard_saved(path):
+    import os
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def stats():
+    return {"written": ring.written, "dropped": ring.dropped, "bytes": ring._used}
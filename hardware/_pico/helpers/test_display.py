@@ -1,12 +1,13 @@
 import uasyncio as asyncio
 from actuator_control import get_pump_state, get_fan_state
+from helpers import logger as log
 
 # # === INITIALIZATION ===
 pump = get_pump_state()
 fan = get_fan_state()
 
-def actuator_state():
-    return f"[ACT STATE] Pump: {pump}  Fan: {fan}"
+def log_actuator_state():
+    log.debug("[ACT STATE] Pump: %s  Fan: %s", pump, fan)
 
 # ==== display simulation ====
 async def test_display_task():
@@ -18,17 +19,17 @@ async def test_display_task():
         fan = get_fan_state() 
         
         if pump and fan:
-            print(actuator_state())
-            print("[DISPLAY] Both on: blink full digits 1 & 4")
+            log_actuator_state()
+            log.debug("[DISPLAY] Both on: blink full digits 1 & 4")
         elif pump:  # vertical line (right to left)
-            print(actuator_state())
-            print("[DISPLAY] Pump on: vertical line (right to left)")
+            log_actuator_state()
+            log.debug("[DISPLAY] Pump on: vertical line (right to left)")
         elif fan:  # horizontal line (right to left)
-            print(actuator_state())
-            print("[DISPLAY] Fan on: horizontal line (right to left)")
+            log_actuator_state()
+            log.debug("[DISPLAY] Fan on: horizontal line (right to left)")
         else:  # both off → middle bar
-            print(actuator_state())
-            print("[DISPLAY] Both off: middle bar")
+            log_actuator_state()
+            log.debug("[DISPLAY] Both off: middle bar")
         
         await asyncio.sleep(2)
     
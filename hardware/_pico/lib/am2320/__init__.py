@@ -6,6 +6,7 @@ MicroPython Aosong AM2320 I2C driver
 https://github.com/mcauser/micropython-am2320
 """
 
+from array import array
 from time import sleep_ms
 from micropython import const
 
@@ -14,10 +15,39 @@ __version__ = "1.1.0"
 I2C_ADDRESS = const(0x5C)  # fixed I2C address
 
 
+# CRC-16/MODBUS (poly 0xA001 reflected), one table lookup per byte
+def _crc_table():
+    table = array("H", bytes(512))
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 0x01 else crc >> 1
+        table[i] = crc
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def _crc16_py(buf, n, table):
+    crc = 0xFFFF
+    for i in range(n):
+        crc = (crc >> 8) ^ table[(crc ^ buf[i]) & 0xFF]
+    return crc
+
+
+try:
+    from ._crc_native import crc16 as _crc16
+except (ImportError, SyntaxError, ValueError):
+    # no native emitter on this port (or incompatible .mpy)
+    _crc16 = _crc16_py
+
+
 class AM2320:
     def __init__(self, i2c):
         self._i2c = i2c
         self._buf = bytearray(8)
+        self._mv = memoryview(self._buf)
 
     def check(self):
         self._wake()
@@ -35,8 +65,27 @@ class AM2320:
         sleep_ms(2)
         # read data
         self._i2c.readfrom_mem_into(I2C_ADDRESS, 0, buf)
+        self._verify()
+
+    async def measure_async(self):
+        """Same as measure(), but yields to the event loop during the waits."""
+        import uasyncio as asyncio
+
+        buf = self._buf
+        try:
+            self._i2c.writeto(I2C_ADDRESS, b"")
+        except OSError:
+            pass
+        await asyncio.sleep_ms(10)
+        self._i2c.writeto(I2C_ADDRESS, b"\x03\x00\x04")
+        await asyncio.sleep_ms(2)
+        self._i2c.readfrom_mem_into(I2C_ADDRESS, 0, buf)
+        self._verify()
+
+    def _verify(self):
+        buf = self._buf
         crc = buf[6] | (buf[7] << 8)
-        if crc != self._crc16(buf[:-2]):
+        if crc != _crc16(self._mv, 6, _CRC_TABLE):
             raise ValueError("Checksum error")
 
     def temperature(self):
@@ -54,15 +103,3 @@ class AM2320:
         except OSError:
             pass
         sleep_ms(10)
-
-    def _crc16(self, buf):
-        crc = 0xFFFF
-        for c in buf:
-            crc ^= c
-            for _ in range(8):
-                if crc & 0x01:
-                    crc >>= 1
-                    crc ^= 0xA001
-                else:
-                    crc >>= 1
-        return crc
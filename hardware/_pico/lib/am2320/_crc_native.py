@@ -0,0 +1,11 @@
+# Native-code build of the table-driven CRC16; imported only where
+# the port's compiler supports @micropython.native.
+import micropython
+
+
+@micropython.native
+def crc16(buf, n, table):
+    crc = 0xFFFF
+    for i in range(n):
+        crc = (crc >> 8) ^ table[(crc ^ buf[i]) & 0xFF]
+    return crc
@@ -2,178 +2,413 @@
 import gc
 import time
 import uasyncio as asyncio
-from data_transfer import wifi_connection, api_client
+from data_transfer import wifi_connection, api_client, dns_cache, wire_format
+from data_transfer.upload_batch import ReadingBatch, clock_synced
+from data_transfer.offline_log import OfflineLog
+from data_transfer.report_policy import ReportPolicy
+from data_transfer.window_stats import WindowStats
 import read_sensors
+import pipeline
+import metrics
 import actuator_control
+from auto_controller import OnOffController
+from device_state import DeviceState, PUMP, FAN
 from helpers import test_display
+from helpers import logger as log
 # from actuator_control_display import display_task
 import status_led
 from config import (
-    SEND_INTERVAL, CHANGE_THRESHOLD, TEMP_THRESHOLD,
-    SOIL_MOISTURE_THRESHOLD, COMMAND_POLL_INTERVAL,
-    OVERRIDE_TIMEOUT, GC_INTERVAL, WIFI_CHECK_INTERVAL
+    SAMPLE_INTERVAL, SEND_INTERVAL, TEMP_THRESHOLD,
+    SOIL_MOISTURE_THRESHOLD, TEMP_HYSTERESIS, SOIL_HYSTERESIS,
+    COMMAND_LONG_POLL, COMMAND_PIGGYBACK, COMMAND_FALLBACK_INTERVAL,
+    PUMP_MIN_ON, PUMP_MIN_OFF, FAN_MIN_ON, FAN_MIN_OFF,
+    PUMP_MAX_DUTY, FAN_MAX_DUTY, DUTY_WINDOW, COMMAND_POLL_INTERVAL, COMMAND_POLL_MAX, COMMAND_WAIT,
+    OVERRIDE_TIMEOUT, GC_INTERVAL, WIFI_CHECK_INTERVAL,
+    BATCH_MODE, BATCH_SIZE, BATCH_INTERVAL,
+    OFFLINE_DIR, OFFLINE_SEGMENTS, OFFLINE_SEGMENT_RECORDS,
+    OFFLINE_DRAIN_BATCH, OFFLINE_DRAIN_INTERVAL,
+    REPORT_DEADBANDS, REPORT_HEARTBEAT, REPORT_MAX_PER_MIN, REPORT_BURST,
+    AGGREGATE_WINDOW, ALERT_LIMITS,
+    WIRE_FORMAT, LOG_CRASH_FILE, HEALTH_INTERVAL, LAG_PROBE_MS
 )
 
 # ===== GC SETUP =====
 gc.threshold(gc.mem_free() // 4)  # auto GC when memory drops below 25%
 
 # ===== STATE =====
-last_temp = None
-last_humidity = None
-last_soil = None
-last_pump_state = None
-last_fan_state = None
+batch = ReadingBatch(BATCH_SIZE, BATCH_INTERVAL)  # used when BATCH_MODE is on
+offline = OfflineLog(OFFLINE_DIR, OFFLINE_SEGMENTS, OFFLINE_SEGMENT_RECORDS, OFFLINE_DRAIN_BATCH)
+
+# relays, overrides and last readings; auto control switches through
+# hysteresis / dwell / duty-cap controllers
+state = DeviceState(
+    OnOffController(SOIL_MOISTURE_THRESHOLD, SOIL_MOISTURE_THRESHOLD + SOIL_HYSTERESIS,
+                    PUMP_MIN_ON, PUMP_MIN_OFF, PUMP_MAX_DUTY, DUTY_WINDOW),
+    OnOffController(TEMP_THRESHOLD, TEMP_THRESHOLD - TEMP_HYSTERESIS,
+                    FAN_MIN_ON, FAN_MIN_OFF, FAN_MAX_DUTY, DUTY_WINDOW),
+    OVERRIDE_TIMEOUT,
+)
+
+# which samples get uploaded (deadbands, heartbeat, rate limit)
+policy = ReportPolicy(REPORT_DEADBANDS, REPORT_HEARTBEAT, REPORT_MAX_PER_MIN, REPORT_BURST)
+
+# per-window min/max/mean/count, fed every sample (AGGREGATE_WINDOW > 0);
+# raw readings then go out only when they breach ALERT_LIMITS
+window = WindowStats(AGGREGATE_WINDOW, ALERT_LIMITS)
+
+BINARY = WIRE_FORMAT == "binary"
 
-manual_override_pump = False
-manual_override_fan = False
-last_command_time = 0   # Timestamp of last backend command
+# ===== PIPELINE =====
+# sampler → control (reacts to every sample) and sampler → reporter (own rate);
+# each mailbox keeps only the newest (temp, humidity, soil, ticks_ms) sample
+control_inbox = pipeline.Mailbox()
+report_inbox = pipeline.Mailbox()
+sample_latency = pipeline.Latency("sample")     # sensor read time
+control_latency = pipeline.Latency("control")   # sample → actuators set
+report_latency = pipeline.Latency("report")     # sample → upload done
+
+# ===== TELEMETRY =====
+# histograms (ms) shipped in the health snapshot with the network ones
+# from api_client; counters are metrics.count() calls where things happen
+sensor_read_time = metrics.Histogram("sensor_read")
+gc_pause = metrics.Histogram("gc_pause")
+loop_lag = metrics.Histogram("loop_lag")        # how late a LAG_PROBE_MS sleep wakes up
 
 
 # ===== AUTO CONTROL =====
-def auto_control(temp, soil):
-    global last_pump_state, last_fan_state
-    global manual_override_pump, manual_override_fan
-    
-    now = time.time()
-    override_expired = (now - last_command_time > OVERRIDE_TIMEOUT)
-    
-    if override_expired:
-        manual_override_pump = False
-        manual_override_fan = False
-
-    # Pump control (only if not overridden)
-    if not manual_override_pump:
-        desired_pump = soil < SOIL_MOISTURE_THRESHOLD
-        if desired_pump != last_pump_state:
-            actuator_control.set_pump(desired_pump)
-            last_pump_state = desired_pump
-            print(f"Auto: Pump {'ON' if desired_pump else 'OFF'} (soil={soil:.1f}%)")
-
-    # Fan control (only if not overridden)
-    if not manual_override_fan:
-        desired_fan = temp > TEMP_THRESHOLD
-        if desired_fan != last_fan_state:
-            actuator_control.set_fan(desired_fan)
-            last_fan_state = desired_fan
-            print(f"Auto: Fan {'ON' if desired_fan else 'OFF'} (temp={temp:.1f}°C)")
+def actuate(changed):
+    """Writes the relays named in a DeviceState change mask."""
+    if changed & PUMP:
+        actuator_control.set_pump(state.pump)
+        metrics.count("pump_toggles")
+    if changed & FAN:
+        actuator_control.set_fan(state.fan)
+        metrics.count("fan_toggles")
+
+
+def auto_control(temp, humidity, soil):
+    changed = state.sample(temp, humidity, soil)
+    actuate(changed)
+    if changed & PUMP:
+        log.info("Auto: Pump %s (soil=%.1f%%)", "ON" if state.pump else "OFF", soil)
+    if changed & FAN:
+        log.info("Auto: Fan %s (temp=%.1f°C)", "ON" if state.fan else "OFF", temp)
+
+
+# ===== OFFLINE STORE =====
+def offline_worthy(e):
+    """True if a failed upload should be kept for later: network errors and 5xx (4xx won't pass on retry)."""
+    return not isinstance(e, api_client.HTTPError) or e.status >= 500
+
+
+def store_offline(temp, humidity, soil):
+    """Keeps a reading on flash until the backend is reachable again."""
+    offline.append(time.time() if clock_synced() else 0, temp, humidity, soil)
+    log.info("[OFFLINE] Reading stored (%d pending)", offline.pending)
+
+
+def store_window(means):
+    """Keeps a closed window's means on flash as one reading (outage)."""
+    store_offline(means[0], means[1], means[2])
+
+
+async def send_window():
+    """
+    Closes the window and uploads its summary; on failure (network or 5xx)
+    the window means go offline. The window is closed before the upload
+    is awaited, so samples taken meanwhile fold into the next one.
+    """
+    if not window.count:
+        window.clear()      # nothing read this window (sensor errors)
+        return
+    count = window.count
+    means = (window.mean(0), window.mean(1), window.mean(2))
+    body = window.frame() if BINARY else window.payload()
+    window.clear()
+    if not wifi_connection.is_connected():
+        store_window(means)
+        return
+    log.info("Sending window summary: %d samples", count)
+    try:
+        resp = await api_client.api_post_summary(body)
+    except Exception as e:
+        if offline_worthy(e):
+            store_window(means)
+        raise
+    metrics.count("uploads")
+    take_commands(resp)
+    asyncio.create_task(status_led.led_sending())
 
 
 # ===== ASYNC TASKS =====
-async def sensor_task():
-    """Reads sensors and sends updates at fixed interval."""
-    global last_temp, last_humidity, last_soil
+async def sampler_task():
+    """Reads sensors every SAMPLE_INTERVAL and hands the sample to control and reporting."""
     while True:
         try:
+            taken = time.ticks_ms()
             temp = read_sensors.read_temperature()
             humidity = read_sensors.read_humidity()
             soil = read_sensors.read_soil_moisture()
+            sample_latency.record(taken)
+            sensor_read_time.since(taken)
+            if AGGREGATE_WINDOW:
+                window.add(temp, humidity, soil)
+
+            sample = (temp, humidity, soil, taken)
+            control_inbox.put(sample)
+            report_inbox.put(sample)
+        except Exception as e:
+            log.error("Error in sampler_task: %s", e)
+            status_led.signal_error()
+
+        await asyncio.sleep(SAMPLE_INTERVAL)
+
+
+async def control_task():
+    """Runs auto control as soon as a new sample arrives."""
+    while True:
+        temp, humidity, soil, taken = await control_inbox.get()
+        try:
+            auto_control(temp, humidity, soil)
+            control_latency.record(taken)
+        except Exception as e:
+            log.error("Error in control_task: %s", e)
+            status_led.signal_error()
 
-            # run auto control logic
-            auto_control(temp, soil)
-
-            # send if changed beyond threshold
-            if (last_temp is None or abs(temp - last_temp) > CHANGE_THRESHOLD or
-                last_humidity is None or abs(humidity - last_humidity) > CHANGE_THRESHOLD or
-                last_soil is None or abs(soil - last_soil) > CHANGE_THRESHOLD):
-
-                payload = {
-                    "temp": temp,
-                    "humidity": humidity,
-                    "soil_moisture": soil
-                }
-                print("Sending sensor update:", payload)
-                # async POST
-                await api_client.api_post_manual(payload)
-                # LED feedback (async)
-                await status_led.led_sending()
-
-                last_temp = temp
-                last_humidity = humidity
-                last_soil = soil
 
+async def sensor_task():
+    """
+    Offers the newest sample to the report policy every SEND_INTERVAL and
+    uploads it if the policy says so. Samples taken while an upload is in flight are coalesced, so
+    a slow backend never holds up sampling or control. With AGGREGATE_WINDOW
+    only samples breaching ALERT_LIMITS go through the policy; the rest
+    reach the backend as one summary per window.
+    """
+    while True:
+        temp, humidity, soil, taken = await report_inbox.get()
+        try:
+            # send if changed beyond the deadbands, or heartbeat due
+            if (not AGGREGATE_WINDOW or window.alert(temp, humidity, soil)) and policy.due(temp, humidity, soil):
+
+                if BATCH_MODE:
+                    # stamped now, uploaded with the rest of the batch
+                    batch.add(temp, humidity, soil)
+                else:
+                    if not wifi_connection.is_connected():
+                        store_offline(temp, humidity, soil)
+                    else:
+                        log.debug("Sending sensor update: %s %s %s", temp, humidity, soil)
+                        try:
+                            # async POST
+                            if BINARY:
+                                resp = await api_client.api_post_readings(wire_format.reading(temp, humidity, soil))
+                            else:
+                                resp = await api_client.api_post_manual({
+                                    "temp": temp,
+                                    "humidity": humidity,
+                                    "soil_moisture": soil
+                                })
+                        except Exception as e:
+                            # network error or 5xx: keep it on flash (4xx: rejected for good);
+                            # either way it is handled, so the next tick doesn't store it again
+                            if offline_worthy(e):
+                                store_offline(temp, humidity, soil)
+                            policy.sent(temp, humidity, soil)
+                            raise
+                        metrics.count("uploads")
+                        report_latency.record(taken)
+                        take_commands(resp)
+                        # LED feedback (runs alongside, doesn't hold the reporter)
+                        asyncio.create_task(status_led.led_sending())
+
+                policy.sent(temp, humidity, soil)
+
+            # flush the batch when full or old enough (to flash if the upload fails)
+            if BATCH_MODE and batch.due():
+                if not wifi_connection.is_connected():
+                    batch.spill(offline)
+                else:
+                    log.info("Sending sensor batch: %d readings", batch.count)
+                    try:
+                        if BINARY:
+                            resp = await api_client.api_post_readings(batch.frame(), batch=True)
+                        else:
+                            resp = await api_client.api_post_batch(batch.payload())
+                    except Exception as e:
+                        if offline_worthy(e):
+                            batch.spill(offline)
+                        else:
+                            batch.clear()   # rejected for good
+                        raise
+                    batch.clear()
+                    metrics.count("uploads")
+                    report_latency.record(taken)
+                    take_commands(resp)
+                    asyncio.create_task(status_led.led_sending())
+
+            if AGGREGATE_WINDOW and window.due():
+                await send_window()
+
+        except api_client.HTTPError as e:
+            # backend answered but rejected the upload (auth, validation, server error)
+            metrics.count("upload_failures")
+            log.warn("Upload rejected: HTTP %s %s", e.status, e.body)
+            status_led.signal_error()
         except Exception as e:
-            print("Error in sensor_task:", e)
-            # spawn LED error indicator (non-blocking)
-            asyncio.create_task(status_led.led_error())
+            metrics.count("upload_failures")
+            log.error("Error in sensor_task: %s", e)
+            # LED error indicator (non-blocking, one task however many errors)
+            status_led.signal_error()
 
         await asyncio.sleep(SEND_INTERVAL)
 
 
-async def command_task():
-    """Polls backend for actuator commands."""
-    global last_pump_state, last_fan_state
-    global manual_override_pump, manual_override_fan, last_command_time
+def ack_commands():
+    """Queues the ack of state.seq with the real GPIO outputs for the next request."""
+    api_client.command_ack(state.seq, actuator_control.get_pump_state(), actuator_control.get_fan_state())
+
 
+def configure_policy(commands):
+    """Applies a reporting policy pushed by the backend; a malformed one is logged and ignored."""
+    if "report" in commands:
+        try:
+            policy.configure(commands["report"])
+        except ValueError as e:
+            log.warn("Report policy ignored: %s", e)
+
+
+def apply_commands(commands):
+    """Applies backend actuator commands; returns True if anything changed."""
+    log.info("Received commands: %s", commands)
+    seq = state.seq
+    changed = state.command(commands)
+    actuate(changed)
+    configure_policy(commands)
+    if state.seq != seq:
+        ack_commands()
+    if changed & PUMP:
+        log.info("Pump manually set to %s", state.pump)
+    if changed & FAN:
+        log.info("Fan manually set to %s", state.fan)
+    return bool(changed)
+
+
+def take_commands(resp):
+    """Applies actuator commands piggybacked on an upload response, if new."""
+    if not COMMAND_PIGGYBACK:
+        return
+    commands = api_client.piggybacked_commands(resp)
+    if commands:
+        apply_commands(commands)
+
+
+async def command_fallback_task():
+    """
+    Without COMMAND_LONG_POLL, commands arrive on upload responses
+    (COMMAND_PIGGYBACK) and this task only polls (conditional GET, 304 when
+    unchanged) once no command state has arrived for
+    COMMAND_FALLBACK_INTERVAL, e.g. while readings are stable and nothing
+    is uploaded.
+    """
     while True:
+        age = api_client.commands_age()
+        if age is not None and age < COMMAND_FALLBACK_INTERVAL:
+            await asyncio.sleep(COMMAND_FALLBACK_INTERVAL - age)
+            continue
         try:
-            commands = await api_client.api_get_manual()
+            commands = await api_client.api_poll_commands()
             if commands:
-                print("Received commands:", commands) # ---- check if gets commands
-                last_command_time = time.time()
-
-                # Pump
-                if "pump" in commands:
-                    pump_cmd = bool(commands["pump"])
-                    if manual_override_pump != pump_cmd:
-                        if pump_cmd != last_pump_state:
-                            actuator_control.set_pump(pump_cmd)
-                            print(f"Pump manually set to {pump_cmd}")
-                            last_pump_state = pump_cmd
-                        manual_override_pump = pump_cmd
-                        # manual_override_pump = True  # override only if pump ON (True); original: ... = pump_cmd
-                
-                # fan
-                if "fan" in commands:
-                    fan_cmd = bool(commands["fan"])
-                    if manual_override_fan != fan_cmd:
-                        if fan_cmd != last_fan_state:
-                            actuator_control.set_fan(fan_cmd)
-                            print(f"Fan manually set to {fan_cmd}")
-                            last_fan_state = fan_cmd
-                        manual_override_fan = fan_cmd
-                        # manual_override_pump = True  # override only if pump ON (True); original: ... = pump_cmd
+                apply_commands(commands)
+        except api_client.HTTPError as e:
+            log.warn("Command fetch rejected: HTTP %s %s", e.status, e.body)
+            status_led.signal_error()
+        except Exception as e:
+            log.error("Error in command_fallback_task: %s", e)
+            status_led.signal_error()
+        await asyncio.sleep(COMMAND_FALLBACK_INTERVAL)
+
 
+async def command_task():
+    """
+    Receives actuator commands over a long-poll: the backend holds each request
+    until a command changes (or COMMAND_WAIT passes) and the next one is sent
+    right away. If the backend answers without holding, or fails, falls back
+    to polling that speeds up after a change and backs off while idle.
+    """
+    interval = COMMAND_POLL_INTERVAL
+
+    while True:
+        started = time.ticks_ms()
+        changed = False
+        try:
+            commands = await api_client.api_wait_commands(COMMAND_WAIT)
+            if commands:
+                changed = apply_commands(commands)
+            held = time.ticks_diff(time.ticks_ms(), started) >= COMMAND_WAIT * 500
+            if changed or held:
+                interval = COMMAND_POLL_INTERVAL
+                continue    # long-poll is working: re-arm immediately
+
+        except api_client.HTTPError as e:
+            log.warn("Command fetch rejected: HTTP %s %s", e.status, e.body)
+            status_led.signal_error()
         except Exception as e:
-            print("Error in command_task:", e)
-            asyncio.create_task(status_led.led_error())
+            log.error("Error in command_task: %s", e)
+            status_led.signal_error()
 
-        await asyncio.sleep(COMMAND_POLL_INTERVAL)
+        # fallback polling: back off while nothing changes
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, COMMAND_POLL_MAX)
 
 
 async def initial_sync():
     """Fetch and apply initial backend state before auto-control starts."""
-    global last_pump_state, last_fan_state
-    global manual_override_pump, manual_override_fan, last_command_time
-
     try:
         commands = await api_client.api_get_manual()
         if commands:
-            print("[SYNC] Initial backend state:", commands)
-            last_command_time = time.time()
-
-            # Pump
+            log.info("[SYNC] Initial backend state: %s", commands)
+            actuate(state.command(commands, sync=True))
+            configure_policy(commands)
+            if "version" in commands:
+                ack_commands()
             if "pump" in commands:
-                pump_cmd = bool(commands["pump"])
-                manual_override_pump = pump_cmd
-                actuator_control.set_pump(pump_cmd)
-                last_pump_state = pump_cmd
-                print(f"[SYNC] Pump set to {pump_cmd}")
-
-            # Fan
+                log.info("[SYNC] Pump set to %s", state.pump)
             if "fan" in commands:
-                fan_cmd = bool(commands["fan"])
-                manual_override_fan = fan_cmd
-                actuator_control.set_fan(fan_cmd)
-                last_fan_state = fan_cmd
-                print(f"[SYNC] Fan set to {fan_cmd}")
+                log.info("[SYNC] Fan set to %s", state.fan)
 
         else:
-            print("[SYNC] No initial commands received, defaulting to auto-control.")
+            log.info("[SYNC] No initial commands received, defaulting to auto-control.")
 
     except Exception as e:
-        print("[SYNC ERROR]", e)
+        log.error("[SYNC ERROR] %s", e)
         
         
+async def offline_drain_task():
+    """Uploads readings stored during outages, oldest first, in small batches."""
+    while True:
+        try:
+            if offline.pending and wifi_connection.is_connected():
+                payload = offline.peek(BINARY)
+                if payload:
+                    if BINARY:
+                        resp = await api_client.api_post_readings(payload, batch=True)
+                    else:
+                        resp = await api_client.api_post_batch(payload)
+                    sent = offline.commit()
+                    metrics.count("uploads")
+                    take_commands(resp)
+                    log.info("[OFFLINE] Uploaded %d stored readings, %d left", sent, offline.pending)
+        except api_client.HTTPError as e:
+            if 400 <= e.status < 500:
+                offline.commit()  # rejected for good: don't retry it forever
+            metrics.count("upload_failures")
+            log.warn("[OFFLINE] Upload rejected: HTTP %s %s", e.status, e.body)
+        except Exception as e:
+            metrics.count("upload_failures")
+            log.error("Error in offline_drain_task: %s", e)
+        await asyncio.sleep(OFFLINE_DRAIN_INTERVAL)
+
+
 async def led_task():
     """Background heartbeat LED (non-blocking)."""
     await status_led.led_heartbeat()  # this function yields forever
@@ -183,10 +418,19 @@ async def gc_task():
     """Force garbage collection periodically."""
     while True:
         try:
+            start = time.ticks_ms()
             gc.collect()
-            print(f"[GC] Free RAM: {gc.mem_free()} bytes")
+            gc_pause.since(start)
+            metrics.heap(gc.mem_free())
+            if log.enabled(log.INFO):   # the stats below build strings and dicts
+                log.info("[GC] Free RAM: %d bytes", gc.mem_free())
+                log.info("[PIPE] last/avg/max %s, coalesced=%d", pipeline.summary(), report_inbox.dropped)
+                log.info("[REPORT] %s", policy.stats())
+                if AGGREGATE_WINDOW:
+                    log.info("[WINDOW] %s", window.stats())
+                log.info("[LOG] %s", log.stats())
         except Exception as e:
-            print("[GC ERROR]", e)
+            log.error("[GC ERROR] %s", e)
         await asyncio.sleep(GC_INTERVAL)
         
 
@@ -195,33 +439,80 @@ async def wifi_monitor_task():
     while True:
         try:
             if not wifi_connection.is_connected():
-                print("[WiFi] Lost connection. Reconnecting...")
+                log.warn("[WiFi] Lost connection. Reconnecting...")
+                metrics.count("wifi_reconnects")
+                api_client.close_all()     # TLS sessions died with the link
                 await wifi_connection.connect_wifi()
+                dns_cache.invalidate()     # new network, possibly new DNS
                 await status_led.led_wifi_connected()
         except Exception as e:
-            print("Wifi monitor error:", e)
+            log.error("Wifi monitor error: %s", e)
         await asyncio.sleep(WIFI_CHECK_INTERVAL)
         
 
 
+async def lag_probe_task():
+    """Measures event-loop lag: how much later than asked a short sleep returns."""
+    while True:
+        start = time.ticks_ms()
+        await asyncio.sleep_ms(LAG_PROBE_MS)
+        loop_lag.observe(max(0, time.ticks_diff(time.ticks_ms(), start) - LAG_PROBE_MS))
+
+
+async def health_task():
+    """Uploads the telemetry snapshot (counters, histograms, heap, RSSI) every HEALTH_INTERVAL."""
+    while True:
+        await asyncio.sleep(HEALTH_INTERVAL)
+        if not wifi_connection.is_connected():
+            continue    # counters keep running; the next snapshot covers the gap
+        try:
+            free = gc.mem_free()
+            metrics.heap(free)
+            await api_client.api_post_health(metrics.snapshot(heap_free=free, rssi=wifi_connection.rssi()))
+        except Exception as e:
+            log.warn("Health upload failed: %s", e)
+
+
+async def upload_crash_log():
+    """Sends the log saved by the last fatal error to the backend, then deletes it."""
+    data = log.saved(LOG_CRASH_FILE)
+    if not data:
+        return
+    try:
+        await api_client.api_post_logs(data, "crash")
+        log.discard_saved(LOG_CRASH_FILE)
+        log.info("Crash log uploaded (%d bytes)", len(data))
+    except Exception as e:
+        log.warn("Crash log upload failed: %s", e)   # kept for the next boot
+
+
 # ===== MAIN =====
 async def main():      
     # LED startup sequence
     await status_led.led_startup()
 
+    # timer-driven, filtered sensor sampling
+    read_sensors.start_sampling()
+
     # WiFi connect (async)
     await wifi_connection.connect_wifi()
     await status_led.led_wifi_connected()
     
     await initial_sync()
+    await upload_crash_log()
 
     # Run all tasks concurrently
     await asyncio.gather(
+        sampler_task(),
+        control_task(),
         sensor_task(),
-        command_task(),
+        command_task() if COMMAND_LONG_POLL else command_fallback_task(),
         led_task(),
         gc_task(),
         wifi_monitor_task(),
+        offline_drain_task(),
+        lag_probe_task(),
+        health_task(),
         test_display.test_display_task(),
 #         display_task(),
     )
@@ -231,7 +522,8 @@ if __name__ == "__main__":
     try:
         asyncio.run(main())
     except Exception as e:
-        print("Fatal error in main:", e)
+        log.error("Fatal error in main: %s", e)
+        log.save(LOG_CRASH_FILE)
         try:
             import uasyncio as _a
             _a.run(status_led.led_error())
@@ -0,0 +1,97 @@
+# metrics.py
+# Runtime telemetry: counters and fixed-bucket latency histograms, shipped
+# to the backend as one compact snapshot (see main.health_task()).
+import time
+from array import array
+
+# upper bounds (ms) shared by every histogram; one more bucket counts the rest
+BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# name -> count since boot
+counters = {}
+
+# every Histogram created, in creation order, for snapshot()
+_histograms = []
+
+_heap_min = None
+_uptime_ms = 0
+_ticked = time.ticks_ms()
+
+
+def count(name, n=1):
+    """Adds n to counter `name` (created at 0 on first use)."""
+    counters[name] = counters.get(name, 0) + n
+
+
+class Histogram:
+    """
+    Millisecond durations in BOUNDS buckets, plus count, sum and max.
+    Fixed size: observe() only increments preallocated counters.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.buckets = array("I", [0] * (len(BOUNDS) + 1))
+        self.count = 0
+        self.total_ms = 0
+        self.max_ms = 0
+        _histograms.append(self)
+
+    def observe(self, ms):
+        i = 0
+        for bound in BOUNDS:
+            if ms <= bound:
+                break
+            i += 1
+        self.buckets[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def since(self, start):
+        """Observes the time elapsed since `start` (ticks_ms); returns it."""
+        ms = time.ticks_diff(time.ticks_ms(), start)
+        self.observe(ms)
+        return ms
+
+
+def uptime():
+    """Seconds since boot; call at least every few days (ticks_ms wraps)."""
+    global _uptime_ms, _ticked
+    now = time.ticks_ms()
+    _uptime_ms += time.ticks_diff(now, _ticked)
+    _ticked = now
+    return _uptime_ms // 1000
+
+
+def heap(free):
+    """Records a gc.mem_free() reading; the lowest one is reported."""
+    global _heap_min
+    if _heap_min is None or free < _heap_min:
+        _heap_min = free
+
+
+def snapshot(**extra):
+    """
+    Everything since boot as one JSON-ready dict:
+    {"uptime": s, "heap_min": bytes, "bounds": BOUNDS, "counters": {...},
+     "histograms": {name: [count, total_ms, max_ms, [buckets...]]}, **extra}
+    Trailing empty buckets are left out.
+    """
+    snap = {
+        "uptime": uptime(),
+        "heap_min": _heap_min,
+        "bounds": BOUNDS,
+        "counters": counters,
+        "histograms": {h.name: [h.count, h.total_ms, h.max_ms, _used(h.buckets)] for h in _histograms},
+    }
+    snap.update(extra)
+    return snap
+
+
+def _used(buckets):
+    n = len(buckets)
+    while n and not buckets[n - 1]:
+        n -= 1
+    return list(buckets[:n])
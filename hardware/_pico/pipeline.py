@@ -0,0 +1,71 @@
+# pipeline.py
+# Plumbing between the sampler, control and reporter tasks in main.py.
+import time
+import uasyncio as asyncio
+
+
+class Mailbox:
+    """
+    Single-slot queue between two tasks. put() never blocks: an item nobody
+    has read yet is replaced by the newer one (counted in `dropped`), so a
+    slow consumer always gets the latest sample instead of a backlog.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._full = False
+        self._event = asyncio.Event()
+        self.dropped = 0
+
+    def put(self, item):
+        if self._full:
+            self.dropped += 1
+        self._item = item
+        self._full = True
+        self._event.set()
+
+    async def get(self):
+        while not self._full:
+            self._event.clear()
+            await self._event.wait()
+        item = self._item
+        self._item = None
+        self._full = False
+        return item
+
+
+# every Latency created, in creation order, for stats()
+_stages = []
+
+
+class Latency:
+    """Milliseconds from a sample being taken to a stage finishing with it."""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.last_ms = 0
+        self.max_ms = 0
+        self._total_ms = 0
+        _stages.append(self)
+
+    def record(self, since):
+        """Records the time elapsed since `since` (a ticks_ms value)."""
+        ms = time.ticks_diff(time.ticks_ms(), since)
+        self.count += 1
+        self.last_ms = ms
+        self._total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def avg_ms(self):
+        return self._total_ms // self.count if self.count else 0
+
+
+def stats():
+    """{stage: (count, last_ms, avg_ms, max_ms)} for every stage."""
+    return {s.name: (s.count, s.last_ms, s.avg_ms(), s.max_ms) for s in _stages}
+
+
+def summary():
+    return " ".join(f"{s.name}={s.last_ms}/{s.avg_ms()}/{s.max_ms}ms" for s in _stages)
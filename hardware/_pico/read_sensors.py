@@ -1,6 +1,9 @@
 import machine
 import time
 import math
+from array import array
+from config import ADC_SAMPLE_HZ, ADC_WINDOW
+from helpers import logger as log
 
 # === CONFIGURATION ===
 # Thermistor parameters
@@ -23,48 +26,187 @@ adc_humidity = machine.ADC(machine.Pin(HUMIDITY_PIN))
 adc_soil = machine.ADC(machine.Pin(SOIL_PIN))
 
 
+# === ACQUISITION ===
+# A timer samples every channel at ADC_SAMPLE_HZ into a ring of the latest
+# ADC_WINDOW raw values; a read returns the trimmed mean of that window,
+# so single noisy samples never reach the change detection or the control.
+_TRIM = ADC_WINDOW // 4                 # samples dropped at each end
+_scratch = array("H", [0] * ADC_WINDOW)  # sort buffer shared by all channels
+
+
+class _Channel:
+    def __init__(self, adc):
+        self.adc = adc
+        self.ring = array("H", [0] * ADC_WINDOW)
+        self.i = 0
+        self.conversion_us = 0      # duration of this channel's last filter + conversion
+
+    def sample(self):
+        # runs from the timer callback: no allocation here
+        self.ring[self.i] = self.adc.read_u16()
+        self.i = (self.i + 1) % ADC_WINDOW
+
+    def value(self):
+        """Trimmed mean of the window, as a raw 16-bit value."""
+        if _timer is None:
+            # sampler not running (e.g. test loop): take a burst now
+            for _ in range(ADC_WINDOW):
+                self.sample()
+        s, ring = _scratch, self.ring
+        for k in range(ADC_WINDOW):
+            v = ring[k]
+            j = k
+            while j and s[j - 1] > v:   # insertion sort into the scratch buffer
+                s[j] = s[j - 1]
+                j -= 1
+            s[j] = v
+        total = 0
+        for k in range(_TRIM, ADC_WINDOW - _TRIM):
+            total += s[k]
+        return total // (ADC_WINDOW - 2 * _TRIM)
+
+
+_temp = _Channel(adc_temp)
+_humidity = _Channel(adc_humidity)
+_soil = _Channel(adc_soil)
+
+_timer = None
+_samples = 0            # samples taken per channel since start_sampling()
+_started = 0
+
+
+def _sample_all(t):
+    global _samples
+    _temp.sample()
+    _humidity.sample()
+    _soil.sample()
+    _samples += 1
+
+
+def start_sampling():
+    """Starts the timer-driven sampler (call once at boot)."""
+    global _timer, _samples, _started
+    for _ in range(ADC_WINDOW):     # prime the windows
+        _sample_all(None)
+    _samples = 0
+    _started = time.ticks_ms()
+    _timer = machine.Timer(mode=machine.Timer.PERIODIC, freq=ADC_SAMPLE_HZ, callback=_sample_all)
+
+
+def stop_sampling():
+    global _timer
+    if _timer is not None:
+        _timer.deinit()
+        _timer = None
+
+
+def stats():
+    """Achieved sampling rate per channel and each channel's last conversion cost."""
+    elapsed = time.ticks_diff(time.ticks_ms(), _started) if _timer else 0
+    return {
+        "samples_per_s": _samples * 1000 // elapsed if elapsed else 0,
+        "conversion_us": {
+            "temp": _temp.conversion_us,
+            "humidity": _humidity.conversion_us,
+            "soil": _soil.conversion_us,
+        },
+    }
+
+
+def _percent(raw):
+    # fixed-point: tenths of a percent, rounded; one float op at the end
+    return ((raw * 1000 + 32767) // 65535) / 10
+
+
 # === SENSOR FUNCTIONS ===
+def _thermistor_c(raw):
+    """Closed-form Beta equation: raw 16-bit ADC value → °C (float)."""
+    # divider: V = VCC * raw / 65535, so VCC cancels out of R
+    resistance = SERIES_RESISTOR * (65535 / raw - 1)
+    temperature_k = 1 / ((1 / BETA) * math.log(resistance / R0) + (1 / T0))
+    return temperature_k - 273.15
+
+
+def _thermistor_raw(celsius):
+    """Inverse of _thermistor_c(): the raw ADC value at `celsius`."""
+    resistance = R0 * math.exp(BETA * (1 / (celsius + 273.15) - 1 / T0))
+    return int(65535 / (1 + resistance / SERIES_RESISTOR))
+
+
+# Lookup table: °C × 100 at every 256th raw value, built once at import.
+# Linear interpolation between entries stays within ~0.013 °C of the
+# closed form over LUT_MIN_C…LUT_MAX_C, using integer math only. Towards
+# the rails the curve bends too fast for it (off by degrees, up to ~1200 °C
+# next to them), so raw values outside that range use the closed form.
+LUT_MIN_C = -20
+LUT_MAX_C = 80
+_LUT_SHIFT = 8
+_LUT_STEP = 1 << _LUT_SHIFT
+_LUT_RAW_MIN = _thermistor_raw(LUT_MIN_C)
+_LUT_RAW_MAX = _thermistor_raw(LUT_MAX_C) + 1
+
+
+def _build_lut():
+    table = array("h", [0] * ((65536 >> _LUT_SHIFT) + 1))
+    for k in range(len(table)):
+        raw = min(max(k * _LUT_STEP, 1), 65534)     # ends of the curve are singular
+        c = round(_thermistor_c(raw) * 100)
+        table[k] = max(-32768, min(32767, c))
+    return table
+
+
+_temp_lut = _build_lut()
+
+
+def _lut_temperature(raw):
+    if raw < _LUT_RAW_MIN or raw > _LUT_RAW_MAX:
+        return _thermistor_c(raw)
+    i = raw >> _LUT_SHIFT
+    a = _temp_lut[i]
+    b = _temp_lut[i + 1]
+    return (a + ((b - a) * (raw & (_LUT_STEP - 1)) + _LUT_STEP // 2) // _LUT_STEP) / 100
+
+
 def read_temperature():
     """
     Reads the thermistor ADC value and converts it to temperature in °C.
     """
+    t0 = time.ticks_us()
     try:
-        adc_value = adc_temp.read_u16()
-        voltage = (adc_value / 65535) * VCC
-
-        if voltage <= 0:
-            return None  # avoid division by zero
-        resistance = SERIES_RESISTOR * (VCC / voltage - 1)
-
-        temperature_k = 1 / ((1 / BETA) * math.log(resistance / R0) + (1 / T0))
-        temperature_c = temperature_k - 273.15
-        
-        return round(temperature_c, 2)
+        raw = _temp.value()
+        if raw <= 0 or raw >= 65535:
+            return None  # open or shorted thermistor
+        return _lut_temperature(raw)
     except Exception as e:
-        print("Temperature read error:", e)
-        return None  # math domain error if invalid reading
+        log.warn("Temperature read error: %s", e)
+        return None
+    finally:
+        _temp.conversion_us = time.ticks_diff(time.ticks_us(), t0)
 
 
 def read_humidity():
     """
     Reads humidity from a potentiometer (0–3.3V) and converts to percentage.
     """
-    adc_value = adc_humidity.read_u16()
-    humidity_percent = (adc_value / 65535) * 100
-    return round(humidity_percent, 1)
+    t0 = time.ticks_us()
+    humidity_percent = _percent(_humidity.value())
+    _humidity.conversion_us = time.ticks_diff(time.ticks_us(), t0)
+    return humidity_percent
 
 
 def read_soil_moisture():
     """
     Reads soil moisture from a potentiometer (0–3.3V) and converts to percentage.
     """
-    adc_value = adc_soil.read_u16()
-    soil_percent = (adc_value / 65535) * 100
-    return round(soil_percent, 1)
+    t0 = time.ticks_us()
+    soil_percent = _percent(_soil.value())
+    _soil.conversion_us = time.ticks_diff(time.ticks_us(), t0)
+    return soil_percent
 
 
 # === TEST LOOP ===
 if __name__ == "__main__":
+    start_sampling()
     while True:
         temp = read_temperature()
         humidity = read_humidity()
@@ -74,5 +216,6 @@ if __name__ == "__main__":
             print(f"Temperature: {temp}°C | Humidity: {humidity}% | Soil: {soil}%")
         else:
             print("Temperature sensor error")
+        print("Acquisition:", stats())
 
         time.sleep(1)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import machine
 import time
 import am2320
+from helpers import logger as log
 
 # === I2C CONFIGURATION ===
 # AM2320 uses I²C, connect SDA → GP0, SCL → GP1
@@ -12,29 +13,64 @@ SOIL_PIN = 26  # ADC0
 adc_soil = machine.ADC(machine.Pin(SOIL_PIN))
 
 
+# AM2320 needs ≥2 s between measurements; one measurement serves both values
+CLIMATE_MAX_AGE_MS = 2000
+
+_climate = (None, None)     # (temperature °C, humidity %) of the last measurement
+_climate_at = None          # ticks_ms of the last measurement
+
+
 # === SENSOR FUNCTIONS ===
-def read_temperature():
+def _store_climate():
+    global _climate, _climate_at
+    _climate = (round(float(am.temperature()), 2), round(float(am.humidity()), 1))
+    _climate_at = time.ticks_ms()
+    return _climate
+
+
+def _climate_fresh():
+    return _climate_at is not None and time.ticks_diff(time.ticks_ms(), _climate_at) < CLIMATE_MAX_AGE_MS
+
+
+def read_climate():
     """
-    Reads temperature from AM2320 sensor in °C.
+    Returns (temperature °C, humidity %) from one AM2320 measurement,
+    reused for CLIMATE_MAX_AGE_MS. (None, None) if the sensor fails.
     """
+    if _climate_fresh():
+        return _climate
     try:
         am.measure()
-        return round(float(am.temperature()), 2)
+        return _store_climate()
+    except Exception as e:
+        log.warn("Climate read error: %s", e)
+        return (None, None)
+
+
+async def read_climate_async():
+    """read_climate() that yields to the event loop during the sensor waits."""
+    if _climate_fresh():
+        return _climate
+    try:
+        await am.measure_async()
+        return _store_climate()
     except Exception as e:
-        print("Temperature read error:", e)
-        return None
+        log.warn("Climate read error: %s", e)
+        return (None, None)
+
+
+def read_temperature():
+    """
+    Reads temperature from AM2320 sensor in °C.
+    """
+    return read_climate()[0]
 
 
 def read_humidity():
     """
     Reads realtive humidity from AM2320 sensor in %.
     """
-    try:
-        am.measure()
-        return round(float(am.humidity()),1)
-    except Exception as e:
-        print("Humidity read error:", e)
-        return None
+    return read_climate()[1]
 
 
 def read_soil_moisture():
@@ -0,0 +1,65 @@
+# sim/__init__.py
+"""
+Host-side simulation of the Pico firmware on CPython.
+
+install() puts drop-in fakes for the MicroPython-only modules (machine,
+network, rp2, micropython, uasyncio, ujson, usocket, urequests, ntptime)
+into sys.modules, points `time` and `gc` at a virtual clock and heap, and
+provides a `data_transfer.secrets` aimed at a local stand-in backend.
+After that, `main`, `read_sensors`, `actuator_control`, etc. import and run
+unchanged. See sim/__main__.py for the runner (`python -m sim`).
+"""
+import os
+import sys
+import types
+
+_PICO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def install(speed=1.0, server_url="http://127.0.0.1:8080", device_id="SIM_PICO_001",
+            offline_dir=None):
+    """Installs the fakes; call before importing any firmware module."""
+    for path in (os.path.join(_PICO_ROOT, "lib"), _PICO_ROOT):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    import socket
+    from sim import clock, memory
+    from sim import machine, network, rp2, micropython, uasyncio, ujson, ntptime
+
+    clock.start(speed)
+    clock.patch_time_module()
+    memory.patch_gc_module()
+
+    sys.modules.update({
+        "machine": machine,
+        "network": network,
+        "rp2": rp2,
+        "micropython": micropython,
+        "uasyncio": uasyncio,
+        "ujson": ujson,
+        "usocket": socket,
+        "urequests": types.ModuleType("urequests"),
+        "ntptime": ntptime,
+    })
+
+    secrets = types.ModuleType("data_transfer.secrets")
+    secrets.SSID = "sim-wlan"
+    secrets.PSK = "sim-psk"
+    secrets.SERVER_URL = server_url
+    secrets.DEVICE_ID = device_id
+    secrets.HEADERS = {"Content-Type": "application/json", "x-api-key": "sim-key"}
+    import data_transfer
+    data_transfer.secrets = secrets
+    sys.modules["data_transfer.secrets"] = secrets
+
+    # keep the flash log out of the host's root filesystem
+    import config
+    if offline_dir is None:
+        import tempfile
+        offline_dir = tempfile.mkdtemp(prefix="pico-offline-")
+    config.OFFLINE_DIR = offline_dir
+    config.LOG_CRASH_FILE = os.path.join(offline_dir, "crash.log")
+
+    import asyncio
+    asyncio.set_event_loop_policy(clock.VirtualClockPolicy())
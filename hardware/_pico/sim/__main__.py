@@ -0,0 +1,155 @@
+# sim/__main__.py
+"""
+Runs main.py on CPython against a local stand-in backend, at accelerated time.
+
+    cd hardware/_pico
+    python -m sim --speed 20 --duration 600 --outage 120:180 --command 300:pump=1
+
+Prints a report of requests, TLS/TCP sessions, GPIO toggles and heap use.
+"""
+import argparse
+import asyncio
+import sys
+
+
+def _outage(text):
+    start, end = text.split(":")
+    return float(start), float(end)
+
+
+def _command(text):
+    at, _, assignments = text.partition(":")
+    states = {}
+    for item in assignments.split(","):
+        name, _, value = item.partition("=")
+        states[name] = value not in ("0", "false", "off")
+    return float(at), states
+
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(prog="python -m sim", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--speed", type=float, default=10.0, help="virtual seconds per wall second")
+    ap.add_argument("--duration", type=float, default=300.0, help="virtual seconds to run")
+    ap.add_argument("--delay", type=float, default=0.0, help="backend response delay (s)")
+    ap.add_argument("--outage", type=_outage, action="append", default=[],
+                    help="Wi-Fi down between START:END virtual seconds")
+    ap.add_argument("--command", type=_command, action="append", default=[],
+                    help="backend command at T, e.g. 60:pump=1,fan=0")
+    ap.add_argument("--no-long-poll", action="store_true",
+                    help="COMMAND_LONG_POLL = False (piggyback + fallback poll only)")
+    ap.add_argument("--binary", action="store_true", help='upload with WIRE_FORMAT = "binary"')
+    ap.add_argument("--window", type=int, default=None,
+                    help="AGGREGATE_WINDOW override in seconds (0 = raw readings)")
+    ap.add_argument("--health", type=int, default=None,
+                    help="HEALTH_INTERVAL override in seconds")
+    ap.add_argument("--log-echo", default="INFO",
+                    help="LOG_ECHO override: lowest log level printed (DEBUG, INFO, WARN, ERROR)")
+    ap.add_argument("--quiet", action="store_true", help="silence firmware prints")
+    return ap.parse_args(argv)
+
+
+def _command_latency(commands, pins):
+    """Seconds from each scripted command to its relay pin taking the value (None: never)."""
+    latency = []
+    for at, states in sorted(commands, key=lambda c: c[0]):
+        for name, value in states.items():
+            pin = pins.get({"pump": 14, "fan": 15}.get(name))
+            hit = pin and next((t for t, v in pin.history if t >= at and bool(v) == value), None)
+            latency.append(round(hit - at, 3) if hit is not None else None)
+    return latency
+
+
+async def _run(args):
+    import gc
+    from sim import clock, machine, memory, network
+    from sim.backend import Backend
+
+    backend = Backend(delay=args.delay)
+    port = await backend.start()
+
+    # the firmware reads SERVER_URL at import, so import it only now
+    from data_transfer import secrets
+    secrets.SERVER_URL = f"http://127.0.0.1:{port}"
+    import config
+    if args.binary:
+        config.WIRE_FORMAT = "binary"
+    if args.no_long_poll:
+        config.COMMAND_LONG_POLL = False
+    if args.window is not None:
+        config.AGGREGATE_WINDOW = args.window
+    if args.health is not None:
+        config.HEALTH_INTERVAL = args.health
+    config.LOG_ECHO = args.log_echo
+    import main
+    import pipeline
+    from data_transfer import api_client
+    memory.reset_baseline()
+    network.outages.extend(args.outage)
+
+    async def script_commands():
+        for at, states in sorted(args.command, key=lambda c: c[0]):
+            await asyncio.sleep(max(0, at - clock.elapsed()))
+            backend.set_command(**states)
+
+    asyncio.create_task(script_commands())
+    firmware = asyncio.create_task(main.main())
+    await asyncio.sleep(args.duration)
+    firmware.cancel()
+    await asyncio.gather(firmware, return_exceptions=True)
+    await backend.stop()
+
+    minutes = args.duration / 60
+    pins = machine.Pin.registry
+    report = {
+        "virtual_seconds": round(clock.elapsed(), 1),
+        "requests": backend.requests,
+        "requests_per_min": round(sum(backend.requests.values()) / minutes, 1),
+        "sessions_opened": backend.connections,
+        "bytes_up": backend.bytes_in,
+        "bytes_down": backend.bytes_out,
+        "readings_stored": len(backend.readings),
+        "summaries_stored": len(backend.summaries),
+        "command_version": backend.version,
+        "command_acked": backend.acked,
+        "command_acks": backend.acks,
+        "relays_reported": backend.reported,
+        "pump_toggles": len(pins[14].history) if 14 in pins else 0,
+        "fan_toggles": len(pins[15].history) if 15 in pins else 0,
+        "command_latency_s": _command_latency(args.command, pins),
+        "wifi_connects": network.connects,
+        "client_handshakes": api_client.client.handshakes,
+        "heap_alloc_bytes": gc.mem_alloc(),
+        "reports_coalesced": main.report_inbox.dropped,
+        "report_policy": main.policy.stats(),
+        "window_stats": main.window.stats(),
+        "log": main.log.stats(),
+        "health_snapshots": len(backend.health),
+        "counters": main.metrics.counters,
+    }
+    for h in main.metrics._histograms:
+        avg = h.total_ms // h.count if h.count else 0
+        report[f"hist_{h.name}_ms"] = f"n={h.count} avg={avg} max={h.max_ms} buckets={list(h.buckets)}"
+    for stage, (count, last_ms, avg_ms, max_ms) in pipeline.stats().items():
+        report[f"latency_{stage}_ms"] = f"n={count} avg={avg_ms} max={max_ms}"
+    return report
+
+
+def run(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    import sim
+    sim.install(speed=args.speed)
+    if args.quiet:
+        import builtins
+        builtins.print = lambda *a, **k: None
+
+    report = asyncio.run(_run(args))
+    sys.stdout.write("\n===== SIMULATION REPORT =====\n")
+    for key, value in report.items():
+        sys.stdout.write(f"{key:20} {value}\n")
+    return report
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,200 @@
+# sim/alloc_bench.py
+"""
+Heap cost of reading one HTTP response on the host, for the three ways
+api_client has done it:
+
+    bytes +=     the original client: read(512) until the server closes,
+                 `resp += data`, then split the head off
+    readline     the first stream client: readline() per header line, then
+                 readexactly(Content-Length) or `resp += data` until close
+    readinto     ResponseParser: readinto() one preallocated buffer
+
+Each variant reads canned responses (a short ack, a command state, a body
+near the RESPONSE_BUFFER_SIZE cap; framed by Content-Length or by closing
+the stream) from an in-memory stream that hands out at most 512 bytes per
+read. Reported per request: bytes allocated (the heap high-water increase
+between stream reads, summed, plus the chunks the stream returns) and the
+peak heap above the starting point. Both include the coroutine object
+CPython creates for every await, a few hundred bytes per response.
+
+    cd hardware/_pico
+    python -m sim.alloc_bench --rounds 200
+
+CPython objects are larger than MicroPython's, so compare the variants
+with each other rather than reading the heap numbers as device values.
+"""
+import argparse
+import asyncio
+import sys
+import tracemalloc
+
+PIECE = 512     # bytes per read, like the old read(512) loop
+
+
+class _Stream:
+    """
+    Async reader over one canned response that tallies the heap: at every
+    read it adds the high-water increase since the previous read to
+    `allocated`, so memory allocated and freed in between still counts.
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._at = 0
+        self.allocated = 0
+        self.peak = 0
+        self._base = tracemalloc.get_traced_memory()[0]
+        self._mark = self._base
+        tracemalloc.reset_peak()
+
+    def _tally(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self.allocated += max(0, peak - self._mark)
+        self.peak = max(self.peak, peak - self._base)
+
+    def _next(self, n):
+        self._tally()
+        k = min(n, PIECE, len(self._raw) - self._at)
+        start = self._at
+        self._at += k
+        return start, k
+
+    def _restart(self, data=None):
+        """Starts the next interval after the stream's own bookkeeping."""
+        tracemalloc.reset_peak()
+        self._mark = tracemalloc.get_traced_memory()[0]
+        if data is not None:
+            self.allocated += sys.getsizeof(data)   # a socket read allocates its result
+        return data
+
+    async def read(self, n=-1):
+        start, k = self._next(PIECE if n < 0 else n)
+        return self._restart(self._raw[start:start + k])
+
+    async def readline(self):
+        self._tally()
+        end = self._raw.find(b"\n", self._at, self._at + PIECE)
+        end = len(self._raw) if end < 0 else end + 1
+        line = self._raw[self._at:end]
+        self._at = end
+        return self._restart(line)
+
+    async def readexactly(self, n):
+        self._tally()
+        if len(self._raw) - self._at < n:
+            raise EOFError
+        data = self._raw[self._at:self._at + n]
+        self._at += n
+        return self._restart(data)
+
+    async def readinto(self, buf):
+        start, k = self._next(len(buf))
+        buf[:k] = self._raw[start:start + k]
+        self._restart()
+        return k
+
+    def finish(self):
+        self._tally()
+
+
+async def _concat(reader, parser):
+    """The original client (blocking socket, one request per connection)."""
+    resp = b""
+    while True:
+        data = await reader.read(PIECE)
+        if not data:
+            break
+        resp += data
+    return resp.split(b"\r\n\r\n", 1)[1]
+
+
+async def _readline(reader, parser):
+    """The first stream client's response read."""
+    status = await reader.readline()
+    content_length = None
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            content_length = int(value.strip())
+    if content_length is None:
+        resp = b""
+        while True:
+            data = await reader.read(PIECE)
+            if not data:
+                break
+            resp += data
+        return resp
+    return await reader.readexactly(content_length)
+
+
+async def _readinto(reader, parser):
+    """Connection._exchange()'s response read."""
+    parser.reset()
+    while not parser.done:
+        k = await reader.readinto(parser.space())
+        if not k:
+            parser.eof()
+            break
+        parser.feed(k)
+    return parser.body()
+
+
+VARIANTS = (("bytes +=", _concat), ("readline", _readline), ("readinto", _readinto))
+
+
+def responses(cap):
+    """(name, framing, raw response, body) for the canned responses."""
+    ack = b'{"message": "Readings stored", "stored": 1, "commands": {"version": 42}}'
+    state = b'{"message": "Readings stored", "stored": 10, "commands": {"pump": true, "fan": false, "version": 43}}'
+    large = b'{"raw": "' + b"x" * (cap - 256) + b'"}'
+    head = b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nDate: Sat, 18 Oct 2026 09:30:00 GMT\r\n"
+    rows = []
+    for name, body in (("ack", ack), ("commands", state), ("near cap", large)):
+        rows.append((name, "length", head + b"Content-Length: %d\r\n\r\n" % len(body) + body, body))
+        rows.append((name, "close", head + b"Connection: close\r\n\r\n" + body, body))
+    return rows
+
+
+async def _bench(rounds):
+    from config import RESPONSE_BUFFER_SIZE
+    from data_transfer.http_response import ResponseParser
+
+    parser = ResponseParser(RESPONSE_BUFFER_SIZE)    # preallocated once, like Connection
+    rows = []
+    for name, framing, raw, body in responses(RESPONSE_BUFFER_SIZE):
+        for variant, read in VARIANTS:
+            assert bytes(await read(_Stream(raw), parser)) == body
+            allocated = peak = 0
+            for _ in range(rounds):
+                stream = _Stream(raw)
+                resp = await read(stream, parser)
+                stream.finish()
+                del resp
+                allocated += stream.allocated
+                peak = max(peak, stream.peak)
+            rows.append((name, framing, len(raw), variant, allocated / rounds, peak))
+    return rows
+
+
+def run(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m sim.alloc_bench", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=200, help="responses read per variant and case")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+
+    import sim
+    sim.install(speed=1)
+    rows = asyncio.run(_bench(args.rounds))
+
+    sys.stdout.write(f"\n{'response':9} {'framing':7} {'bytes':>6} {'read':9} {'alloc/req':>10} {'peak':>6}\n")
+    for name, framing, size, variant, allocated, peak in rows:
+        sys.stdout.write(f"{name:9} {framing:7} {size:6} {variant:9} {allocated:10.0f} {peak:6}\n")
+    return rows
+
+
+if __name__ == "__main__":
+    run()
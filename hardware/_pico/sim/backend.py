@@ -0,0 +1,204 @@
+# sim/backend.py
+# Stand-in for the Express backend's device endpoints (HTTP or HTTPS, keep-alive).
+import asyncio
+import json
+import math
+import struct
+
+WIRE_TYPE = "application/x-greenhouse-readings"
+
+
+def decode_wire(body):
+    """wire_format body → list of reading dicts, like the backend's decoder."""
+    version, flags, count = struct.unpack_from("<BBH", body)
+    if version != 1 or flags or len(body) != 4 + 16 * count:
+        raise ValueError("bad wire_format body")
+    readings = []
+    for i in range(count):
+        ts, *values = struct.unpack_from("<Ifff", body, 4 + 16 * i)
+        r = {"timestamp": ts} if ts else {}
+        for name, v in zip(("temp", "humidity", "soil_moisture"), values):
+            if not math.isnan(v):
+                r[name] = v
+        readings.append(r)
+    return readings
+
+
+def decode_summaries(body):
+    """wire_format summary body → list of summary dicts (JSON shape)."""
+    version, flags, count = struct.unpack_from("<BBH", body)
+    if version != 1 or flags != 1 or len(body) != 4 + 48 * count:
+        raise ValueError("bad wire_format summary body")
+    summaries = []
+    for i in range(count):
+        ts, window, *values = struct.unpack_from("<IHHfffHfffHfff", body, 4 + 48 * i)
+        s = {"window": window}
+        if ts:
+            s["timestamp"] = ts
+        for k, name in enumerate(("temp", "humidity", "soil_moisture")):
+            n, low, high, mean = values[4 * k:4 * k + 4]
+            if n:
+                s[name] = {"min": low, "max": high, "mean": mean, "count": n}
+        summaries.append(s)
+    return summaries
+
+
+class Backend:
+    """
+    Serves POST /api/data/{id}, POST /api/data/{id}/batch and
+    GET /api/data/{id}/commands (long-poll + ETag versioning) like the real
+    backend, and counts what the device sends. `delay` adds latency to
+    every response; `max_requests` closes a session after that many
+    requests (Connection: close), like a server's keep-alive limit; `ssl`
+    (an SSLContext, given to start()) serves HTTPS. X-Command-Ack headers are recorded in `acked` /
+    `reported`; uploads carry the full commands only until they are acked.
+    """
+
+    def __init__(self, delay=0.0, max_requests=None):
+        self.delay = delay
+        self.max_requests = max_requests
+        self.commands = {"pump": False, "fan": False}
+        self.version = 0
+        self.acked = None               # last command version the device acked
+        self.reported = {}              # relay outputs from the last ack
+        self.acks = 0
+        self.readings = []              # every stored reading dict
+        self.summaries = []             # every stored window summary dict
+        self.logs = []                  # (reason, text) of uploaded device logs
+        self.health = []                # uploaded health snapshot dicts
+        self.requests = {}              # route -> count
+        self.connections = 0            # TCP sessions the device opened
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._changed = asyncio.Event()
+        self._server = None
+        self._handlers = set()
+
+    async def start(self, host="127.0.0.1", port=0, ssl=None):
+        self._server = await asyncio.start_server(self._handle, host, port, ssl=ssl)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+        for task in self._handlers:
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    def set_command(self, **states):
+        """Simulates a user toggling actuators in the app."""
+        self.commands.update(states)
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    # ===== HTTP =====
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        served = 0
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, _ = line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    self.bytes_in += len(h)
+                    if h in (b"\r\n", b""):
+                        break
+                    name, _, value = h.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+                self.bytes_in += len(line) + len(body)
+
+                status, payload, extra = await self._route(method, target, headers, body)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                data = b"" if payload is None else json.dumps(payload).encode()
+                head = f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                for name, value in extra.items():
+                    head += f"{name}: {value}\r\n"
+                served += 1
+                last = self.max_requests is not None and served >= self.max_requests
+                head += f"Content-Length: {len(data)}\r\nConnection: {'close' if last else 'keep-alive'}\r\n\r\n"
+                out = head.encode() + data
+                self.bytes_out += len(out)
+                writer.write(out)
+                await writer.drain()
+                if last:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass    # device hung up, or the harness is stopping
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _route(self, method, target, headers, body):
+        path, _, query = target.partition("?")
+        params = dict(p.partition("=")[::2] for p in query.split("&") if p)
+        parts = path.strip("/").split("/")          # api, data, {id}, [batch|commands]
+        route = f"{method} {'/'.join(parts[3:]) or 'data'}"
+        self.requests[route] = self.requests.get(route, 0) + 1
+
+        # every device route of the real backend calls takeCommandAck()
+        if "x-command-ack" in headers:
+            self._ack(headers["x-command-ack"])
+
+        binary = headers.get("content-type") == WIRE_TYPE
+        if method == "POST" and len(parts) == 3:
+            self.readings.append(decode_wire(body)[0] if binary else json.loads(body))
+            return 200, {"message": "Readings stored", "stored": 1, "commands": self._pending()}, {}
+        if method == "POST" and parts[3:] == ["batch"]:
+            batch = decode_wire(body) if binary else json.loads(body)["readings"]
+            self.readings.extend(batch)
+            return 200, {"message": "Readings stored", "stored": len(batch), "commands": self._pending()}, {}
+        if method == "POST" and parts[3:] == ["summary"]:
+            summaries = decode_summaries(body) if binary else [json.loads(body)]
+            self.summaries.extend(summaries)
+            return 200, {"message": "Summaries stored", "stored": len(summaries), "commands": self._pending()}, {}
+        if method == "POST" and parts[3:] == ["logs"]:
+            self.logs.append((params.get("reason"), body.decode()))
+            return 200, {"message": "Log stored"}, {}
+        if method == "POST" and parts[3:] == ["health"]:
+            self.health.append(json.loads(body))
+            return 200, {"message": "Health stored"}, {}
+        if method == "GET" and parts[3:] == ["commands"]:
+            return await self._commands(headers, params)
+        return 404, {"message": "Not found"}, {}
+
+    async def _commands(self, headers, params):
+        known = None
+        tag = headers.get("if-none-match", "")
+        if tag.startswith('"v'):
+            known = int(tag[2:-1])
+        wait = min(float(params.get("wait", 0)), 30)
+        if wait and known == self.version:
+            try:
+                await asyncio.wait_for(self._changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+        etag = {"ETag": f'"v{self.version}"'}
+        if known == self.version:
+            return 304, None, etag
+        return 200, self._state(), etag
+
+    def _state(self):
+        return dict(self.commands, version=self.version)
+
+    def _pending(self):
+        if self.acked is not None and self.acked >= self.version:
+            return {"version": self.version}
+        return self._state()
+
+    def _ack(self, value):
+        seq, *fields = value.split(";")
+        if self.acked is None or int(seq) >= self.acked:
+            self.acked = int(seq)
+            self.reported = {k: v == "1" for k, v in (f.partition("=")[::2] for f in fields)}
+        self.acks += 1
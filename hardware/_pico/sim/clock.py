@@ -0,0 +1,96 @@
+# sim/clock.py
+# Virtual clock: simulated time runs `speed` times faster than wall time.
+import asyncio
+import time as _time
+
+_real_monotonic = _time.monotonic
+_real_time = _time.time
+_real_sleep = _time.sleep
+
+speed = 1.0
+_m0 = _real_monotonic()
+_epoch0 = _real_time()
+
+
+def start(factor):
+    """(Re)starts the virtual clock at the current wall time."""
+    global speed, _m0, _epoch0
+    speed = float(factor)
+    _m0 = _real_monotonic()
+    _epoch0 = _real_time()
+
+
+def elapsed():
+    """Virtual seconds since start()."""
+    return (_real_monotonic() - _m0) * speed
+
+
+# ===== MicroPython `time` API on the virtual clock =====
+def time():
+    return int(_epoch0 + elapsed())     # MicroPython returns whole seconds
+
+
+def ticks_ms():
+    return int(elapsed() * 1000) & 0x3FFFFFFF
+
+
+def ticks_us():
+    return int(elapsed() * 1_000_000) & 0x3FFFFFFF
+
+
+def ticks_diff(a, b):
+    d = (a - b) & 0x3FFFFFFF
+    return d - 0x40000000 if d & 0x20000000 else d
+
+
+def ticks_add(t, delta):
+    return (t + delta) & 0x3FFFFFFF
+
+
+def sleep(s):
+    _real_sleep(s / speed)
+
+
+def sleep_ms(ms):
+    _real_sleep(ms / 1000 / speed)
+
+
+def sleep_us(us):
+    _real_sleep(us / 1_000_000 / speed)
+
+
+def patch_time_module():
+    """Points the stdlib `time` functions used by the firmware at the virtual clock."""
+    for name in ("time", "ticks_ms", "ticks_us", "ticks_diff", "ticks_add",
+                 "sleep", "sleep_ms", "sleep_us"):
+        setattr(_time, name, globals()[name])
+
+
+# ===== event loop on the virtual clock =====
+class _ScaledSelector:
+    """Wraps the loop's selector so waits last 1/speed of their virtual length."""
+
+    def __init__(self, selector):
+        self._selector = selector
+
+    def select(self, timeout=None):
+        if timeout is not None:
+            timeout /= speed
+        return self._selector.select(timeout)
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    def __init__(self):
+        super().__init__()
+        self._selector = _ScaledSelector(self._selector)
+
+    def time(self):
+        return elapsed()
+
+
+class VirtualClockPolicy(asyncio.DefaultEventLoopPolicy):
+    def new_event_loop(self):
+        return VirtualClockLoop()
@@ -0,0 +1,100 @@
+# sim/crc_bench.py
+"""
+Compares the AM2320 driver's checksum variants on the host: time and heap
+allocated per measurement check (the 6 data bytes of an 8-byte frame)
+
+    bitwise     the original AM2320._crc16(buf[:-2]): a slice, 8 steps a byte
+    table       _crc16_py over a memoryview prefix, one lookup a byte
+    native      _crc_native.crc16 (@micropython.native)
+
+and checks that all three agree on random frames first.
+
+    cd hardware/_pico
+    python -m sim.crc_bench
+
+On CPython @micropython.native is a no-op, so "native" times the same code
+as "table"; on the Pico it runs as machine code. CPython objects are
+larger than MicroPython's, so compare the variants with each other rather
+than reading the numbers as device values.
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+
+def crc16_bitwise(buf):
+    """The driver's original AM2320._crc16 (CRC-16/MODBUS, one bit at a time)."""
+    crc = 0xFFFF
+    for c in buf:
+        crc ^= c
+        for _ in range(8):
+            if crc & 0x01:
+                crc >>= 1
+                crc ^= 0xA001
+            else:
+                crc >>= 1
+    return crc
+
+
+def _heap(fn):
+    """Peak bytes allocated by one call (after a warm-up call)."""
+    fn()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    fn()
+    return tracemalloc.get_traced_memory()[1] - base
+
+
+def _time_us(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / rounds
+
+
+def cases(am2320, crc_native, frame):
+    """(variant, call()) checksumming the first 6 bytes of `frame`, as _verify() does."""
+    buf = bytearray(frame)
+    mv = memoryview(buf)
+    table = am2320._CRC_TABLE
+    return (
+        ("bitwise", lambda: crc16_bitwise(buf[:-2])),
+        ("table", lambda: am2320._crc16_py(mv, 6, table)),
+        ("native", lambda: crc_native.crc16(mv, 6, table)),
+    )
+
+
+def run(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m sim.crc_bench", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=20000, help="checksums timed per variant")
+    ap.add_argument("--frames", type=int, default=1000, help="random frames cross-checked first")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+
+    import sim
+    sim.install(speed=1)
+    import am2320
+    from am2320 import _crc_native
+
+    rnd = random.Random(14)
+    for _ in range(args.frames):
+        frame = bytes(rnd.randrange(256) for _ in range(8))
+        results = {name: call() for name, call in cases(am2320, _crc_native, frame)}
+        if len(set(results.values())) != 1:
+            raise SystemExit(f"CRC mismatch on {frame.hex()}: {results}")
+
+    frame = b"\x03\x04\x02\x3a\x00\xf5\x00\x00"     # 57.0 %, 24.5 °C
+    rows = [(name, _time_us(call, args.rounds), _heap(call))
+            for name, call in cases(am2320, _crc_native, frame)]
+
+    sys.stdout.write(f"{args.frames} random frames: all variants agree\n")
+    sys.stdout.write(f"\n{'variant':8} {'us/check':>9} {'heap/check':>11}\n")
+    for name, us, heap in rows:
+        sys.stdout.write(f"{name:8} {us:9.2f} {heap:11}\n")
+    return rows
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,58 @@
+# sim/devices.py
+# Fake I2C peripherals for sim.machine.I2C; each counts the bus transactions it sees.
+import math
+from sim import clock
+
+
+class FakeAM2320:
+    """
+    AM2320 stand-in: answers the "read 4 registers" command with humidity and
+    temperature from scripted functions of virtual time, CRC included.
+    """
+
+    def __init__(self, temperature=None, humidity=None):
+        self.temperature = temperature or (lambda t: 24 + 4 * math.sin(t / 900))
+        self.humidity = humidity or (lambda t: 55 + 10 * math.sin(t / 1200 + 1))
+        self.writes = 0         # every writeto(), wake-ups included
+        self.reads = 0          # readfrom_mem_into() calls
+        self.measurements = 0   # read commands answered
+        self._pending = False
+
+    @property
+    def transactions(self):
+        return self.writes + self.reads
+
+    def writeto(self, buf):
+        self.writes += 1
+        if bytes(buf) == b"\x03\x00\x04":
+            self._pending = True
+        return len(buf)
+
+    def readfrom_mem_into(self, memaddr, buf):
+        self.reads += 1
+        if not self._pending:
+            raise OSError(5)    # EIO: no measurement requested
+        self._pending = False
+        self.measurements += 1
+        t = clock.elapsed()
+        hum = int(round(self.humidity(t) * 10))
+        temp = int(round(self.temperature(t) * 10))
+        temp = (-temp | 0x8000) if temp < 0 else temp
+        frame = bytes((0x03, 0x04, hum >> 8, hum & 0xFF, temp >> 8, temp & 0xFF))
+        crc = _crc16(frame)
+        buf[:6] = frame
+        buf[6] = crc & 0xFF
+        buf[7] = crc >> 8
+
+
+def _crc16(data):
+    crc = 0xFFFF
+    for c in data:
+        crc ^= c
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+# address -> factory; every new I2C bus gets one fresh instance of each
+default_devices = {0x5C: FakeAM2320}
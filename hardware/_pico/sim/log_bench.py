@@ -0,0 +1,90 @@
+# sim/log_bench.py
+"""
+Compares the firmware's old per-event print(f"...") lines with the logger
+(helpers/logger.py) on the host: heap allocated and time per call for
+
+    print        the old f-string print (to a null console)
+    ring+echo    logger, level enabled and echoed to the console
+    ring         logger, level enabled, ring buffer only (LOG_ECHO above it)
+    filtered     logger, level disabled (bound to the no-op)
+
+    cd hardware/_pico
+    python -m sim.log_bench
+
+CPython objects are larger than MicroPython's, so compare the variants
+with each other rather than reading the heap numbers as device values.
+"""
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+
+
+class _NullConsole(io.TextIOBase):
+    def write(self, s):
+        return len(s)
+
+
+def _heap(fn):
+    """Peak bytes allocated by one call (after a warm-up call)."""
+    fn()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    fn()
+    return tracemalloc.get_traced_memory()[1] - base
+
+
+def _time_us(fn, rounds=5000):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / rounds
+
+
+def cases(log, fan=True, temp=36.42):
+    """(variant, setup(), call()) for the auto-control fan message."""
+    def old():
+        print(f"Auto: Fan {'ON' if fan else 'OFF'} (temp={temp:.1f}°C)")
+
+    def new():
+        log.info("Auto: Fan %s (temp=%.1f°C)", "ON" if fan else "OFF", temp)
+
+    return (
+        ("print", lambda: None, old),
+        ("ring+echo", lambda: log.set_level(log.INFO, echo=log.INFO), new),
+        ("ring", lambda: log.set_level(log.INFO, echo=log.ERROR), new),
+        ("filtered", lambda: log.set_level(log.WARN, echo=log.ERROR), new),
+    )
+
+
+def run(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m sim.log_bench", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=5000, help="calls timed per variant")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+
+    import sim
+    sim.install(speed=1)
+    from helpers import logger as log
+
+    rows = []
+    out = sys.stdout
+    sys.stdout = _NullConsole()
+    try:
+        for name, setup, call in cases(log):
+            setup()
+            rows.append((name, _heap(call), _time_us(call, args.rounds)))
+    finally:
+        sys.stdout = out
+
+    out.write(f"\n{'variant':10} {'heap/call':>10} {'us/call':>8}\n")
+    for name, heap, us in rows:
+        out.write(f"{name:10} {heap:10} {us:8.2f}\n")
+    out.write(f"ring: {log.ring.size} bytes, {log.ring.written} records written, "
+              f"{log.ring.dropped} overwritten\n")
+    return rows
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,84 @@
+# sim/lut_bench.py
+"""
+Compares the thermistor conversions in read_sensors.py on the host: time
+per conversion of one raw ADC value and heap allocated by one conversion
+
+    exact       _thermistor_c: the Beta equation (float division, log)
+    lut         _lut_temperature: table lookup + integer interpolation
+
+over raw values spread across the working range (LUT_MIN_C…LUT_MAX_C),
+after reporting the largest deviation of the table from the exact value
+there.
+
+    cd hardware/_pico
+    python -m sim.lut_bench
+
+On CPython math.log and float arithmetic run as C code, so the exact form
+can come out ahead here; under MicroPython on the Pico every float
+operation allocates its result, about ten per exact conversion against
+one (the final division) for the LUT. CPython objects are larger than
+MicroPython's, so compare the variants with each other rather than
+reading the numbers as device values.
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+
+def _heap(fn):
+    """Peak bytes allocated by one call (after a warm-up call)."""
+    fn()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    fn()
+    return tracemalloc.get_traced_memory()[1] - base
+
+
+def _time_us(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / rounds
+
+
+def _convert_all(convert, raws):
+    for raw in raws:
+        convert(raw)
+
+
+def cases(read_sensors):
+    """(variant, convert(raw)) for the exact form and the LUT."""
+    return (("exact", read_sensors._thermistor_c), ("lut", read_sensors._lut_temperature))
+
+
+def run(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m sim.lut_bench", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=200, help="passes over the raw values per variant")
+    ap.add_argument("--values", type=int, default=100, help="raw values spread over the working range")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+
+    import sim
+    sim.install(speed=1)
+    import read_sensors
+
+    lo, hi = read_sensors._LUT_RAW_MIN, read_sensors._LUT_RAW_MAX
+    worst, at = max((abs(read_sensors._lut_temperature(raw) - read_sensors._thermistor_c(raw)), raw)
+                    for raw in range(lo, hi + 1))
+    raws = [lo + (hi - lo) * k // (args.values - 1) for k in range(args.values)]
+    mid = raws[len(raws) // 2]
+    rows = [(name, _time_us(lambda: _convert_all(convert, raws), args.rounds) / len(raws),
+             _heap(lambda: convert(mid)))
+            for name, convert in cases(read_sensors)]
+
+    sys.stdout.write(f"raw {lo}…{hi} ({read_sensors.LUT_MIN_C}…{read_sensors.LUT_MAX_C} °C): "
+                     f"max LUT error {worst:.4f} °C at raw {at}\n")
+    sys.stdout.write(f"\n{'variant':8} {'us/conv':>8} {'heap/conv':>10}\n")
+    for name, us, heap in rows:
+        sys.stdout.write(f"{name:8} {us:8.3f} {heap:10}\n")
+    return rows
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,131 @@
+# sim/machine.py
+# Drop-in stand-in for MicroPython's `machine`: scripted ADC, recorded GPIO pins.
+import math
+from sim import clock
+
+# ===== scripted analog inputs =====
+# pin id -> callable(virtual_seconds) -> raw 16-bit ADC value; set by the scenario
+adc_script = {}
+
+
+def _default_signal(pin):
+    # slow drift plus a little noise around mid-scale
+    phase = pin * 1.7
+    return lambda t: 32768 + 12000 * math.sin(t / 600 + phase) + 300 * math.sin(t * 7.3 + phase)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    # every pin created, by id, so the harness can inspect outputs
+    registry = {}
+
+    def __init__(self, id, mode=IN, pull=None, value=None):
+        self.id = id
+        self.mode = mode
+        self._value = 0 if value is None else value
+        self.history = []   # (virtual_seconds, value) on every change
+        Pin.registry[id] = self
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        v = 1 if v else 0
+        if v != self._value:
+            self._value = v
+            self.history.append((clock.elapsed(), v))
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def toggle(self):
+        self.value(not self._value)
+
+    def irq(self, handler=None, trigger=None):
+        pass
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+
+class ADC:
+    def __init__(self, pin):
+        self.pin = pin.id if isinstance(pin, Pin) else pin
+        self.reads = 0
+
+    def read_u16(self):
+        self.reads += 1
+        fn = adc_script.get(self.pin) or _default_signal(self.pin)
+        return max(0, min(65535, int(fn(clock.elapsed()))))
+
+
+class Timer:
+    PERIODIC = 1
+    ONE_SHOT = 0
+
+    def __init__(self, id=-1, **kwargs):
+        self._task = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, freq=None, period=None, callback=None):
+        import asyncio
+        self.deinit()
+        interval = 1 / freq if freq else (period or 1000) / 1000
+
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                callback(self)
+                if mode == Timer.ONE_SHOT:
+                    break
+
+        self._task = asyncio.get_running_loop().create_task(run())
+
+    def deinit(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class I2C:
+    """Bus stand-in; devices are attached as objects with writeto/readfrom_mem_into."""
+
+    # every bus created, so the harness can inspect its devices
+    registry = []
+
+    def __init__(self, id=0, sda=None, scl=None, freq=100_000):
+        from sim.devices import default_devices
+        self.devices = {addr: make() for addr, make in default_devices.items()}
+        I2C.registry.append(self)
+
+    def scan(self):
+        return list(self.devices)
+
+    def writeto(self, addr, buf):
+        if addr not in self.devices:
+            raise OSError(19)   # ENODEV
+        return self.devices[addr].writeto(buf)
+
+    def readfrom_mem_into(self, addr, memaddr, buf):
+        if addr not in self.devices:
+            raise OSError(19)
+        return self.devices[addr].readfrom_mem_into(memaddr, buf)
+
+
+def freq():
+    return 150_000_000
+
+
+def unique_id():
+    return b"\x53\x49\x4d\x50\x49\x43\x4f\x01"
+
+
+def reset():
+    raise SystemExit("machine.reset()")
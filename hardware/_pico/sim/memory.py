@@ -0,0 +1,35 @@
+# sim/memory.py
+# MicroPython heap accounting for `gc`, backed by tracemalloc.
+# CPython objects are larger than MicroPython ones, so absolute numbers only
+# approximate the device; deltas between runs are what to compare.
+import gc
+import tracemalloc
+
+HEAP_SIZE = 200 * 1024      # bytes of heap the firmware would see on a Pico
+_baseline = 0
+
+
+def reset_baseline():
+    """Counts allocations from now on (call once the firmware is imported)."""
+    global _baseline
+    _baseline = tracemalloc.get_traced_memory()[0]
+
+
+def mem_alloc():
+    return max(0, tracemalloc.get_traced_memory()[0] - _baseline)
+
+
+def mem_free():
+    return max(0, HEAP_SIZE - mem_alloc())
+
+
+def threshold(amount=None):
+    return -1 if amount is None else None
+
+
+def patch_gc_module():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    gc.mem_alloc = mem_alloc
+    gc.mem_free = mem_free
+    gc.threshold = threshold
@@ -0,0 +1,16 @@
+# sim/micropython.py
+def const(x):
+    return x
+
+
+def native(fn):
+    return fn
+
+
+def viper(fn):
+    return fn
+
+
+def mem_info(verbose=False):
+    import gc
+    print(f"mem: total={gc.mem_alloc() + gc.mem_free()}, current={gc.mem_alloc()}, free={gc.mem_free()}")
@@ -0,0 +1,58 @@
+# sim/network.py
+# Virtual WLAN with scriptable outages.
+from sim import clock
+
+STA_IF = 0
+AP_IF = 1
+
+# (start, end) in virtual seconds during which the link is down
+outages = []
+connects = 0        # connect() calls, i.e. (re)connection attempts
+
+
+def _in_outage():
+    t = clock.elapsed()
+    for start, end in outages:
+        if start <= t < end:
+            return True
+    return False
+
+
+class WLAN:
+    _instances = {}
+
+    def __new__(cls, interface=STA_IF):
+        # MicroPython returns the same object for an interface
+        if interface not in cls._instances:
+            obj = super().__new__(cls)
+            obj._active = False
+            obj._wanted = False
+            cls._instances[interface] = obj
+        return cls._instances[interface]
+
+    def __init__(self, interface=STA_IF):
+        pass
+
+    def active(self, state=None):
+        if state is None:
+            return self._active
+        self._active = bool(state)
+
+    def connect(self, ssid=None, key=None):
+        global connects
+        connects += 1
+        self._wanted = True
+
+    def disconnect(self):
+        self._wanted = False
+
+    def isconnected(self):
+        return self._active and self._wanted and not _in_outage()
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -61 if self.isconnected() else 0
+        return 3 if self.isconnected() else 0
+
+    def ifconfig(self):
+        return ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
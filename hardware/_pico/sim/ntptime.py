@@ -0,0 +1,12 @@
+# sim/ntptime.py
+# The virtual clock already runs on real epoch time.
+host = "pool.ntp.org"
+
+
+def settime():
+    pass
+
+
+def time():
+    import time as _t
+    return _t.time()
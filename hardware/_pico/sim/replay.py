@@ -0,0 +1,162 @@
+# sim/replay.py
+"""
+Replays a sensor trace through the auto-control switching logic and counts
+relay toggles, with and without the hysteresis / dwell / duty settings. Also
+times DeviceState.sample() and pack() per tick on the host, and replays the
+trace with sensor errors (None readings) mixed in through DeviceState,
+checking that the relays written from the returned masks always match the
+state.
+
+    cd hardware/_pico
+    python -m sim.replay readings.csv
+    python -m sim.replay --synthetic 3600
+
+The CSV has one reading per line: seconds,temp,humidity,soil (a header line
+is skipped; an empty field is a sensor error). Without a file, --synthetic generates a noisy trace that sits
+near both thresholds for the given number of seconds.
+"""
+import argparse
+import csv
+import math
+import random
+import sys
+import time
+
+
+def load_trace(path):
+    rows = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            try:
+                rows.append(tuple(float(v) if v.strip() else None for v in row[:4]))
+            except ValueError:
+                continue    # header or malformed line
+    return rows
+
+
+def synthetic_trace(seconds, step=1.0, seed=1):
+    from config import TEMP_THRESHOLD, SOIL_MOISTURE_THRESHOLD
+    rnd = random.Random(seed)
+    rows = []
+    t = 0.0
+    while t < seconds:
+        temp = TEMP_THRESHOLD + 1.5 * math.sin(t / 400) + rnd.gauss(0, 0.4)
+        soil = SOIL_MOISTURE_THRESHOLD + 4 * math.sin(t / 700) + rnd.gauss(0, 1.0)
+        rows.append((t, temp, 60.0, soil))
+        t += step
+    return rows
+
+
+def replay(trace, pump, fan):
+    """Feeds the trace to both controllers; returns their toggle counts."""
+    toggles = {"pump": 0, "fan": 0}
+    last = {"pump": None, "fan": None}
+    for t, temp, _, soil in trace:
+        now = int(t * 1000)
+        for name, ctl, value in (("pump", pump, soil), ("fan", fan, temp)):
+            state = ctl.update(value, now)
+            if last[name] is not None and state != last[name]:
+                toggles[name] += 1
+            last[name] = state
+    return toggles
+
+
+def with_faults(trace, every=7):
+    """The trace with every `every`-th temp reading, and the one halfway after it in soil, set to None."""
+    rows = []
+    for i, (t, temp, humidity, soil) in enumerate(trace):
+        if i % every == 0:
+            temp = None
+        elif i % every == every // 2:
+            soil = None
+        rows.append((t, temp, humidity, soil))
+    return rows
+
+
+def fault_replay(trace, state):
+    """
+    Feeds the trace to DeviceState.sample() and writes relays only from the
+    returned mask, as main.actuate() does. Returns (samples with a None
+    input, relay writes, samples after which the written relays differ from
+    the state); an exception from sample() propagates.
+    """
+    from device_state import PUMP, FAN
+    relays = [None, None]
+    faults = writes = mismatched = 0
+    for _, temp, humidity, soil in trace:
+        if temp is None or soil is None:
+            faults += 1
+        changed = state.sample(temp, humidity, soil)
+        if changed & PUMP:
+            relays[0] = state.pump
+            writes += 1
+        if changed & FAN:
+            relays[1] = state.fan
+            writes += 1
+        if relays != [state.pump, state.fan]:
+            mismatched += 1
+    return faults, writes, mismatched
+
+
+def state_cost(trace, state):
+    """Host microseconds per DeviceState.sample() and per pack() over the trace."""
+    start = time.perf_counter()
+    for _, temp, humidity, soil in trace:
+        state.sample(temp, humidity, soil)
+    sample_us = (time.perf_counter() - start) * 1e6 / len(trace)
+    start = time.perf_counter()
+    for _ in trace:
+        state.pack()
+    pack_us = (time.perf_counter() - start) * 1e6 / len(trace)
+    return sample_us, pack_us
+
+
+def run(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m sim.replay", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("trace", nargs="?", help="CSV file: seconds,temp,humidity,soil")
+    ap.add_argument("--synthetic", type=float, default=3600, help="seconds of generated trace")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+
+    import sim
+    sim.install()
+    import config as c
+    from auto_controller import OnOffController
+    from device_state import DeviceState
+
+    trace = load_trace(args.trace) if args.trace else synthetic_trace(args.synthetic)
+
+    plain = replay(trace,
+                   OnOffController(c.SOIL_MOISTURE_THRESHOLD, c.SOIL_MOISTURE_THRESHOLD),
+                   OnOffController(c.TEMP_THRESHOLD, c.TEMP_THRESHOLD))
+    pump = OnOffController(c.SOIL_MOISTURE_THRESHOLD, c.SOIL_MOISTURE_THRESHOLD + c.SOIL_HYSTERESIS,
+                           c.PUMP_MIN_ON, c.PUMP_MIN_OFF, c.PUMP_MAX_DUTY, c.DUTY_WINDOW)
+    fan = OnOffController(c.TEMP_THRESHOLD, c.TEMP_THRESHOLD - c.TEMP_HYSTERESIS,
+                          c.FAN_MIN_ON, c.FAN_MIN_OFF, c.FAN_MAX_DUTY, c.DUTY_WINDOW)
+    tuned = replay(trace, pump, fan)
+
+    sys.stdout.write(f"\n===== REPLAY: {len(trace)} readings =====\n")
+    for name, ctl in (("pump", pump), ("fan", fan)):
+        sys.stdout.write(f"{name:5} toggles plain={plain[name]:<6} tuned={tuned[name]:<6} "
+                         f"held={ctl.held} duty={ctl.duty():.2f}\n")
+
+    state = DeviceState(OnOffController(c.SOIL_MOISTURE_THRESHOLD, c.SOIL_MOISTURE_THRESHOLD + c.SOIL_HYSTERESIS),
+                        OnOffController(c.TEMP_THRESHOLD, c.TEMP_THRESHOLD - c.TEMP_HYSTERESIS),
+                        c.OVERRIDE_TIMEOUT)
+    sample_us, pack_us = state_cost(trace, state)
+    sys.stdout.write(f"state sample()={sample_us:.2f}us pack()={pack_us:.2f}us "
+                     f"record={len(state.pack())} bytes\n")
+
+    state = DeviceState(OnOffController(c.SOIL_MOISTURE_THRESHOLD, c.SOIL_MOISTURE_THRESHOLD + c.SOIL_HYSTERESIS),
+                        OnOffController(c.TEMP_THRESHOLD, c.TEMP_THRESHOLD - c.TEMP_HYSTERESIS),
+                        c.OVERRIDE_TIMEOUT)
+    faults, writes, mismatched = fault_replay(with_faults(trace), state)
+    sys.stdout.write(f"faults: {faults} samples with a None input, {writes} relay writes, "
+                     f"{mismatched} samples with relays out of step\n")
+    if mismatched:
+        raise SystemExit("relay state diverged from DeviceState")
+    return plain, tuned
+
+
+if __name__ == "__main__":
+    run()
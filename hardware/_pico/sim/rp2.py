@@ -0,0 +1,3 @@
+# sim/rp2.py
+def country(code=None):
+    return code
@@ -0,0 +1,67 @@
+# sim/test_am2320.py
+"""
+Cross-checks the AM2320 driver's table-driven CRC16 (_crc16_py and the
+@micropython.native build) against the driver's original bit-by-bit
+implementation (sim.crc_bench.crc16_bitwise) on random buffers, and the
+checksum check of a measurement on the fake I2C bus.
+
+    cd hardware/_pico
+    python -m unittest sim.test_am2320
+"""
+import random
+import unittest
+
+import sim
+
+sim.install()
+import machine  # noqa: E402
+import am2320  # noqa: E402
+from am2320 import _crc_native  # noqa: E402
+from sim.crc_bench import crc16_bitwise  # noqa: E402
+
+IMPLEMENTATIONS = (("table", am2320._crc16_py), ("native", _crc_native.crc16))
+
+
+class CRC16(unittest.TestCase):
+    ROUNDS = 500
+
+    def test_check_value(self):
+        for name, crc16 in IMPLEMENTATIONS:
+            with self.subTest(name):
+                self.assertEqual(crc16(b"123456789", 9, am2320._CRC_TABLE), 0x4B37)
+
+    def test_random_buffers(self):
+        rnd = random.Random(14)
+        for r in range(self.ROUNDS):
+            buf = bytearray(rnd.randrange(256) for _ in range(rnd.randrange(0, 64)))
+            n = rnd.randrange(len(buf) + 1)
+            expected = crc16_bitwise(buf[:n])
+            for name, crc16 in IMPLEMENTATIONS:
+                with self.subTest(name, r=r, n=n):
+                    # a prefix of a memoryview, like AM2320._verify(): nothing sliced
+                    self.assertEqual(crc16(memoryview(buf), n, am2320._CRC_TABLE), expected)
+
+    def test_every_single_byte(self):
+        for b in range(256):
+            for name, crc16 in IMPLEMENTATIONS:
+                self.assertEqual(crc16(bytes((b,)), 1, am2320._CRC_TABLE), crc16_bitwise(bytes((b,))), name)
+
+
+class Verify(unittest.TestCase):
+
+    def setUp(self):
+        self.am = am2320.AM2320(machine.I2C(0))
+
+    def test_measurement_passes(self):
+        self.am.measure()
+        self.assertEqual(self.am._buf[6] | self.am._buf[7] << 8, crc16_bitwise(self.am._buf[:6]))
+
+    def test_corrupt_frame_rejected(self):
+        self.am.measure()
+        self.am._buf[3] ^= 0x10
+        with self.assertRaises(ValueError):
+            self.am._verify()
+
+
+if __name__ == "__main__":
+    unittest.main()
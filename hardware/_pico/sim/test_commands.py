@@ -0,0 +1,74 @@
+# sim/test_commands.py
+"""
+Backend commands through main.apply_commands(): a command with a new
+sequence sets the relays it names even when the override flag already has
+that value, and the version acked (X-Command-Ack) matches the GPIO
+outputs.
+
+    cd hardware/_pico
+    python -m unittest sim.test_commands
+"""
+import unittest
+
+import sim
+
+sim.install()
+import main  # noqa: E402
+import actuator_control  # noqa: E402
+from data_transfer import api_client  # noqa: E402
+from device_state import PUMP, FAN, OVERRIDE  # noqa: E402
+
+
+class NewerCommand(unittest.TestCase):
+
+    def setUp(self):
+        s = main.state
+        s.seq = 0
+        s.pump = s.fan = None
+        s.override_pump = s.override_fan = False
+        api_client._ack = None
+        main.apply_commands({"pump": False, "fan": False, "version": 1})
+
+    def auto_on(self):
+        """Auto control switches both relays on (no override held)."""
+        main.state.pump = main.state.fan = True
+        main.actuate(PUMP | FAN)
+
+    def test_off_command_switches_auto_relays_off(self):
+        self.auto_on()
+        self.assertTrue(main.apply_commands({"pump": False, "fan": False, "version": 2}))
+        self.assertFalse(actuator_control.get_pump_state())
+        self.assertFalse(actuator_control.get_fan_state())
+        self.assertEqual((main.state.pump, main.state.fan), (False, False))
+        self.assertEqual(api_client._ack, b"2;pump=0;fan=0")
+
+    def test_ack_follows_outputs(self):
+        self.auto_on()
+        main.apply_commands({"pump": True, "fan": False, "version": 2})
+        self.assertEqual(api_client._ack, b"2;pump=1;fan=0")
+        self.assertTrue(main.state.override_pump)
+        self.assertFalse(main.state.override_fan)
+
+    def test_repeated_version_ignored(self):
+        main.apply_commands({"pump": False, "fan": False, "version": 2})
+        self.auto_on()
+        api_client._ack = None
+        self.assertFalse(main.apply_commands({"pump": False, "fan": False, "version": 2}))
+        self.assertTrue(actuator_control.get_pump_state())     # auto control keeps it
+        self.assertIsNone(api_client._ack)
+
+    def test_mask_names_only_changes(self):
+        s = main.state
+        s.pump = True       # auto control, relay already on
+        self.assertEqual(s.command({"pump": True, "version": 2}), OVERRIDE)
+        self.assertEqual(s.command({"pump": True, "version": 3}), 0)
+        self.assertEqual(s.command({"pump": False, "version": 4}), PUMP | OVERRIDE)
+
+    def test_unversioned_repeat_leaves_auto_control(self):
+        self.auto_on()
+        self.assertEqual(main.state.command({"pump": False}), 0)
+        self.assertTrue(main.state.pump)
+
+
+if __name__ == "__main__":
+    unittest.main()
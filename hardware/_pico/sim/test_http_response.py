@@ -0,0 +1,222 @@
+# sim/test_http_response.py
+"""
+Unit and fuzz tests for data_transfer/http_response.py on CPython: canned
+responses parsed whole, split at every byte and in random pieces, plus
+random (valid and mangled) responses.
+
+    cd hardware/_pico
+    python -m unittest sim.test_http_response
+"""
+import random
+import unittest
+
+import sim
+
+sim.install()
+from data_transfer.http_response import ResponseParser, HTTPError  # noqa: E402
+
+SIZE = 1024
+
+
+def parse(raw, pieces=None, size=SIZE):
+    """Feeds `raw` to a fresh parser in pieces of the given sizes (default: all at once)."""
+    p = ResponseParser(size)
+    at = 0
+    for k in pieces or [len(raw)]:
+        if p.done or at >= len(raw):
+            break
+        space = p.space()
+        k = min(k, len(space), len(raw) - at)
+        space[:k] = raw[at:at + k]
+        at += k
+        p.feed(k)
+    while not p.done and at < len(raw):     # pieces ran out: feed the rest
+        space = p.space()
+        k = min(len(space), len(raw) - at)
+        space[:k] = raw[at:at + k]
+        at += k
+        p.feed(k)
+    if not p.done:
+        p.eof()
+    return p
+
+
+def chunked(body, sizes):
+    """`body` in chunked encoding, chunk sizes cycling through `sizes`."""
+    out, i, n = b"", 0, 0
+    while i < len(body):
+        part = body[i:i + sizes[n % len(sizes)]]
+        out += b"%x\r\n" % len(part) + part + b"\r\n"
+        i += len(part)
+        n += 1
+    return out + b"0\r\n\r\n"
+
+
+# (name, raw response, status, body, keep_alive, etag)
+CANNED = [
+    ("content-length",
+     b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 28\r\n\r\n'
+     b'{"pump": true, "fan": false}',
+     200, b'{"pump": true, "fan": false}', True, None),
+    ("chunked",
+     b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+     b"7\r\n{\"a\": 1\r\n3\r\n, \"\r\n6\r\nb\": 22\r\n1\r\n}\r\n0\r\n\r\n",
+     200, b'{"a": 1, "b": 22}', True, None),
+    ("chunked trailer",
+     b"HTTP/1.1 200 OK\r\ntransfer-encoding: Chunked\r\n\r\n4\r\nabcd\r\n0\r\nX-Trailer: 1\r\n\r\n",
+     200, b"abcd", True, None),
+    ("not modified",
+     b'HTTP/1.1 304 Not Modified\r\nETag: "v42"\r\nContent-Length: 0\r\n\r\n',
+     304, b"", True, b'"v42"'),
+    ("no content", b"HTTP/1.1 204 No Content\r\n\r\n", 204, b"", True, None),
+    ("until close",
+     b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nstreamed until close",
+     200, b"streamed until close", False, None),
+    ("header case + etag",
+     b'HTTP/1.1 200 OK\r\ncOnTeNt-LeNgTh:   2\r\nETAG: "v7"\r\n\r\nok',
+     200, b"ok", True, b'"v7"'),
+    ("server error",
+     b'HTTP/1.1 500 Internal Server Error\r\nContent-Length: 25\r\nConnection: close\r\n\r\n'
+     b'{"message": "db is down"}',
+     500, b'{"message": "db is down"}', False, None),
+    ("forbidden", b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n", 403, b"", True, None),
+    ("interim responses",
+     b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 103 Early Hints\r\nLink: </x>\r\n\r\n"
+     b'HTTP/1.1 200 OK\r\nETag: "v3"\r\nContent-Length: 4\r\n\r\ndone',
+     200, b"done", True, b'"v3"'),
+]
+
+
+class CannedResponses(unittest.TestCase):
+
+    def check(self, p, status, body, keep_alive, etag):
+        self.assertTrue(p.done)
+        self.assertEqual(p.status, status)
+        self.assertEqual(bytes(p.body()), body)
+        self.assertEqual(p.keep_alive, keep_alive)
+        self.assertEqual(p.etag(), etag)
+
+    def test_whole(self):
+        for name, raw, *expected in CANNED:
+            with self.subTest(name):
+                self.check(parse(raw), *expected)
+
+    def test_split_at_every_byte(self):
+        for name, raw, *expected in CANNED:
+            for cut in range(1, len(raw)):
+                with self.subTest(name, cut=cut):
+                    self.check(parse(raw, [cut, len(raw)]), *expected)
+
+    def test_byte_by_byte(self):
+        for name, raw, *expected in CANNED:
+            with self.subTest(name):
+                self.check(parse(raw, [1] * len(raw)), *expected)
+
+    def test_parser_is_reusable(self):
+        p = ResponseParser(SIZE)
+        for name, raw, status, body, _, _ in CANNED:
+            p.reset()
+            p.space()[:len(raw)] = raw
+            p.feed(len(raw))
+            if not p.done:
+                p.eof()
+            self.assertEqual((p.status, bytes(p.body())), (status, body), name)
+
+    def test_etag_returns_known_object(self):
+        p = parse(b'HTTP/1.1 304 Not Modified\r\nETag: "v42"\r\n\r\n')
+        known = b'"v42"'
+        self.assertIs(p.etag(known), known)
+        self.assertEqual(p.etag(b'"v41"'), known)
+
+    def test_head_available_before_body(self):
+        raw = b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n0123"
+        p = ResponseParser(SIZE)
+        p.space()[:len(raw)] = raw
+        p.feed(len(raw))
+        self.assertTrue(p.head_done)
+        self.assertFalse(p.done)
+        self.assertEqual(p.status, 200)
+        self.assertEqual(p.content_length, 10)
+
+    def test_body_over_cap(self):
+        with self.assertRaises(ValueError):
+            parse(b"HTTP/1.1 200 OK\r\nContent-Length: 5000\r\n\r\n" + b"x" * 5000, size=256)
+        with self.assertRaises(ValueError):
+            parse(b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\n" + b"x" * 5000, size=256)
+
+    def test_truncated_framed_body(self):
+        with self.assertRaises(OSError):
+            parse(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n0123")
+        with self.assertRaises(OSError):
+            parse(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n4\r\nab")
+
+    def test_interim_response_leaves_nothing_behind(self):
+        """After a 100 Continue the final response is consumed whole, so the next one parses."""
+        raw = b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 201 Created\r\nContent-Length: 2\r\n\r\nok"
+        p = ResponseParser(SIZE)
+        p.space()[:len(raw)] = raw
+        p.feed(len(raw))
+        self.assertTrue(p.done)
+        self.assertEqual((p.status, bytes(p.body())), (201, b"ok"))
+        self.assertEqual(p._end, p._n)
+
+    def test_bad_status_line(self):
+        with self.assertRaises(ValueError):
+            parse(b"SSH-2.0-OpenSSH_9.6\r\n\r\n")
+
+    def test_http_error(self):
+        e = HTTPError(503, b"busy")
+        self.assertEqual((e.status, e.body, str(e)), (503, b"busy", "HTTP 503"))
+
+
+class Fuzz(unittest.TestCase):
+    ROUNDS = 300
+
+    def test_random_valid_responses(self):
+        rnd = random.Random(5)
+        for n in range(self.ROUNDS):
+            body = bytes(rnd.randrange(256) for _ in range(rnd.randrange(0, 300)))
+            status = rnd.choice((200, 201, 400, 404, 500))
+            head = b"HTTP/1.1 %d X\r\nServer: fuzz\r\n" % status
+            if rnd.random() < 0.5:
+                raw = head + b"Content-Length: %d\r\n\r\n" % len(body) + body
+            else:
+                sizes = [rnd.randrange(1, 40) for _ in range(3)]
+                raw = head + b"Transfer-Encoding: chunked\r\n\r\n" + chunked(body, sizes)
+            pieces = [rnd.randrange(1, 64) for _ in range(len(raw))]
+            with self.subTest(n=n):
+                p = parse(raw, pieces)
+                self.assertTrue(p.done)
+                self.assertEqual(p.status, status)
+                self.assertEqual(bytes(p.body()), body)
+
+    def test_mangled_responses_fail_cleanly(self):
+        """Truncated or corrupted input raises ValueError / OSError or parses; nothing else."""
+        rnd = random.Random(11)
+        for n in range(self.ROUNDS):
+            raw = bytearray(rnd.choice(CANNED)[1])
+            for _ in range(rnd.randrange(1, 4)):
+                if not raw:
+                    break
+                kind = rnd.randrange(3)
+                i = rnd.randrange(len(raw))
+                if kind == 0:
+                    raw[i] = rnd.randrange(256)
+                elif kind == 1:
+                    del raw[i:]
+                else:
+                    raw[i:i] = bytes(rnd.randrange(256) for _ in range(rnd.randrange(1, 8)))
+            if not raw:
+                continue
+            pieces = [rnd.randrange(1, 32) for _ in range(len(raw))]
+            with self.subTest(n=n, raw=bytes(raw)):
+                try:
+                    p = parse(bytes(raw), pieces, size=256)
+                except (ValueError, OSError):
+                    continue
+                self.assertTrue(p.done)
+                self.assertLessEqual(len(p.body()), 256)
+
+
+if __name__ == "__main__":
+    unittest.main()
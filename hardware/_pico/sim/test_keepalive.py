@@ -0,0 +1,99 @@
+# sim/test_keepalive.py
+"""
+Persistent-session test for data_transfer/api_client.py: 1,000 uploads
+against a local TLS stand-in backend (self-signed certificate made with the
+openssl CLI), counting TLS handshakes and TCP sessions on both ends.
+
+    cd hardware/_pico
+    python -m unittest sim.test_keepalive
+"""
+import asyncio
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import unittest
+
+import sim
+
+sim.install()
+from sim import uasyncio as sim_uasyncio  # noqa: E402
+from sim.backend import Backend  # noqa: E402
+from data_transfer import api_client  # noqa: E402
+
+REQUESTS = 1000
+BODY = '{"temp": 23.4, "humidity": 55.2, "soil_moisture": 41.7}'
+
+
+@unittest.skipUnless(shutil.which("openssl"), "needs the openssl CLI for a test certificate")
+class KeepAliveTLS(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.mkdtemp(prefix="pico-tls-")
+        cert = os.path.join(cls.dir, "cert.pem")
+        key = os.path.join(cls.dir, "key.pem")
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+             "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1",
+             "-addext", "subjectAltName=IP:127.0.0.1"],
+            check=True, capture_output=True,
+        )
+        cls.server_ssl = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        cls.server_ssl.load_cert_chain(cert, key)
+        sim_uasyncio.ssl_context = ssl.create_default_context(cafile=cert)
+
+    @classmethod
+    def tearDownClass(cls):
+        sim_uasyncio.ssl_context = None
+        shutil.rmtree(cls.dir, ignore_errors=True)
+
+    def upload(self, n, backend, between=None):
+        """n uploads on one Connection; `between(i)` runs before upload i."""
+        async def run():
+            port = await backend.start(ssl=self.server_ssl)
+            conn = api_client.Connection("127.0.0.1", port, tls=True)
+            try:
+                for i in range(n):
+                    if between is not None:
+                        await between(i)
+                    await conn.request(api_client.POST_DATA, BODY)
+            finally:
+                conn.close()
+                await backend.stop()
+            return conn
+        return asyncio.run(run())
+
+    def test_one_handshake_per_1000_requests(self):
+        backend = Backend()
+        conn = self.upload(REQUESTS, backend)
+        self.assertEqual(len(backend.readings), REQUESTS)
+        self.assertEqual(conn.requests, REQUESTS)
+        self.assertEqual(conn.handshakes, 1)
+        self.assertEqual(backend.connections, 1)
+
+    def test_reconnects_when_server_closes(self):
+        backend = Backend(max_requests=100)     # Connection: close every 100 requests
+        conn = self.upload(REQUESTS, backend)
+        self.assertEqual(len(backend.readings), REQUESTS)
+        self.assertEqual(conn.handshakes, REQUESTS // 100)
+        self.assertEqual(backend.connections, REQUESTS // 100)
+
+    def test_stale_session_retried_once(self):
+        backend = Backend()
+
+        async def drop(i):
+            if i == REQUESTS // 2:              # server drops the idle session without a word
+                for task in list(backend._handlers):
+                    task.cancel()
+                await asyncio.sleep(0.05)
+
+        conn = self.upload(REQUESTS, backend, drop)
+        self.assertEqual(len(backend.readings), REQUESTS)
+        self.assertEqual(conn.handshakes, 2)
+        self.assertEqual(backend.connections, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+# sim/test_latency.py
+"""
+Latency test for data_transfer/api_client.py: the LED heartbeat task
+(status_led.led_heartbeat) keeps its period while uploads wait on a slow
+stand-in backend. The backend runs in its own thread with an injected
+response delay; the heartbeat's scheduling jitter is measured with the
+async client and, as a control, with a blocking client like the old one.
+
+    cd hardware/_pico
+    python -m unittest sim.test_latency
+"""
+import asyncio
+import socket
+import threading
+import time
+import unittest
+
+import sim
+
+sim.install()
+from sim import clock  # noqa: E402
+from sim.backend import Backend  # noqa: E402
+from data_transfer import api_client  # noqa: E402
+import status_led  # noqa: E402
+
+SPEED = 5           # virtual clock factor while a test runs
+DELAY = 1.0         # injected backend latency (virtual s)
+UPLOADS = 12
+PERIOD_MS = 2050    # led_heartbeat(): 50 ms on, 2 s off
+MAX_JITTER_MS = 250 # a quarter of DELAY
+BODY = b'{"temp": 23.4, "humidity": 55.2, "soil_moisture": 41.7}'
+
+
+class _Recorder:
+    """Stands in for the LED pin; records when it is switched on (ticks_ms)."""
+
+    def __init__(self):
+        self.on_at = []
+
+    def on(self):
+        self.on_at.append(time.ticks_ms())
+
+    def off(self):
+        pass
+
+
+class _ServerThread(threading.Thread):
+    """Stand-in backend on its own event loop, so a blocked client loop can't stall it."""
+
+    def __init__(self, delay):
+        super().__init__(daemon=True)
+        self.backend = None
+        self.port = None
+        self._ready = threading.Event()
+        self._delay = delay
+        self._loop = None
+        self._done = None
+
+    def run(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._done = asyncio.Event()
+        self.backend = Backend(delay=self._delay)
+        self.port = await self.backend.start()
+        self._ready.set()
+        await self._done.wait()
+        await self.backend.stop()
+
+    def __enter__(self):
+        self.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._done.set)
+        self.join()
+
+
+def _blocking_post(port):
+    """One upload the way the old client did it: blocking socket calls."""
+    s = socket.create_connection(("127.0.0.1", port))
+    try:
+        s.sendall(b"POST /api/data/SIM_PICO_001 HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                  b"Content-Type: application/json\r\nContent-Length: %d\r\n"
+                  b"Connection: close\r\n\r\n" % len(BODY) + BODY)
+        resp = b""
+        while b"\r\n\r\n" not in resp or not resp.endswith(b"}"):
+            data = s.recv(512)
+            if not data:
+                break
+            resp += data
+        return resp
+    finally:
+        s.close()
+
+
+def _jitter(on_at):
+    """Largest deviation (ms) of a heartbeat period from PERIOD_MS."""
+    periods = [time.ticks_diff(b, a) for a, b in zip(on_at, on_at[1:])]
+    return max(abs(p - PERIOD_MS) for p in periods)
+
+
+class HeartbeatJitter(unittest.TestCase):
+
+    def setUp(self):
+        self.pin = status_led.led
+        status_led.led = _Recorder()
+        clock.start(SPEED)
+
+    def tearDown(self):
+        clock.start(1)
+        status_led.led = self.pin
+
+    def measure(self, uploads):
+        """
+        Runs the heartbeat during `uploads(port, UPLOADS)`; returns (jitter ms,
+        heartbeats). One upload goes first, so one-off costs (first connect,
+        imports) land before the heartbeat starts.
+        """
+        async def run(port):
+            await uploads(port, 1)
+            heartbeat = asyncio.create_task(status_led.led_heartbeat())
+            await asyncio.sleep(0)
+            try:
+                await uploads(port, UPLOADS)
+            finally:
+                heartbeat.cancel()
+        with _ServerThread(DELAY) as server:
+            asyncio.run(run(server.port))
+            self.assertEqual(len(server.backend.readings), 1 + UPLOADS)
+        on_at = status_led.led.on_at
+        self.assertGreaterEqual(len(on_at), 2)
+        return _jitter(on_at), len(on_at)
+
+    def test_async_client_keeps_heartbeat(self):
+        conns = []
+
+        async def uploads(port, n):
+            if not conns:
+                conns.append(api_client.Connection("127.0.0.1", port, timeout=DELAY * 5, tls=False))
+            for _ in range(n):
+                await conns[0].request(api_client.POST_DATA, BODY)
+
+        try:
+            jitter, beats = self.measure(uploads)
+        finally:
+            for conn in conns:
+                conn.close()
+        self.assertGreaterEqual(beats, UPLOADS * DELAY * 1000 // PERIOD_MS)
+        self.assertLess(jitter, MAX_JITTER_MS, f"heartbeat jitter {jitter} ms over {beats} beats")
+
+    def test_blocking_client_stalls_heartbeat(self):
+        """Control: the same uploads with blocking I/O hold the heartbeat for whole requests."""
+        async def uploads(port, n):
+            for _ in range(n):
+                _blocking_post(port)
+                await asyncio.sleep(0)
+
+        jitter, beats = self.measure(uploads)
+        self.assertGreater(jitter, MAX_JITTER_MS, f"heartbeat jitter {jitter} ms over {beats} beats")
+
+
+if __name__ == "__main__":
+    unittest.main()
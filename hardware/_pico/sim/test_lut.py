@@ -0,0 +1,50 @@
+# sim/test_lut.py
+"""
+Accuracy of read_sensors.py's thermistor lookup table against the exact
+Beta-equation conversion (_thermistor_c): every raw value in the working
+range LUT_MIN_C…LUT_MAX_C, and the closed-form fallback outside it.
+
+    cd hardware/_pico
+    python -m unittest sim.test_lut
+"""
+import unittest
+
+import sim
+
+sim.install()
+import read_sensors  # noqa: E402
+from read_sensors import _lut_temperature, _thermistor_c, _LUT_RAW_MIN, _LUT_RAW_MAX  # noqa: E402
+
+MAX_ERROR_C = 0.015
+
+
+class ThermistorLUT(unittest.TestCase):
+
+    def test_working_range_bounds(self):
+        self.assertLessEqual(_thermistor_c(_LUT_RAW_MIN), read_sensors.LUT_MIN_C)
+        self.assertGreaterEqual(_thermistor_c(_LUT_RAW_MAX), read_sensors.LUT_MAX_C)
+
+    def test_max_deviation_in_working_range(self):
+        worst, at = max((abs(_lut_temperature(raw) - _thermistor_c(raw)), raw)
+                        for raw in range(_LUT_RAW_MIN, _LUT_RAW_MAX + 1))
+        self.assertLess(worst, MAX_ERROR_C, f"{worst:.4f} °C off at raw {at}")
+
+    def test_exact_outside_working_range(self):
+        for raw in list(range(1, _LUT_RAW_MIN, 7)) + list(range(_LUT_RAW_MAX + 1, 65535, 7)) + [65534]:
+            self.assertEqual(_lut_temperature(raw), _thermistor_c(raw), raw)
+
+    def test_continuous_at_range_edges(self):
+        for raw in (_LUT_RAW_MIN, _LUT_RAW_MAX + 1):
+            self.assertLess(abs(_lut_temperature(raw) - _lut_temperature(raw - 1)), 0.05, raw)
+
+    def test_monotonic_within_rounding(self):
+        """Never steps down by more than the LUT's rounding (the table holds hundredths)."""
+        last = _lut_temperature(1)
+        for raw in range(2, 65535):
+            t = _lut_temperature(raw)
+            self.assertGreater(t, last - 0.01, raw)
+            last = t
+
+
+if __name__ == "__main__":
+    unittest.main()
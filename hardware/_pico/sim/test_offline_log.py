@@ -0,0 +1,101 @@
+# sim/test_offline_log.py
+"""
+data_transfer/offline_log.py on files in a temporary directory: segment
+rotation, overwriting the oldest segment (also while a peek()ed batch is
+being uploaded), and the upload cursor surviving a reboot.
+
+    cd hardware/_pico
+    python -m unittest sim.test_offline_log
+"""
+import shutil
+import tempfile
+import unittest
+
+import sim
+
+sim.install()
+from data_transfer.offline_log import OfflineLog  # noqa: E402
+
+SEGMENTS = 3
+PER_SEGMENT = 4
+BATCH = 3
+
+
+class OfflineLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="pico-offline-test-")
+        self.log = self.open()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def open(self):
+        """A fresh OfflineLog on the same files, as after a reboot."""
+        return OfflineLog(self.root, SEGMENTS, PER_SEGMENT, BATCH)
+
+    def append(self, first, n):
+        """Readings with timestamps first…first+n-1."""
+        for ts in range(first, first + n):
+            self.log.append(ts, 20.5, 50.0, None)
+
+    def drain(self, log=None):
+        """Timestamps of every pending record, uploaded batch by batch."""
+        log = log or self.log
+        out = []
+        while True:
+            payload = log.peek()
+            if payload is None:
+                return out
+            out += [r["timestamp"] for r in payload["readings"]]
+            self.assertEqual(log.commit(), len(payload["readings"]))
+
+    def test_peek_without_commit_repeats(self):
+        self.append(1, 5)
+        first = self.log.peek()
+        self.assertEqual(self.log.peek(), first)
+        self.assertEqual(first["readings"][0], {"timestamp": 1, "temp": 20.5, "humidity": 50.0})
+
+    def test_rotation_keeps_order(self):
+        self.append(1, PER_SEGMENT * SEGMENTS)
+        self.assertEqual(self.log.pending, PER_SEGMENT * SEGMENTS)
+        self.assertEqual(self.drain(), list(range(1, PER_SEGMENT * SEGMENTS + 1)))
+        self.assertEqual(self.log.pending, 0)
+        self.append(100, 2)     # the next outage starts in a fresh slot
+        self.assertEqual(self.drain(), [100, 101])
+
+    def test_full_log_overwrites_oldest(self):
+        total = PER_SEGMENT * SEGMENTS + 2
+        self.append(1, total)
+        self.assertEqual(self.log.dropped, PER_SEGMENT)
+        self.assertEqual(self.drain(), list(range(PER_SEGMENT + 1, total + 1)))
+
+    def test_overwrite_while_peeked(self):
+        self.append(1, PER_SEGMENT * SEGMENTS)
+        self.log.peek()                                 # batch 1…3 being uploaded
+        self.append(100, 1)                             # ...when the head segment is overwritten
+        self.assertEqual(self.log.commit(), 0)          # nothing of the new head is skipped
+        self.assertEqual(self.drain(), list(range(PER_SEGMENT + 1, PER_SEGMENT * SEGMENTS + 1)) + [100])
+
+    def test_cursor_survives_reboot(self):
+        self.append(1, 2 * PER_SEGMENT)
+        self.log.peek()
+        self.log.commit()                               # 1…3 uploaded
+        self.assertEqual(self.drain(self.open()), list(range(BATCH + 1, 2 * PER_SEGMENT + 1)))
+
+    def test_reboot_after_wrap(self):
+        self.append(1, PER_SEGMENT * SEGMENTS + 1)      # head is now slot 1
+        self.log.peek()
+        self.log.commit()
+        log = self.open()
+        self.assertEqual(log.pending, self.log.pending)
+        self.assertEqual(self.drain(log), list(range(PER_SEGMENT + BATCH + 1, PER_SEGMENT * SEGMENTS + 2)))
+
+    def test_uncommitted_peek_is_resent_after_reboot(self):
+        self.append(1, 2)
+        self.log.peek()                                 # upload never confirmed
+        self.assertEqual(self.drain(self.open()), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
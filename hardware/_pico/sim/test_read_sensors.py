@@ -0,0 +1,87 @@
+# sim/test_read_sensors.py
+"""
+Bus-transaction counts of read_sensors_real.py on the fake I2C bus: one
+AM2320 measurement (wake-up, read command, read) serves both temperature
+and humidity for CLIMATE_MAX_AGE_MS, and the async variant yields to the
+event loop during the sensor waits.
+
+    cd hardware/_pico
+    python -m unittest sim.test_read_sensors
+"""
+import asyncio
+import time
+import unittest
+
+import sim
+
+sim.install()
+import read_sensors_real as sensors  # noqa: E402
+
+PER_MEASUREMENT = 3     # wake-up write, "read 4 registers" write, read
+
+
+class ClimateReads(unittest.TestCase):
+
+    def setUp(self):
+        self.am = sensors.i2c.devices[sensors.am2320.I2C_ADDRESS]
+        self.am.writes = self.am.reads = self.am.measurements = 0
+        sensors._climate_at = None
+        self.saved = self.am.humidity
+
+    def tearDown(self):
+        self.am.humidity = self.saved
+
+    def expire(self):
+        sensors._climate_at = time.ticks_add(time.ticks_ms(), -sensors.CLIMATE_MAX_AGE_MS)
+
+    def test_one_measurement_per_tick(self):
+        temp = sensors.read_temperature()
+        humidity = sensors.read_humidity()
+        self.assertIsNotNone(temp)
+        self.assertEqual(sensors.read_climate(), (temp, humidity))
+        self.assertEqual(self.am.measurements, 1)
+        self.assertEqual(self.am.transactions, PER_MEASUREMENT)
+
+    def test_measures_again_after_max_age(self):
+        sensors.read_climate()
+        self.expire()
+        sensors.read_temperature()
+        sensors.read_humidity()
+        self.assertEqual(self.am.measurements, 2)
+        self.assertEqual(self.am.transactions, 2 * PER_MEASUREMENT)
+
+    def test_failed_read_not_cached(self):
+        def broken(t):
+            raise OSError(5)
+        self.am.humidity = broken
+        self.assertEqual(sensors.read_climate(), (None, None))
+        self.am.humidity = self.saved
+        self.assertIsNotNone(sensors.read_climate()[0])
+        self.assertEqual(self.am.measurements, 2)
+
+    def test_async_read_yields(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        async def run():
+            task = asyncio.create_task(ticker())
+            await asyncio.sleep(0)
+            first = await sensors.read_climate_async()
+            task.cancel()
+            return first, await sensors.read_climate_async()
+
+        first, cached = asyncio.run(run())
+        self.assertIsNotNone(first[0])
+        self.assertEqual(cached, first)
+        self.assertGreater(ticks, 2)    # ran during the 10 ms wake-up and 2 ms conversion waits
+        self.assertEqual(self.am.measurements, 1)
+        self.assertEqual(self.am.transactions, PER_MEASUREMENT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# sim/uasyncio.py
+# MicroPython's uasyncio API on top of CPython asyncio.
+import asyncio
+from asyncio import *  # noqa: F401,F403
+
+
+async def sleep_ms(ms):
+    await asyncio.sleep(ms / 1000)
+
+
+class _Stream:
+    """Reader/writer pair with MicroPython's Stream methods (readinto included)."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+
+    async def read(self, n=-1):
+        return await self._reader.read(n)
+
+    async def readinto(self, buf):
+        data = await self._reader.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    async def readline(self):
+        return await self._reader.readline()
+
+    async def readexactly(self, n):
+        return await self._reader.readexactly(n)
+
+    def write(self, buf):
+        self._writer.write(bytes(buf))
+
+    async def drain(self):
+        await self._writer.drain()
+
+    def close(self):
+        self._writer.close()
+
+    async def wait_closed(self):
+        await self._writer.wait_closed()
+
+
+# SSLContext used for ssl=True; None: the system default (tests set one that
+# trusts the stand-in backend's self-signed certificate)
+ssl_context = None
+
+
+async def open_connection(host, port, ssl=None, server_hostname=None):
+    if ssl is True:
+        import ssl as _ssl
+        ssl = ssl_context or _ssl.create_default_context()
+    kwargs = {"ssl": ssl, "server_hostname": server_hostname} if ssl else {}
+    reader, writer = await asyncio.open_connection(host, port, **kwargs)
+    stream = _Stream(reader, writer)
+    return stream, stream
+
+
+class ThreadSafeFlag:
+    def __init__(self):
+        self._event = asyncio.Event()
+
+    def set(self):
+        self._event.set()
+
+    def clear(self):
+        self._event.clear()
+
+    async def wait(self):
+        await self._event.wait()
+        self._event.clear()
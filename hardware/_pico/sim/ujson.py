@@ -0,0 +1,20 @@
+# sim/ujson.py
+import json
+
+
+def loads(s):
+    if isinstance(s, (memoryview, bytearray)):
+        s = bytes(s)    # MicroPython accepts any buffer
+    return json.loads(s)
+
+
+def dumps(obj):
+    return json.dumps(obj)
+
+
+def load(stream):
+    return json.load(stream)
+
+
+def dump(obj, stream):
+    json.dump(obj, stream)
@@ -0,0 +1,168 @@
+# sim/wire_bench.py
+"""
+Compares the JSON and binary (wire_format) upload paths on the host:
+encode time, peak heap allocated while encoding one upload's body, and
+bytes on the wire per upload (request line + headers + body, as counted by
+the stand-in backend).
+
+    cd hardware/_pico
+    python -m sim.wire_bench --uploads 200 --batch 10
+
+It also compares building the request head from f-strings (the old
+api_client code) with the prebuilt templates (Connection.build_head()),
+per request: gc.mem_alloc() delta with the head still referenced, and the
+peak heap while building it.
+
+CPython objects are larger than MicroPython's, so compare the variants
+with each other rather than reading the heap numbers as device values.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+
+
+def _readings(n):
+    return [(23.4 + i * 0.1, 55.2, 41.7) for i in range(n)]
+
+
+def _cases(api_client, wire_format, batch, readings):
+    """(format, encode(), upload()) for the JSON and binary paths, as main.py runs them."""
+    t, h, s = readings[0]
+    if len(readings) == 1:
+        json_body = lambda: {"temp": t, "humidity": h, "soil_moisture": s}
+        return (
+            ("json", lambda: api_client.ujson.dumps(json_body()),
+             lambda: api_client.api_post_manual(json_body())),
+            ("binary", lambda: wire_format.reading(t, h, s),
+             lambda: api_client.api_post_readings(wire_format.reading(t, h, s))),
+        )
+
+    def fill():
+        batch.clear()
+        for t, h, s in readings:
+            batch.add(t, h, s)
+        return batch
+
+    return (
+        ("json", lambda: api_client.ujson.dumps(fill().payload()),
+         lambda: api_client.api_post_batch(fill().payload())),
+        ("binary", lambda: fill().frame(),
+         lambda: api_client.api_post_readings(fill().frame(), batch=True)),
+    )
+
+
+def _fstring_head(api_client, method, path, body_len, etag):
+    """Request head as api_client built it before the templates."""
+    req = (
+        f"{method} {path} HTTP/1.1\r\n"
+        f"Host: {api_client.HOST}\r\n"
+        f"X-Api-Key: {api_client.HEADERS.get('x-api-key')}\r\n"
+        f"User-Agent: PicoClient/1.0\r\n"
+        f"Accept: application/json\r\n"
+        f"Connection: keep-alive\r\n"
+    )
+    if etag is not None:
+        req += f"If-None-Match: {etag.decode()}\r\n"
+    if body_len is not None:
+        req += (
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {body_len}\r\n"
+            f"\r\n"
+        )
+    else:
+        req += "\r\n"
+    return req.encode()
+
+
+def head_cost(api_client):
+    """[(request, variant, us, mem_alloc delta, peak)] for a POST and a conditional GET."""
+    import gc
+    c = api_client.client
+    path = f"/api/data/{api_client.DEVICE_ID}"
+    cases = (
+        ("POST data", lambda: _fstring_head(api_client, "POST", path, 57, None),
+         lambda: c.build_head(api_client.POST_DATA, 57, None, api_client.JSON)),
+        ("GET wait", lambda: _fstring_head(api_client, "GET", f"{path}/commands?wait=25", None, b'"v42"'),
+         lambda: c.build_head(api_client.WAIT_COMMANDS, None, b'"v42"', api_client.JSON)),
+    )
+    rows = []
+    for name, old, new in cases:
+        assert bytes(old()) == bytes(new())
+        for variant, build in (("f-string", old), ("template", new)):
+            us = _time_us(build)
+            tracemalloc.reset_peak()
+            before = gc.mem_alloc()
+            head = build()
+            delta = gc.mem_alloc() - before
+            peak = tracemalloc.get_traced_memory()[1] - before
+            rows.append((name, variant, us, delta, peak))
+            del head
+    return rows
+
+
+def _time_us(fn, rounds=2000):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / rounds
+
+
+async def _bench(uploads, batch_size):
+    from sim.backend import Backend
+    backend = Backend()
+    port = await backend.start()
+    from data_transfer import secrets
+    secrets.SERVER_URL = f"http://127.0.0.1:{port}"
+    from data_transfer import api_client
+
+    from data_transfer import wire_format
+    from data_transfer.upload_batch import ReadingBatch
+
+    batch = ReadingBatch(batch_size, 60)
+    rows = []
+    for kind, n in (("single", 1), (f"batch{batch_size}", batch_size)):
+        for fmt, encode, upload in _cases(api_client, wire_format, batch, _readings(n)):
+            encode_us = _time_us(encode)
+            encode()                        # first frame() allocates its buffer once
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            encode()
+            heap = tracemalloc.get_traced_memory()[1] - base
+
+            await upload()                  # warm up the session
+            sent = backend.bytes_in
+            for _ in range(uploads):
+                await upload()
+            rows.append((kind, fmt, encode_us, heap, (backend.bytes_in - sent) / uploads))
+
+    heads = head_cost(api_client)
+    api_client.close_all()
+    await backend.stop()
+    return rows, heads
+
+
+def run(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m sim.wire_bench", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--uploads", type=int, default=200, help="uploads per format and kind")
+    ap.add_argument("--batch", type=int, default=10, help="readings per batch upload")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+
+    import sim
+    sim.install(speed=1)
+    rows, heads = asyncio.run(_bench(args.uploads, args.batch))
+
+    sys.stdout.write(f"\n{'kind':10} {'format':7} {'encode_us':>10} {'encode_heap':>12} {'wire_bytes':>11}\n")
+    for kind, fmt, encode_us, heap, wire in rows:
+        sys.stdout.write(f"{kind:10} {fmt:7} {encode_us:10.2f} {heap:12} {wire:11.0f}\n")
+
+    sys.stdout.write(f"\n{'request':10} {'head':9} {'build_us':>9} {'mem_alloc+':>11} {'peak':>6}\n")
+    for name, variant, us, delta, peak in heads:
+        sys.stdout.write(f"{name:10} {variant:9} {us:9.2f} {delta:11} {peak:6}\n")
+    return rows, heads
+
+
+if __name__ == "__main__":
+    run()
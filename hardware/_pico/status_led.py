@@ -1,6 +1,7 @@
 # status_led.py (async)
 import uasyncio as asyncio
 import machine
+from helpers import logger as log
 
 led = machine.Pin("LED", machine.Pin.OUT)
 
@@ -12,11 +13,11 @@ async def blink(times, on_time=0.2, off_time=0.2):
         await asyncio.sleep(off_time)
 
 async def led_startup():
-    print("LED: Startup sequence")
+    log.debug("LED: Startup sequence")
     await blink(3, 0.5, 0.5)
 
 async def led_wifi_connecting():
-    print("LED: Connecting to WiFi...")
+    log.debug("LED: Connecting to WiFi...")
     for _ in range(10):
         led.on()
         await asyncio.sleep(0.2)
@@ -24,23 +25,34 @@ async def led_wifi_connecting():
         await asyncio.sleep(0.2)
 
 async def led_wifi_connected():
-    print("LED: WiFi connected")
+    log.debug("LED: WiFi connected")
     led.on()
     await asyncio.sleep(2)
     led.off()
 
 async def led_sending():
-    print("LED: Sending data")
+    log.debug("LED: Sending data")
     await blink(2, 0.1, 0.1)
 
 async def led_error():
-    print("LED: ERROR (infinite blink)")
+    log.debug("LED: ERROR (infinite blink)")
     while True:
         led.on()
         await asyncio.sleep(1.0)
         led.off()
         await asyncio.sleep(0.2)
 
+_error_task = None
+
+def signal_error():
+    """
+    Starts the error blink from a task's exception handler. led_error()
+    never ends, so one task is enough: later errors don't start another.
+    """
+    global _error_task
+    if _error_task is None:
+        _error_task = asyncio.create_task(led_error())
+
 async def led_heartbeat():
     while True:
         led.on()